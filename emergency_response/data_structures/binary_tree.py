@@ -1,3 +1,9 @@
+import math
+from collections import Counter
+
+from .queue_events import QueueEventSource, INSERTED, REMOVED, REPRIORITISED
+
+
 class TreeNode:
     """二叉搜索树节点类"""
     
@@ -12,13 +18,33 @@ class TreeNode:
         self.left = None
         self.right = None
 
-class BinarySearchTree:
-    """标准二叉搜索树实现"""
+class BinarySearchTree(QueueEventSource):
+    """
+    标准二叉搜索树实现
+
+    树本身不做旋转平衡。为了避免有序插入使树退化成链表，插入深度超过
+    log_{1/ALPHA}(n) + 1时，沿插入路径找到最低的失衡祖先（替罪羊），用
+    Day-Stout-Warren算法原地重建其子树；节点数降到历史最大值的ALPHA倍以下时
+    重建整棵树。重建只调整节点之间的链接，不改变中序顺序，也不发送变更事件。
+    """
+
+    # 替罪羊树的平衡因子：子树大小超过父树的ALPHA倍即视为失衡
+    ALPHA = 0.7
     
-    def __init__(self):
-        """初始化空的二叉搜索树"""
+    def __init__(self, auto_rebalance=True):
+        """
+        初始化空的二叉搜索树
+
+        参数:
+            auto_rebalance: 插入过深或删除过多时是否自动重建
+        """
         self.root = None
         self.size = 0
+        self.subscribers = []  # 变更事件的订阅者
+        self.auto_rebalance = auto_rebalance
+        self.height_estimate = 0  # 树高（根的深度为0）的上界，插入时O(1)维护
+        self.max_size = 0         # 上次整体重建以来的最大节点数
+        self.rebuild_count = 0    # 自动或手动重建的次数（包括子树重建）
     
     def is_empty(self):
         """检查树是否为空"""
@@ -35,7 +61,13 @@ class BinarySearchTree:
             - 节点的左子树只包含严重程度小于（优先级高于）当前节点的节点
             - 节点的右子树只包含严重程度大于（优先级低于）当前节点的节点
         """
+        self._insert(item)
+        self._emit(INSERTED, item)
+    
+    def _insert(self, item):
+        """插入项目（不发送事件）"""
         self.size += 1
+        self.max_size = max(self.max_size, self.size)
         
         # 如果树为空，创建根节点
         if self.is_empty():
@@ -43,7 +75,12 @@ class BinarySearchTree:
             return
         
         # 否则，使用迭代方式找到合适的插入位置
-        self._insert_iterative(item)
+        depth = self._insert_iterative(item)
+        
+        # 插入过深时重建替罪羊子树，记录的深度改为重建后子树的高度上界
+        if self.auto_rebalance and depth > math.log(self.size, 1 / self.ALPHA) + 1:
+            depth = self._rebuild_scapegoat(item)
+        self.height_estimate = max(self.height_estimate, depth)
     
     def _insert_iterative(self, item):
         """
@@ -51,22 +88,27 @@ class BinarySearchTree:
         
         参数:
             item: 要插入的紧急情况对象
+            
+        返回:
+            新节点的深度（根的深度为0）
         """
         current = self.root
+        depth = 0
         
         while True:
+            depth += 1
             # 如果新项目严重程度小于（优先级高于）当前节点，放在左子树
             if item < current.data:
                 if current.left is None:
                     current.left = TreeNode(item)
-                    return
+                    return depth
                 else:
                     current = current.left
             # 如果新项目严重程度大于（优先级低于）当前节点，放在右子树
             elif item > current.data:
                 if current.right is None:
                     current.right = TreeNode(item)
-                    return
+                    return depth
                 else:
                     current = current.right
             # 如果严重程度相同，我们按照ID递增排序
@@ -74,13 +116,13 @@ class BinarySearchTree:
                 if item.emergency_id < current.data.emergency_id:
                     if current.left is None:
                         current.left = TreeNode(item)
-                        return
+                        return depth
                     else:
                         current = current.left
                 else:
                     if current.right is None:
                         current.right = TreeNode(item)
-                        return
+                        return depth
                     else:
                         current = current.right
     
@@ -110,10 +152,23 @@ class BinarySearchTree:
         """
         if self.is_empty():
             return None
-            
-        min_item = self.get_min()
-        self.remove(min_item.emergency_id)
-        return min_item
+        
+        # 最小值在最左边的节点，它没有左子节点，用右子树替代它即可，O(树高)
+        parent = None
+        current = self.root
+        while current.left:
+            parent = current
+            current = current.left
+        
+        if parent is None:
+            self.root = current.right
+        else:
+            parent.left = current.right
+        self.size -= 1
+        self._after_remove()
+        
+        self._emit(REMOVED, current.data)
+        return current.data
     
     def search_by_id(self, emergency_id):
         """
@@ -214,17 +269,19 @@ class BinarySearchTree:
             布尔值，表示操作是否成功
         """
         # 在二叉搜索树中，更新键值需要先删除后插入
-        emergency = self.remove(emergency_id)
+        emergency = self._remove(emergency_id)
         
         # 如果未找到，返回失败
         if not emergency:
             return False
         
         # 更新严重程度
+        old_severity = emergency.severity_level
         emergency.severity_level = new_severity
         
         # 重新插入
-        self.insert(emergency)
+        self._insert(emergency)
+        self._emit(REPRIORITISED, emergency, old_severity)
         return True
     
     def remove(self, emergency_id):
@@ -237,6 +294,13 @@ class BinarySearchTree:
         返回:
             找到并移除的紧急情况对象，如果未找到则返回None
         """
+        emergency = self._remove(emergency_id)
+        if emergency is not None:
+            self._emit(REMOVED, emergency)
+        return emergency
+    
+    def _remove(self, emergency_id):
+        """移除指定ID的紧急情况（不发送事件）"""
         if self.is_empty():
             return None
         
@@ -251,9 +315,19 @@ class BinarySearchTree:
         
         # 执行删除操作
         self._delete_node(parent, current, is_left_child)
+        self._after_remove()
         
         return emergency
     
+    def _after_remove(self):
+        """删除节点后更新高度上界，节点过少时重建整棵树"""
+        # 删除不会增加深度，但节点过少时原来的高度上界相对log(n)偏大
+        if self.size == 0:
+            self.height_estimate = 0
+            self.max_size = 0
+        elif self.auto_rebalance and self.size < self.ALPHA * self.max_size:
+            self.rebuild()
+    
     def _find_node_and_parent(self, emergency_id):
         """
         查找指定ID的节点及其父节点
@@ -358,7 +432,167 @@ class BinarySearchTree:
             current = current.left
             
         return current, parent_node
-    
+
+    def rebuild(self):
+        """
+        用Day-Stout-Warren算法把整棵树原地重建为平衡的形状
+
+        O(n)时间、O(1)额外空间；中序顺序不变，不发送变更事件。
+        """
+        if self.root is not None:
+            self.root = self._build_balanced(self.root, self.size)
+            self.rebuild_count += 1
+        self.height_estimate = max(0, self.size.bit_length() - 1)
+        self.max_size = self.size
+
+    def _rebuild_scapegoat(self, item):
+        """
+        沿插入路径自底向上寻找失衡的祖先（替罪羊），用DSW算法重建其子树
+
+        参数:
+            item: 刚插入的紧急情况对象
+
+        返回:
+            重建后新节点深度的上界
+        """
+        # 节点不记录父节点和子树大小，重新走一遍插入路径（只在插入过深时发生）
+        path = []
+        node = self.root
+        while node.data is not item:
+            path.append(node)
+            node = node.left if item < node.data else node.right
+
+        child, child_size = node, 1
+        for depth in range(len(path) - 1, -1, -1):
+            node = path[depth]
+            sibling = node.right if node.left is child else node.left
+            size = child_size + 1 + self._subtree_size(sibling)
+            if child_size > self.ALPHA * size:
+                subtree = self._build_balanced(node, size)
+                if depth == 0:
+                    self.root = subtree
+                elif path[depth - 1].left is node:
+                    path[depth - 1].left = subtree
+                else:
+                    path[depth - 1].right = subtree
+                self.rebuild_count += 1
+                return depth + size.bit_length() - 1
+            child, child_size = node, size
+
+        # 插入深度超过阈值时一定存在替罪羊，这里只是保险
+        self.rebuild()
+        return self.height_estimate
+
+    def _subtree_size(self, node):
+        """返回以node为根的子树的节点数"""
+        count = 0
+        stack = [node] if node else []
+        while stack:
+            node = stack.pop()
+            count += 1
+            if node.left:
+                stack.append(node.left)
+            if node.right:
+                stack.append(node.right)
+        return count
+
+    def _build_balanced(self, root, size):
+        """
+        DSW算法：先把子树右旋成只有右链的"藤"，再通过若干轮左旋压缩成平衡树
+
+        参数:
+            root: 子树的根节点
+            size: 子树的节点数
+
+        返回:
+            重建后子树的根节点
+        """
+        pseudo_root = TreeNode(None)
+        pseudo_root.right = root
+
+        # 第一步：右旋直到所有节点都没有左子节点
+        tail = pseudo_root
+        rest = root
+        while rest:
+            if rest.left is None:
+                tail = rest
+                rest = rest.right
+            else:
+                left = rest.left
+                rest.left = left.right
+                left.right = rest
+                rest = left
+                tail.right = left
+
+        # 第二步：先把超出满二叉树的节点压到最底层，再逐轮对半压缩
+        leaves = size + 1 - (1 << ((size + 1).bit_length() - 1))
+        self._compress(pseudo_root, leaves)
+        size -= leaves
+        while size > 1:
+            size //= 2
+            self._compress(pseudo_root, size)
+
+        return pseudo_root.right
+
+    def _compress(self, pseudo_root, count):
+        """沿藤从上到下每隔一个节点做一次左旋，共count次"""
+        scanner = pseudo_root
+        for _ in range(count):
+            child = scanner.right
+            scanner.right = child.right
+            scanner = scanner.right
+            child.right = scanner.left
+            scanner.left = child
+
+    def shape_statistics(self):
+        """
+        计算树的形状统计（遍历整棵树，O(n)）
+
+        返回:
+            字典，包含:
+                size: 节点数
+                max_depth: 最深节点的深度（根的深度为0）
+                average_depth: 节点的平均深度
+                optimal_depth: 同样节点数的树可能的最小高度floor(log2(n))
+                depth_ratio: 实际层数与最优层数之比，1.0表示完全平衡
+                balance_factors: Counter {右子树高度 - 左子树高度: 节点数}
+                height_estimate: 插入时维护的树高上界
+                rebuild_count: 重建次数
+        """
+        order = []
+        max_depth = 0
+        depth_total = 0
+        stack = [(self.root, 0)] if self.root else []
+        while stack:
+            node, depth = stack.pop()
+            order.append(node)
+            max_depth = max(max_depth, depth)
+            depth_total += depth
+            if node.left:
+                stack.append((node.left, depth + 1))
+            if node.right:
+                stack.append((node.right, depth + 1))
+
+        # 子节点总在父节点之后出现，倒序处理即可自底向上计算高度
+        heights = {None: -1}
+        balance_factors = Counter()
+        for node in reversed(order):
+            left, right = heights[node.left], heights[node.right]
+            heights[node] = 1 + max(left, right)
+            balance_factors[right - left] += 1
+
+        optimal_depth = max(0, self.size.bit_length() - 1)
+        return {
+            'size': self.size,
+            'max_depth': max_depth,
+            'average_depth': depth_total / self.size if self.size else 0.0,
+            'optimal_depth': optimal_depth,
+            'depth_ratio': (max_depth + 1) / (optimal_depth + 1),
+            'balance_factors': balance_factors,
+            'height_estimate': self.height_estimate,
+            'rebuild_count': self.rebuild_count,
+        }
+
     def __len__(self):
         """返回树中的节点数量"""
         return self.size
@@ -397,6 +631,25 @@ class BinarySearchTree:
         
         return iter(result)
     
+    def iter_by_priority(self):
+        """
+        按优先级顺序惰性返回树中的项目（中序遍历的生成器版本）
+
+        与__iter__不同，不会先构建完整列表，取出前k个项目只需O(h + k)。
+
+        返回:
+            按优先级从高到低的紧急情况对象迭代器
+        """
+        stack = []
+        current = self.root
+        while current or stack:
+            while current:
+                stack.append(current)
+                current = current.left
+            current = stack.pop()
+            yield current.data
+            current = current.right
+    
     def print_tree(self):
         """
         打印树的结构（用于调试）
@@ -433,6 +686,10 @@ class BinaryTreePriorityQueue(BinarySearchTree):
         """移除并返回最高优先级的项目"""
         return self.remove_min()
         
+    def peek(self):
+        """返回最高优先级的项目但不移除"""
+        return self.get_min()
+        
     def search(self, emergency_id):
         """搜索具有指定ID的紧急情况"""
         return self.search_by_id(emergency_id)
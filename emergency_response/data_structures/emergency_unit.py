@@ -0,0 +1,40 @@
+from .emergency import EmergencyType
+
+# 响应单位类型
+UNIT_TYPES = ["Fire Truck", "Ambulance", "Police Car"]
+
+# 每种紧急情况可以派出的单位类型
+RESPONDING_UNIT_TYPES = {
+    EmergencyType.FIRE: {"Fire Truck"},
+    EmergencyType.MEDICAL: {"Ambulance"},
+    EmergencyType.POLICE: {"Police Car"},
+    EmergencyType.TRAFFIC: {"Police Car", "Ambulance"},
+    EmergencyType.NATURAL: {"Fire Truck", "Ambulance", "Police Car"},
+}
+
+
+def responding_unit_types(emergency_type):
+    """返回可以响应指定类型紧急情况的单位类型集合"""
+    return RESPONDING_UNIT_TYPES.get(emergency_type, set(UNIT_TYPES))
+
+
+class EmergencyUnit:
+    """表示紧急响应单元（如消防车、救护车、警车等）"""
+    
+    def __init__(self, unit_id, unit_type, location_x, location_y):
+        """
+        初始化紧急响应单元
+        
+        Parameters:
+            unit_id: 单位ID
+            unit_type: 单位类型（如消防车、救护车、警车等）
+            location_x: X坐标
+            location_y: Y坐标
+        """
+        self.unit_id = unit_id
+        self.unit_type = unit_type
+        self.location_x = location_x
+        self.location_y = location_y
+    
+    def __repr__(self):
+        return f"EmergencyUnit(id={self.unit_id}, type={self.unit_type}, loc=({self.location_x}, {self.location_y}))"
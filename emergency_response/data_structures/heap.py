@@ -1,4 +1,9 @@
-class HeapPriorityQueue:
+import heapq
+
+from .queue_events import QueueEventSource, INSERTED, REMOVED, REPRIORITISED
+
+
+class HeapPriorityQueue(QueueEventSource):
     """使用二叉堆实现的优先队列（最小堆）"""
     
     def __init__(self, max_size=1000):
@@ -12,6 +17,7 @@ class HeapPriorityQueue:
         self.heap = [None]  # 索引0不使用，从索引1开始
         self.count = 0  # 当前堆中的元素数量
         self.id_to_index = {}  # 用于快速查找：紧急情况ID -> 堆索引
+        self.subscribers = []  # 变更事件的订阅者
     
     def is_empty(self):
         """检查队列是否为空"""
@@ -40,6 +46,7 @@ class HeapPriorityQueue:
         
         # 2. 通过"上浮"操作恢复堆属性
         self._shift_up(self.count)
+        self._emit(INSERTED, item)
     
     def _shift_up(self, index):
         """
@@ -56,6 +63,17 @@ class HeapPriorityQueue:
                 self._swap(index, parent)
                 self._shift_up(parent)
     
+    def peek(self):
+        """
+        返回最高优先级的项目但不移除
+        
+        返回:
+            最高优先级的紧急情况对象，如果队列为空则返回None
+        """
+        if self.is_empty():
+            return None
+        return self.heap[1]
+    
     def dequeue(self):
         """
         移除并返回最高优先级的项目（堆顶元素）
@@ -81,6 +99,7 @@ class HeapPriorityQueue:
         if self.count > 0:  # 如果堆不为空
             self._shift_down(1)
         
+        self._emit(REMOVED, highest_priority_item)
         return highest_priority_item
     
     def _shift_down(self, index):
@@ -175,15 +194,16 @@ class HeapPriorityQueue:
             return False
         
         index = self.id_to_index[emergency_id]
-        old_severity = self.heap[index].severity_level
-        self.heap[index].severity_level = new_severity
+        item = self.heap[index]
+        old_severity = item.severity_level
+        item.severity_level = new_severity
         
-        # 根据优先级变化，执行上浮或下沉操作
-        if new_severity < old_severity:  # 优先级提高
-            self._shift_up(index)
-        else:  # 优先级降低
-            self._shift_down(index)
+        # 同一个紧急情况对象可能被其他队列先修改了严重程度，此时old_severity
+        # 已经是新值，不能用它判断方向：两个方向都尝试，其中一个不会移动
+        self._shift_up(index)
+        self._shift_down(self.id_to_index[emergency_id])
         
+        self._emit(REPRIORITISED, item, old_severity)
         return True
     
     def __len__(self):
@@ -195,4 +215,25 @@ class HeapPriorityQueue:
         使队列可迭代。注意：这不会按优先级顺序返回。
         """
         for i in range(1, self.count + 1):
-            yield self.heap[i]
\ No newline at end of file
+            yield self.heap[i]
+
+    def iter_by_priority(self):
+        """
+        按优先级顺序惰性返回队列中的项目，不修改堆
+
+        用一个候选堆保存已访问节点的子节点，取出前k个项目只需O(k log k)，
+        适合只显示队列前几页的界面。
+
+        返回:
+            按优先级从高到低的紧急情况对象迭代器
+        """
+        if self.count == 0:
+            return
+        frontier = [(self.heap[1].severity_level, self.heap[1].emergency_id, 1)]
+        while frontier:
+            _, _, index = heapq.heappop(frontier)
+            yield self.heap[index]
+            for child in (2 * index, 2 * index + 1):
+                if child <= self.count:
+                    item = self.heap[child]
+                    heapq.heappush(frontier, (item.severity_level, item.emergency_id, child))
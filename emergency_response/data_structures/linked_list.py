@@ -1,3 +1,6 @@
+from .queue_events import QueueEventSource, INSERTED, REMOVED, REPRIORITISED
+
+
 class Node:
     """链表节点类"""
     
@@ -12,7 +15,7 @@ class Node:
         self.data = data
         self.next = next_node
 
-class LinkedListPriorityQueue:
+class LinkedListPriorityQueue(QueueEventSource):
     """使用链表实现的优先队列"""
     
     def __init__(self):
@@ -20,6 +23,7 @@ class LinkedListPriorityQueue:
         self.head = None  # 指向最高优先级的元素
         self.tail = None  # 指向最低优先级的元素
         self.size = 0
+        self.subscribers = []  # 变更事件的订阅者
     
     def is_empty(self):
         """检查队列是否为空"""
@@ -36,6 +40,11 @@ class LinkedListPriorityQueue:
             - 严重程度数值越小，优先级越高
             - 头部始终指向最高优先级的元素
         """
+        self._insert(item)
+        self._emit(INSERTED, item)
+    
+    def _insert(self, item):
+        """按优先级把项目插入链表（不发送事件）"""
         self.size += 1
         new_node = Node(item)
         
@@ -70,6 +79,17 @@ class LinkedListPriorityQueue:
         if new_node.next is None:
             self.tail = new_node
     
+    def peek(self):
+        """
+        返回最高优先级的项目但不移除
+        
+        返回:
+            最高优先级的紧急情况对象，如果队列为空则返回None
+        """
+        if self.is_empty():
+            return None
+        return self.head.data
+    
     def dequeue(self):
         """
         移除并返回最高优先级的项目
@@ -88,6 +108,7 @@ class LinkedListPriorityQueue:
         if self.head is None:
             self.tail = None
             
+        self._emit(REMOVED, highest_priority)
         return highest_priority
     
     def search(self, emergency_id):
@@ -147,10 +168,12 @@ class LinkedListPriorityQueue:
         self.size -= 1
         
         # 更新严重程度
+        old_severity = emergency.severity_level
         emergency.severity_level = new_severity
         
-        # 重新入队
-        self.enqueue(emergency)
+        # 重新插入
+        self._insert(emergency)
+        self._emit(REPRIORITISED, emergency, old_severity)
         return True
     
     def __len__(self):
@@ -162,4 +185,13 @@ class LinkedListPriorityQueue:
         current = self.head
         while current:
             yield current.data
-            current = current.next
\ No newline at end of file
+            current = current.next
+
+    def iter_by_priority(self):
+        """
+        按优先级顺序惰性返回队列中的项目（链表本身已按优先级排序）
+
+        返回:
+            按优先级从高到低的紧急情况对象迭代器
+        """
+        return iter(self)
@@ -0,0 +1,46 @@
+from collections import namedtuple
+
+# 事件类型
+INSERTED = "inserted"              # 紧急情况入队
+REMOVED = "removed"                # 紧急情况出队或被删除
+REPRIORITISED = "reprioritised"    # 严重程度改变（在优先级顺序中移动位置）
+
+# old_severity只在REPRIORITISED事件中设置
+QueueEvent = namedtuple("QueueEvent", ["kind", "item", "old_severity"], defaults=(None,))
+
+
+class QueueEventSource:
+    """
+    优先队列的变更事件混入类
+
+    订阅者是callback(queue, event)形式的函数，在队列修改完成后同步调用。
+    没有订阅者时_emit只做一次列表判断，不影响队列本身的性能。
+    使用该混入类的队列需要在__init__中设置self.subscribers = []。
+    """
+
+    def subscribe(self, callback):
+        """
+        订阅队列变更事件
+
+        参数:
+            callback: 函数callback(queue, event)，event为QueueEvent
+        """
+        if callback not in self.subscribers:
+            self.subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        """
+        取消订阅（未订阅时忽略）
+
+        参数:
+            callback: 之前传给subscribe的函数
+        """
+        if callback in self.subscribers:
+            self.subscribers.remove(callback)
+
+    def _emit(self, kind, item, old_severity=None):
+        """通知所有订阅者"""
+        if self.subscribers:
+            event = QueueEvent(kind, item, old_severity)
+            for callback in list(self.subscribers):
+                callback(self, event)
@@ -0,0 +1,209 @@
+import heapq
+import math
+
+
+class GridSpatialHash:
+    """
+    基于均匀网格的紧急响应单位空间哈希
+
+    坐标空间（默认与KNN界面一致的0-100范围）被划分为边长cell_size的网格，
+    每个网格用字典保存其中的单位：
+        - insert / remove / move 只修改一到两个网格，O(1)
+        - k_nearest 从查询点所在网格开始逐圈向外扩展，找到k个单位且
+          第k近的距离不超过已搜索区域的边界距离时停止
+    适合位置频繁更新的场景，不需要像KD树那样重建。
+    """
+
+    def __init__(self, cell_size=5.0, units=None):
+        """
+        初始化空间哈希
+
+        参数:
+            cell_size: 网格边长，建议接近单位间的平均距离
+            units: 可选，初始的EmergencyUnit列表
+        """
+        if cell_size <= 0:
+            raise ValueError("网格边长必须为正数")
+        self.cell_size = cell_size
+        self.cells = {}        # (cx, cy) -> {unit_id: unit}
+        self.unit_cells = {}   # unit_id -> (cx, cy)
+        # 曾经被占用的网格范围，用于确定扩展搜索的上限
+        self.min_cell = None
+        self.max_cell = None
+        for unit in units or []:
+            self.insert(unit)
+
+    def __len__(self):
+        """返回单位数量"""
+        return len(self.unit_cells)
+
+    def __contains__(self, unit):
+        """检查单位是否在空间哈希中"""
+        return unit.unit_id in self.unit_cells
+
+    def __iter__(self):
+        """遍历所有单位"""
+        for cell in self.cells.values():
+            yield from cell.values()
+
+    def _cell_of(self, x, y):
+        """返回坐标所在的网格"""
+        return (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+
+    def insert(self, unit):
+        """
+        插入一个单位
+
+        参数:
+            unit: 要插入的EmergencyUnit，unit_id必须唯一
+        """
+        if unit.unit_id in self.unit_cells:
+            raise ValueError(f"单位 {unit.unit_id} 已在空间哈希中")
+        key = self._cell_of(unit.location_x, unit.location_y)
+        self.cells.setdefault(key, {})[unit.unit_id] = unit
+        self.unit_cells[unit.unit_id] = key
+
+        if self.min_cell is None:
+            self.min_cell = key
+            self.max_cell = key
+        else:
+            self.min_cell = (min(self.min_cell[0], key[0]), min(self.min_cell[1], key[1]))
+            self.max_cell = (max(self.max_cell[0], key[0]), max(self.max_cell[1], key[1]))
+
+    def remove(self, unit):
+        """
+        删除一个单位
+
+        参数:
+            unit: 要删除的EmergencyUnit（按unit_id匹配）
+
+        返回:
+            bool: 如果删除成功返回True，否则返回False
+        """
+        key = self.unit_cells.pop(unit.unit_id, None)
+        if key is None:
+            return False
+        cell = self.cells[key]
+        del cell[unit.unit_id]
+        if not cell:
+            del self.cells[key]
+        return True
+
+    def move(self, unit, x, y):
+        """
+        移动单位到新位置
+
+        参数:
+            unit: 要移动的EmergencyUnit
+            x: 新的X坐标
+            y: 新的Y坐标
+        """
+        unit_id = unit.unit_id
+        old_key = self.unit_cells.get(unit_id)
+        if old_key is None:
+            raise KeyError(f"单位 {unit_id} 不在空间哈希中")
+        unit.location_x = x
+        unit.location_y = y
+        new_key = (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+        if new_key == old_key:
+            return
+
+        old_cell = self.cells[old_key]
+        del old_cell[unit_id]
+        if not old_cell:
+            del self.cells[old_key]
+        new_cell = self.cells.get(new_key)
+        if new_cell is None:
+            self.cells[new_key] = {unit_id: unit}
+            # 只有新建网格时才可能扩大占用范围
+            self.min_cell = (min(self.min_cell[0], new_key[0]), min(self.min_cell[1], new_key[1]))
+            self.max_cell = (max(self.max_cell[0], new_key[0]), max(self.max_cell[1], new_key[1]))
+        else:
+            new_cell[unit_id] = unit
+        self.unit_cells[unit_id] = new_key
+
+    def _ring(self, cx, cy, radius):
+        """返回以(cx, cy)为中心、切比雪夫距离为radius的一圈网格"""
+        if radius == 0:
+            return [(cx, cy)]
+        ring = []
+        for dx in range(-radius, radius + 1):
+            ring.append((cx + dx, cy - radius))
+            ring.append((cx + dx, cy + radius))
+        for dy in range(-radius + 1, radius):
+            ring.append((cx - radius, cy + dy))
+            ring.append((cx + radius, cy + dy))
+        return ring
+
+    def k_nearest(self, x, y, k):
+        """
+        查找离给定坐标最近的k个单位
+
+        参数:
+            x: X坐标
+            y: Y坐标
+            k: 返回的单位数量
+
+        返回:
+            [(unit, distance), ...]，按距离从近到远排序
+        """
+        if k <= 0 or not self.unit_cells:
+            return []
+
+        cx, cy = self._cell_of(x, y)
+        # 超过这个圈数后不可能再有单位
+        max_radius = max(
+            abs(cx - self.min_cell[0]), abs(cx - self.max_cell[0]),
+            abs(cy - self.min_cell[1]), abs(cy - self.max_cell[1])
+        )
+
+        best = []  # 最大堆: (-平方距离, -unit_id, unit)
+        cells = self.cells
+        for radius in range(max_radius + 1):
+            for key in self._ring(cx, cy, radius):
+                cell = cells.get(key)
+                if not cell:
+                    continue
+                for unit_id, unit in cell.items():
+                    dx = unit.location_x - x
+                    dy = unit.location_y - y
+                    distance = dx * dx + dy * dy
+                    if len(best) < k:
+                        heapq.heappush(best, (-distance, -unit_id, unit))
+                    elif (-distance, -unit_id) > best[0][:2]:
+                        heapq.heapreplace(best, (-distance, -unit_id, unit))
+            # 已搜索区域之外的单位距离至少为radius个网格边长
+            if len(best) == k:
+                bound = radius * self.cell_size
+                if -best[0][0] <= bound * bound:
+                    break
+
+        results = sorted((-neg_distance, -neg_id, unit) for neg_distance, neg_id, unit in best)
+        return [(unit, math.sqrt(distance)) for distance, _, unit in results]
+
+    def within_radius(self, x, y, radius):
+        """
+        查找给定半径内的所有单位
+
+        参数:
+            x: X坐标
+            y: Y坐标
+            radius: 搜索半径
+
+        返回:
+            [(unit, distance), ...]，按距离从近到远排序
+        """
+        low_x, low_y = self._cell_of(x - radius, y - radius)
+        high_x, high_y = self._cell_of(x + radius, y + radius)
+        limit = radius * radius
+        found = []
+        for cx in range(low_x, high_x + 1):
+            for cy in range(low_y, high_y + 1):
+                for unit_id, unit in self.cells.get((cx, cy), {}).items():
+                    dx = unit.location_x - x
+                    dy = unit.location_y - y
+                    distance = dx * dx + dy * dy
+                    if distance <= limit:
+                        found.append((distance, unit_id, unit))
+        found.sort()
+        return [(unit, math.sqrt(distance)) for distance, _, unit in found]
@@ -0,0 +1,535 @@
+import heapq
+import math
+
+
+class KDNode:
+    """KD树节点"""
+    __slots__ = ('unit', 'x', 'y', 'axis', 'left', 'right', 'parent',
+                 'size', 'deleted', 'available', 'available_count')
+
+    def __init__(self, unit, axis, available=True):
+        """
+        初始化KD树节点
+
+        参数:
+            unit: 紧急响应单位，使用其location_x和location_y作为坐标
+            axis: 划分轴，0表示x，1表示y
+            available: 单位是否可用
+        """
+        self.unit = unit
+        self.x = unit.location_x
+        self.y = unit.location_y
+        self.axis = axis
+        self.left = None
+        self.right = None
+        self.parent = None
+        self.size = 1  # 子树中的节点数（包括已删除标记的节点）
+        self.deleted = False
+        self.available = available
+        self.available_count = 1 if available else 0  # 子树中未删除且可用的节点数
+
+
+class KDTree:
+    """
+    二维KD树
+
+    - k_nearest / within_radius 查询按分割平面剪枝，平均O(log n)
+    - insert 沿树下降插入；当插入深度超过平衡上限时，按替罪羊树的方式
+      只重建失衡的子树，因此有序插入也不会使树退化
+    - remove 只做删除标记，已删除节点超过一半时整体重建
+    - 每个节点记录子树中可用单位的数量，只查询可用单位时跳过没有可用单位的子树
+    """
+
+    # 替罪羊树的平衡因子：子树大小超过父树的ALPHA倍即视为失衡
+    ALPHA = 0.7
+
+    # 单位数量不超过此值时k近邻查询使用线性扫描
+    LINEAR_SCAN_SIZE = 32
+
+    def __init__(self, units=None):
+        """
+        初始化KD树
+
+        参数:
+            units: 可选，初始的EmergencyUnit列表，一次性构建平衡的KD树
+        """
+        self.root = None
+        self.nodes = {}    # unit_id -> 节点
+        self.deleted = 0   # 带删除标记的节点数
+        if units:
+            self.rebuild(units)
+
+    def __len__(self):
+        """返回树中的单位数量"""
+        return len(self.nodes)
+
+    def __iter__(self):
+        """遍历树中的所有单位"""
+        return (node.unit for node in self.nodes.values())
+
+    @property
+    def available_count(self):
+        """返回可用单位的数量"""
+        return self.root.available_count if self.root else 0
+
+    def rebuild(self, units=None):
+        """
+        重建平衡的KD树，同时清除所有删除标记
+
+        参数:
+            units: 可选，新的单位列表（全部视为可用）；默认使用树中当前的单位并保留其可用状态
+        """
+        if units is None:
+            nodes = [KDNode(node.unit, 0, node.available) for node in self.nodes.values()]
+        else:
+            nodes = [KDNode(unit, 0) for unit in units]
+        self.nodes = {}
+        for node in nodes:
+            if node.unit.unit_id in self.nodes:
+                raise ValueError(f"重复的单位ID: {node.unit.unit_id}")
+            self.nodes[node.unit.unit_id] = node
+        self.deleted = 0
+        self.root = self._build(nodes, 0, None)
+
+    def _build(self, nodes, axis, parent):
+        """以中位数为分割点递归构建平衡子树"""
+        if not nodes:
+            return None
+        if axis == 0:
+            nodes.sort(key=lambda node: node.x)
+        else:
+            nodes.sort(key=lambda node: node.y)
+        middle = len(nodes) // 2
+        root = nodes[middle]
+        root.axis = axis
+        root.parent = parent
+        root.left = self._build(nodes[:middle], 1 - axis, root)
+        root.right = self._build(nodes[middle + 1:], 1 - axis, root)
+        root.size = len(nodes)
+        root.available_count = (
+            (1 if root.available else 0)
+            + (root.left.available_count if root.left else 0)
+            + (root.right.available_count if root.right else 0)
+        )
+        return root
+
+    def _live_nodes(self, root):
+        """返回子树中所有未删除的节点"""
+        live = []
+        stack = [root] if root else []
+        while stack:
+            node = stack.pop()
+            if not node.deleted:
+                live.append(node)
+            if node.left:
+                stack.append(node.left)
+            if node.right:
+                stack.append(node.right)
+        return live
+
+    def _adjust_available(self, node, delta):
+        """从node到根更新可用单位计数"""
+        while node is not None:
+            node.available_count += delta
+            node = node.parent
+
+    def insert(self, unit, available=True):
+        """
+        插入一个单位
+
+        参数:
+            unit: 要插入的EmergencyUnit，unit_id必须唯一
+            available: 单位是否可用
+        """
+        if unit.unit_id in self.nodes:
+            raise ValueError(f"单位 {unit.unit_id} 已在索引中")
+
+        new_node = KDNode(unit, 0, available)
+        self.nodes[unit.unit_id] = new_node
+        if self.root is None:
+            self.root = new_node
+            return
+
+        path = []
+        node = self.root
+        while node:
+            path.append(node)
+            node.size += 1
+            if available:
+                node.available_count += 1
+            if (new_node.x if node.axis == 0 else new_node.y) < (node.x if node.axis == 0 else node.y):
+                child = node.left
+                if child is None:
+                    node.left = new_node
+            else:
+                child = node.right
+                if child is None:
+                    node.right = new_node
+            node = child
+        new_node.parent = path[-1]
+        new_node.axis = 1 - path[-1].axis
+
+        # 插入过深时找到最低的失衡祖先（替罪羊）并重建其子树
+        total = len(self.nodes) + self.deleted
+        if len(path) > math.log(total, 1 / self.ALPHA) + 1:
+            self._rebuild_scapegoat(path)
+
+    def _rebuild_scapegoat(self, path):
+        """沿插入路径自底向上寻找失衡的节点，重建其子树"""
+        for depth in range(len(path) - 1, -1, -1):
+            node = path[depth]
+            left_size = node.left.size if node.left else 0
+            right_size = node.right.size if node.right else 0
+            if max(left_size, right_size) > self.ALPHA * node.size:
+                live = self._live_nodes(node)
+                removed = node.size - len(live)
+                parent = node.parent
+                subtree = self._build(live, node.axis, parent)
+                self.deleted -= removed
+                if parent is None:
+                    self.root = subtree
+                else:
+                    if parent.left is node:
+                        parent.left = subtree
+                    else:
+                        parent.right = subtree
+                    # 删除标记的节点不计入可用数量，只需更新子树大小
+                    for ancestor in path[:depth]:
+                        ancestor.size -= removed
+                return
+
+    def remove(self, unit):
+        """
+        从树中删除一个单位
+
+        参数:
+            unit: 要删除的EmergencyUnit（按unit_id匹配）
+
+        返回:
+            bool: 如果删除成功返回True，否则返回False
+        """
+        node = self.nodes.pop(unit.unit_id, None)
+        if node is None:
+            return False
+        node.deleted = True
+        if node.available:
+            self._adjust_available(node, -1)
+        self.deleted += 1
+        if self.deleted > len(self.nodes):
+            self.rebuild()
+        return True
+
+    def is_available(self, unit):
+        """返回单位是否可用"""
+        return self.nodes[unit.unit_id].available
+
+    def set_available(self, unit, available):
+        """
+        设置单位的可用状态，O(树高)
+
+        参数:
+            unit: EmergencyUnit
+            available: 是否可用
+        """
+        node = self.nodes[unit.unit_id]
+        if node.available != available:
+            node.available = available
+            self._adjust_available(node, 1 if available else -1)
+
+    def k_nearest(self, x, y, k, available_only=False):
+        """
+        查找离给定坐标最近的k个单位
+
+        参数:
+            x: X坐标
+            y: Y坐标
+            k: 返回的单位数量
+            available_only: 是否只返回可用单位
+
+        返回:
+            [(squared_distance, unit_id, unit), ...]，按距离从近到远排序
+        """
+        if k <= 0 or self.root is None:
+            return []
+        if available_only and self.root.available_count == 0:
+            return []
+
+        # 最大堆（存储负的平方距离），保存当前找到的k个最近节点
+        best = []
+        heappush = heapq.heappush
+        heapreplace = heapq.heapreplace
+
+        # 单位很少时直接扫描比遍历树更快
+        if len(self.nodes) <= self.LINEAR_SCAN_SIZE:
+            for unit_id, node in self.nodes.items():
+                if available_only and not node.available:
+                    continue
+                dx = node.x - x
+                dy = node.y - y
+                distance = dx * dx + dy * dy
+                if len(best) < k:
+                    heappush(best, (-distance, -unit_id, node))
+                elif distance < -best[0][0]:
+                    heapreplace(best, (-distance, -unit_id, node))
+            return sorted((-neg_distance, -neg_id, node.unit) for neg_distance, neg_id, node in best)
+
+        def search(node):
+            # 调用者保证node不为None，且只查询可用单位时node的子树中有可用单位
+            while True:
+                dx = node.x - x
+                dy = node.y - y
+                if not node.deleted and (node.available or not available_only):
+                    distance = dx * dx + dy * dy
+                    if len(best) < k:
+                        heappush(best, (-distance, -node.unit.unit_id, node))
+                    elif distance < -best[0][0]:
+                        heapreplace(best, (-distance, -node.unit.unit_id, node))
+
+                diff = dx if node.axis == 0 else dy
+                if diff > 0:
+                    near, far = node.left, node.right
+                else:
+                    near, far = node.right, node.left
+                if near is not None and (near.available_count or not available_only):
+                    search(near)
+                # 只有分割平面比当前第k近的距离更近时才需要搜索另一侧
+                if (far is None or (available_only and not far.available_count)
+                        or (len(best) == k and diff * diff >= -best[0][0])):
+                    return
+                node = far
+
+        search(self.root)
+        return sorted((-neg_distance, -neg_id, node.unit) for neg_distance, neg_id, node in best)
+
+    def within_radius(self, x, y, radius, available_only=False):
+        """
+        查找给定半径内的所有单位
+
+        返回:
+            [(squared_distance, unit_id, unit), ...]，未排序
+        """
+        found = []
+        limit = radius * radius
+        stack = [self.root] if self.root else []
+        while stack:
+            node = stack.pop()
+            if available_only and node.available_count == 0:
+                continue
+            dx = node.x - x
+            dy = node.y - y
+            if not node.deleted and (node.available or not available_only):
+                distance = dx * dx + dy * dy
+                if distance <= limit:
+                    found.append((distance, node.unit.unit_id, node.unit))
+            diff = dx if node.axis == 0 else dy
+            if node.left is not None and diff >= -radius:
+                stack.append(node.left)
+            if node.right is not None and diff <= radius:
+                stack.append(node.right)
+        return found
+
+    def depth(self):
+        """返回树的高度（用于检查平衡性）"""
+        height = 0
+        stack = [(self.root, 1)] if self.root else []
+        while stack:
+            node, level = stack.pop()
+            height = max(height, level)
+            if node.left:
+                stack.append((node.left, level + 1))
+            if node.right:
+                stack.append((node.right, level + 1))
+        return height
+
+
+class SpatialIndex:
+    """
+    紧急响应单位的空间索引
+
+    每种单位类型一个KD树分区，并记录每个单位的可用状态：
+        - nearest(x, y, k, types={...}, available_only=True) 只查询所需类型的分区，
+          没有可用单位的分区和子树被整体跳过，而不是先查出来再过滤
+        - move 等价于 remove + insert，并更新单位对象的坐标
+    """
+
+    def __init__(self, units=None):
+        """
+        初始化空间索引
+
+        参数:
+            units: 可选，初始的EmergencyUnit列表，一次性构建平衡的KD树
+        """
+        self.partitions = {}  # unit_type -> KDTree
+        self.unit_types = {}  # unit_id -> unit_type
+        # 单位集合、位置或可用状态每次变化时加1，供查询缓存判断结果是否过期
+        self.version = 0
+        if units:
+            self.rebuild(units)
+
+    def __len__(self):
+        """返回索引中的单位数量"""
+        return len(self.unit_types)
+
+    def __contains__(self, unit):
+        """检查单位是否在索引中"""
+        return unit.unit_id in self.unit_types
+
+    def __iter__(self):
+        """遍历索引中的所有单位"""
+        for partition in self.partitions.values():
+            yield from partition
+
+    @property
+    def deleted(self):
+        """所有分区中带删除标记的节点数"""
+        return sum(partition.deleted for partition in self.partitions.values())
+
+    def rebuild(self, units=None):
+        """
+        重建所有分区
+
+        参数:
+            units: 可选，新的单位列表（全部视为可用）；默认重建当前的单位并保留可用状态
+        """
+        if units is None:
+            for partition in self.partitions.values():
+                partition.rebuild()
+            return
+
+        self.version += 1
+        by_type = {}
+        for unit in units:
+            by_type.setdefault(unit.unit_type, []).append(unit)
+        self.partitions = {}
+        self.unit_types = {}
+        for unit_type, typed_units in by_type.items():
+            for unit in typed_units:
+                if unit.unit_id in self.unit_types:
+                    raise ValueError(f"重复的单位ID: {unit.unit_id}")
+                self.unit_types[unit.unit_id] = unit_type
+            self.partitions[unit_type] = KDTree(typed_units)
+
+    def insert(self, unit, available=True):
+        """
+        插入一个单位
+
+        参数:
+            unit: 要插入的EmergencyUnit，unit_id必须唯一
+            available: 单位是否可用
+        """
+        if unit.unit_id in self.unit_types:
+            raise ValueError(f"单位 {unit.unit_id} 已在索引中")
+        partition = self.partitions.get(unit.unit_type)
+        if partition is None:
+            partition = self.partitions[unit.unit_type] = KDTree()
+        partition.insert(unit, available)
+        self.unit_types[unit.unit_id] = unit.unit_type
+        self.version += 1
+
+    def remove(self, unit):
+        """
+        从索引中删除一个单位
+
+        参数:
+            unit: 要删除的EmergencyUnit（按unit_id匹配）
+
+        返回:
+            bool: 如果删除成功返回True，否则返回False
+        """
+        unit_type = self.unit_types.pop(unit.unit_id, None)
+        if unit_type is None:
+            return False
+        self.version += 1
+        return self.partitions[unit_type].remove(unit)
+
+    def move(self, unit, x, y):
+        """
+        移动单位到新位置并更新索引，保留单位的可用状态
+
+        参数:
+            unit: 要移动的EmergencyUnit
+            x: 新的X坐标
+            y: 新的Y坐标
+        """
+        available = self.is_available(unit)
+        self.remove(unit)
+        unit.location_x = x
+        unit.location_y = y
+        self.insert(unit, available)
+
+    def is_available(self, unit):
+        """返回单位是否可用"""
+        return self.partitions[self.unit_types[unit.unit_id]].is_available(unit)
+
+    def set_available(self, unit, available):
+        """设置单位的可用状态"""
+        self.partitions[self.unit_types[unit.unit_id]].set_available(unit, available)
+        self.version += 1
+
+    def available_count(self, types=None):
+        """返回指定类型（默认全部类型）的可用单位数量"""
+        count = 0
+        for partition in (self.partitions.values() if types is None else self._select(types)):
+            root = partition.root
+            if root is not None:
+                count += root.available_count
+        return count
+
+    def _select(self, types):
+        """返回需要查询的分区"""
+        if types is None:
+            return list(self.partitions.values())
+        return [self.partitions[unit_type] for unit_type in types if unit_type in self.partitions]
+
+    def nearest(self, x, y, k, types=None, available_only=False):
+        """
+        查找离给定坐标最近的k个单位
+
+        参数:
+            x: X坐标
+            y: Y坐标
+            k: 返回的单位数量
+            types: 可选，允许的单位类型集合；默认所有类型
+            available_only: 是否只返回可用单位
+
+        返回:
+            [(unit, distance), ...]，按距离从近到远排序
+        """
+        candidates = []
+        for partition in self._select(types):
+            if available_only and partition.available_count == 0:
+                continue
+            candidates.extend(partition.k_nearest(x, y, k, available_only))
+        if len(candidates) > k:
+            candidates = heapq.nsmallest(k, candidates)
+        else:
+            candidates.sort()
+        return [(unit, math.sqrt(distance)) for distance, _, unit in candidates]
+
+    def k_nearest(self, x, y, k):
+        """查找离给定坐标最近的k个单位（不限类型和可用状态）"""
+        return self.nearest(x, y, k)
+
+    def within_radius(self, x, y, radius, types=None, available_only=False):
+        """
+        查找给定半径内的所有单位
+
+        参数:
+            x: X坐标
+            y: Y坐标
+            radius: 搜索半径
+            types: 可选，允许的单位类型集合
+            available_only: 是否只返回可用单位
+
+        返回:
+            [(unit, distance), ...]，按距离从近到远排序
+        """
+        found = []
+        for partition in self._select(types):
+            found.extend(partition.within_radius(x, y, radius, available_only))
+        found.sort()
+        return [(unit, math.sqrt(distance)) for distance, _, unit in found]
+
+    def depth(self):
+        """返回最深分区的高度（用于检查平衡性）"""
+        return max((partition.depth() for partition in self.partitions.values()), default=0)
@@ -0,0 +1,136 @@
+import queue
+import threading
+import tkinter as tk
+
+
+class TaskCancelled(Exception):
+    """Raised by BackgroundTask.check_cancelled after cancel() was called"""
+
+
+class BackgroundTask:
+    """
+    Run long benchmark work off the Tk main thread
+
+    The work function runs in a daemon thread and never touches Tk. Progress,
+    results and errors are passed back through a queue.Queue which the main
+    thread polls with root.after, so every callback runs on the Tk thread.
+
+    Usage:
+        task = BackgroundTask(root, work, on_done=show_results, on_progress=update_bar)
+        task.start()
+        ...
+        task.cancel()
+
+    The work function receives the task itself and should call
+    task.report_progress(fraction, message) and check task.cancel_event
+    (or call task.check_cancelled()) between units of work.
+    """
+
+    def __init__(self, root, work, on_done=None, on_progress=None, on_error=None,
+                 on_cancelled=None, poll_interval=50):
+        """
+        Parameters:
+            root: Tk widget used to schedule polling with after()
+            work: callable work(task) -> result, run in the background thread
+            on_done: called with the result when work finishes
+            on_progress: called with (fraction, message); only the latest
+                         report since the previous poll is delivered
+            on_error: called with the exception if work fails
+            on_cancelled: called without arguments if the task was cancelled
+            poll_interval: polling interval in milliseconds
+        """
+        self.root = root
+        self.work = work
+        self.on_done = on_done
+        self.on_progress = on_progress
+        self.on_error = on_error
+        self.on_cancelled = on_cancelled
+        self.poll_interval = poll_interval
+
+        self.cancel_event = threading.Event()
+        self._messages = queue.Queue()
+        self._thread = None
+        self._finished = False
+
+    @property
+    def running(self):
+        """True from start() until the final callback has been delivered"""
+        return self._thread is not None and not self._finished
+
+    def start(self):
+        """Start the background thread and begin polling"""
+        if self._thread is not None:
+            raise RuntimeError("Task already started")
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self.root.after(self.poll_interval, self._poll)
+        return self
+
+    def cancel(self):
+        """Ask the work function to stop at its next cancellation check"""
+        self.cancel_event.set()
+
+    def report_progress(self, fraction, message=""):
+        """Called from the work function to stream progress to the GUI"""
+        self._messages.put(('progress', (fraction, message)))
+
+    def check_cancelled(self):
+        """Raise TaskCancelled if cancellation was requested"""
+        if self.cancel_event.is_set():
+            raise TaskCancelled("Task cancelled")
+
+    def _run(self):
+        """Thread body: run the work function and post its outcome"""
+        try:
+            result = self.work(self)
+        except Exception as e:
+            # Any exception raised after cancel() is the work function stopping early
+            if self.cancel_event.is_set():
+                self._messages.put(('cancelled', None))
+            else:
+                self._messages.put(('error', e))
+            return
+        if self.cancel_event.is_set():
+            self._messages.put(('cancelled', None))
+        else:
+            self._messages.put(('done', result))
+
+    def _poll(self):
+        """Drain the message queue on the Tk thread"""
+        # The window was closed: stop the work and drop its results
+        try:
+            alive = self.root.winfo_exists()
+        except tk.TclError:
+            alive = False
+        if not alive:
+            self.cancel()
+            self._finished = True
+            return
+
+        progress = None
+        outcome = None
+        while True:
+            try:
+                kind, payload = self._messages.get_nowait()
+            except queue.Empty:
+                break
+            if kind == 'progress':
+                progress = payload
+            else:
+                outcome = (kind, payload)
+
+        if progress is not None and self.on_progress is not None:
+            self.on_progress(*progress)
+
+        if outcome is None:
+            self.root.after(self.poll_interval, self._poll)
+            return
+
+        self._finished = True
+        kind, payload = outcome
+        if kind == 'done' and self.on_done is not None:
+            self.on_done(payload)
+        elif kind == 'error' and self.on_error is not None:
+            self.on_error(payload)
+        elif kind == 'cancelled' and self.on_cancelled is not None:
+            self.on_cancelled()
@@ -8,13 +8,14 @@ from tkinter import ttk, messagebox
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import time
-import random
 import numpy as np
-from emergency_response.data_structures.emergency import Emergency, EmergencyType
+from emergency_response.data_structures.emergency import EmergencyType
 from emergency_response.data_structures.linked_list import LinkedListPriorityQueue
 from emergency_response.data_structures.binary_tree import BinaryTreePriorityQueue
 from emergency_response.data_structures.heap import HeapPriorityQueue
-from emergency_response.utils.performance_analyzer import PerformanceAnalyzer
+from emergency_response.utils.performance_analyzer import PerformanceAnalyzer, SPACE_METHODS
+from emergency_response.gui.background_worker import BackgroundTask
+from emergency_response.utils.workload import WorkloadGenerator, ORDERINGS, SEVERITY_DISTRIBUTIONS
 
 class EmergencySimulationGUI:
     """Emergency Dispatch Simulation Interface"""
@@ -41,11 +42,27 @@ class EmergencySimulationGUI:
         # Simulation parameters
         self.emergency_count = tk.IntVar(value=1000)
         self.simulation_runs = tk.IntVar(value=5)
+        self.ordering = tk.StringVar(value="random")
+        self.severity_distribution = tk.StringVar(value="uniform")
+        self.seed = tk.StringVar(value="")
+        # Space test memory measurement (asizeof is exact but slow; layout scales to 10^6)
+        self.space_method = tk.StringVar(value="asizeof")
+        
+        # Mixed workload parameters (operation ratio in percent)
+        self.target_depth = tk.IntVar(value=1000)
+        self.mixed_operation_count = tk.IntVar(value=10000)
+        self.enqueue_ratio = tk.IntVar(value=45)
+        self.dequeue_ratio = tk.IntVar(value=45)
+        self.change_priority_ratio = tk.IntVar(value=10)
         self.emergency_types = [EmergencyType.FIRE, EmergencyType.MEDICAL, EmergencyType.POLICE]
         self.locations = ["Downtown", "Suburbs", "Industrial Zone", "Residential Area", "Commercial District"]
         
+        # Benchmark running in the background, if any
+        self.task = None
+        
         # Create interface components
         self._create_widgets()
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
         
         # Simulation results
         self.results = {}
@@ -76,7 +93,7 @@ class EmergencySimulationGUI:
         ttk.Spinbox(
             count_frame, 
             from_=100, 
-            to=10000, 
+            to=1000000, 
             increment=100, 
             textvariable=self.emergency_count,
             width=8
@@ -96,31 +113,103 @@ class EmergencySimulationGUI:
             width=8
         ).pack(side=tk.LEFT, padx=5)
         
-        # Run buttons
-        button_frame = ttk.Frame(control_frame)
-        button_frame.pack(fill=tk.X, pady=10)
+        # Workload shape
+        workload_frame = ttk.Frame(control_frame)
+        workload_frame.pack(fill=tk.X, pady=5)
+        
+        ttk.Label(workload_frame, text="Arrival Order:").pack(side=tk.LEFT, padx=5)
+        ttk.Combobox(
+            workload_frame,
+            textvariable=self.ordering,
+            values=ORDERINGS,
+            state="readonly",
+            width=12
+        ).pack(side=tk.LEFT, padx=5)
         
-        ttk.Button(
-            button_frame, 
-            text="Run Simulation",
-            width=15,
-            command=self._run_simulation
+        ttk.Label(workload_frame, text="Severity Distribution:").pack(side=tk.LEFT, padx=5)
+        ttk.Combobox(
+            workload_frame,
+            textvariable=self.severity_distribution,
+            values=SEVERITY_DISTRIBUTIONS,
+            state="readonly",
+            width=10
         ).pack(side=tk.LEFT, padx=5)
         
-        ttk.Button(
-            button_frame, 
-            text="Run Space Test",
-            width=15,
-            command=self._run_space_test
+        ttk.Label(workload_frame, text="Seed (optional):").pack(side=tk.LEFT, padx=5)
+        ttk.Entry(workload_frame, textvariable=self.seed, width=8).pack(side=tk.LEFT, padx=5)
+        
+        # Steady-state mixed workload
+        mixed_frame = ttk.Frame(control_frame)
+        mixed_frame.pack(fill=tk.X, pady=5)
+        
+        ttk.Label(mixed_frame, text="Target Queue Depth:").pack(side=tk.LEFT, padx=5)
+        ttk.Spinbox(
+            mixed_frame,
+            from_=10,
+            to=100000,
+            increment=100,
+            textvariable=self.target_depth,
+            width=8
         ).pack(side=tk.LEFT, padx=5)
         
-        ttk.Button(
-            button_frame, 
-            text="Clear Results",
-            width=15,
-            command=self._clear_results
+        ttk.Label(mixed_frame, text="Operations:").pack(side=tk.LEFT, padx=5)
+        ttk.Spinbox(
+            mixed_frame,
+            from_=100,
+            to=1000000,
+            increment=1000,
+            textvariable=self.mixed_operation_count,
+            width=8
+        ).pack(side=tk.LEFT, padx=5)
+        
+        ttk.Label(mixed_frame, text="Ratio % (Enqueue/Dequeue/Change):").pack(side=tk.LEFT, padx=5)
+        for ratio_var in (self.enqueue_ratio, self.dequeue_ratio, self.change_priority_ratio):
+            ttk.Spinbox(
+                mixed_frame,
+                from_=0,
+                to=100,
+                increment=5,
+                textvariable=ratio_var,
+                width=4
+            ).pack(side=tk.LEFT, padx=2)
+        
+        # Space test settings
+        space_frame = ttk.Frame(control_frame)
+        space_frame.pack(fill=tk.X, pady=5)
+        
+        ttk.Label(space_frame, text="Space Measurement:").pack(side=tk.LEFT, padx=5)
+        ttk.Combobox(
+            space_frame,
+            textvariable=self.space_method,
+            values=SPACE_METHODS,
+            state="readonly",
+            width=12
         ).pack(side=tk.LEFT, padx=5)
         
+        # Run buttons
+        button_frame = ttk.Frame(control_frame)
+        button_frame.pack(fill=tk.X, pady=10)
+        
+        self.run_buttons = []
+        for text, width, command in (
+            ("Run Simulation", 15, self._run_simulation),
+            ("Run Space Test", 15, self._run_space_test),
+            ("Run Mixed Workload", 20, self._run_mixed_workload),
+            ("Clear Results", 15, self._clear_results)
+        ):
+            button = ttk.Button(button_frame, text=text, width=width, command=command)
+            button.pack(side=tk.LEFT, padx=5)
+            self.run_buttons.append(button)
+        
+        self.cancel_button = ttk.Button(
+            button_frame, 
+            text="Cancel",
+            width=10,
+            command=self._cancel_task,
+            state=tk.DISABLED
+        )
+        self.cancel_button.pack(side=tk.LEFT, padx=5)
+        
         # Results area
         results_frame = ttk.LabelFrame(main_frame, text="Simulation Results", padding="10")
         results_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
@@ -156,6 +245,14 @@ class EmergencySimulationGUI:
         self.space_canvas = FigureCanvasTkAgg(self.space_figure, master=space_tab)
         self.space_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
         
+        # Steady-state mixed workload tab
+        mixed_tab = ttk.Frame(tab_control, padding="10")
+        tab_control.add(mixed_tab, text="Mixed Workload")
+        
+        self.mixed_figure = plt.Figure(figsize=(8, 5), dpi=100)
+        self.mixed_canvas = FigureCanvasTkAgg(self.mixed_figure, master=mixed_tab)
+        self.mixed_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        
         # Simulation details tab
         details_tab = ttk.Frame(tab_control, padding="10")
         tab_control.add(details_tab, text="Details")
@@ -172,241 +269,388 @@ class EmergencySimulationGUI:
         
         scrollbar.config(command=self.details_text.yview)
         
-        # Status bar
+        # Status bar with progress of the running benchmark
         self.status_var = tk.StringVar(value="Ready to run simulation")
         status_bar = ttk.Label(main_frame, textvariable=self.status_var, relief=tk.SUNKEN, anchor=tk.W)
         status_bar.pack(fill=tk.X, side=tk.BOTTOM, pady=5)
-    
-    def _generate_random_emergencies(self, count):
-        """Generate random emergency data"""
-        emergencies = []
-        
-        for i in range(count):
-            emergency_id = i + 1
-            emergency_type = random.choice(self.emergency_types)
-            severity_level = random.randint(1, 10)
-            location = random.choice(self.locations)
-            
-            x = random.uniform(0, 100)
-            y = random.uniform(0, 100)
-            
-            emergency = Emergency(
-                emergency_id=emergency_id,
-                emergency_type=emergency_type,
-                severity_level=severity_level,
-                location=location,
-                coordinates=(x, y)
-            )
-            
-            emergencies.append(emergency)
         
-        return emergencies
+        self.progress_var = tk.DoubleVar(value=0)
+        ttk.Progressbar(main_frame, variable=self.progress_var, maximum=100).pack(fill=tk.X, side=tk.BOTTOM)
+    
+    def _create_workload(self):
+        """Create a workload generator from the current parameters"""
+        seed_text = self.seed.get().strip()
+        seed = int(seed_text) if seed_text else None
+        return WorkloadGenerator(
+            seed=seed,
+            ordering=self.ordering.get(),
+            severity_distribution=self.severity_distribution.get(),
+            emergency_types=self.emergency_types,
+            locations=self.locations
+        )
+    
+    def _generate_random_emergencies(self, count, workload=None):
+        """Generate emergency data with the selected workload shape"""
+        workload = workload or self._create_workload()
+        return workload.generate_emergencies(count)
     
+    def _start_task(self, description, work, on_done):
+        """
+        Run benchmark work in a background thread
+
+        Parameters:
+            description: name shown in the status bar, e.g. "Simulation"
+            work: callable work(task) run off the Tk thread; must not touch widgets
+            on_done: called on the Tk thread with the result of work
+        """
+        def progress(fraction, message):
+            self.progress_var.set(fraction * 100)
+            self.status_var.set(f"Running {description.lower()}... {message}")
+
+        def done(result):
+            self._set_running(False)
+            self.progress_var.set(100)
+            on_done(result)
+            self.status_var.set(f"{description} completed")
+
+        def failed(error):
+            self._set_running(False)
+            messagebox.showerror("Error", f"{description} failed: {str(error)}")
+            self.status_var.set(f"{description} failed")
+
+        def cancelled():
+            self._set_running(False)
+            self.progress_var.set(0)
+            self.status_var.set(f"{description} cancelled")
+
+        self.status_var.set(f"Running {description.lower()}...")
+        self.progress_var.set(0)
+        self._set_running(True)
+        self.task = BackgroundTask(
+            self.root, work,
+            on_done=done, on_progress=progress, on_error=failed, on_cancelled=cancelled
+        ).start()
+
+    def _set_running(self, running):
+        """Enable the cancel button only while a benchmark runs"""
+        for button in self.run_buttons:
+            button.config(state=tk.DISABLED if running else tk.NORMAL)
+        self.cancel_button.config(state=tk.NORMAL if running else tk.DISABLED)
+        if not running:
+            self.task = None
+
+    def _cancel_task(self):
+        """Ask the running benchmark to stop at its next checkpoint"""
+        if self.task is not None:
+            self.task.cancel()
+            self.status_var.set("Cancelling...")
+
+    def _on_close(self):
+        """Stop the background benchmark before closing the window"""
+        if self.task is not None:
+            self.task.cancel()
+        self.root.destroy()
+
     def _run_simulation(self):
         """Run simulation"""
+        # Get parameters (a non-numeric Spinbox or seed raises before anything starts)
         try:
-            # Get parameters
             count = self.emergency_count.get()
             runs = self.simulation_runs.get()
-            
-            if count <= 0 or runs <= 0:
-                messagebox.showerror("Error", "Number of emergencies and simulation runs must be positive")
-                return
-            
-            # Clear results
-            self.results = {
-                'linked_list': {'enqueue': [], 'dequeue': [], 'total': []},
-                'binary_tree': {'enqueue': [], 'dequeue': [], 'total': []},
-                'heap': {'enqueue': [], 'dequeue': [], 'total': []}
-            }
-            
-            # Update status
-            self.status_var.set("Running simulation...")
-            self.root.update()
-            
+            # One generator for all runs: a fixed seed reproduces the whole sequence
+            workload = self._create_workload()
+        except (tk.TclError, ValueError) as e:
+            messagebox.showerror("Error", f"Invalid simulation parameters: {str(e)}")
+            return
+
+        if count <= 0 or runs <= 0:
+            messagebox.showerror("Error", "Number of emergencies and simulation runs must be positive")
+            return
+
+        # Clear results
+        self.results = {
+            'linked_list': {'enqueue': [], 'dequeue': [], 'total': []},
+            'binary_tree': {'enqueue': [], 'dequeue': [], 'total': []},
+            'heap': {'enqueue': [], 'dequeue': [], 'total': []}
+        }
+
+        # The default heap capacity (1000) is too small for large runs
+        if self.heap_queue.max_size < count:
+            self.heap_queue = HeapPriorityQueue(max_size=count)
+
+        queues = [
+            ('linked_list', self.linked_list_queue),
+            ('binary_tree', self.binary_tree_queue),
+            ('heap', self.heap_queue)
+        ]
+
+        def work(task):
             # Run multiple simulations and average the results
             for run in range(runs):
                 # Generate random emergencies
-                emergencies = self._generate_random_emergencies(count)
-                
+                emergencies = self._generate_random_emergencies(count, workload)
+
                 # Simulate each queue type
-                self._simulate_queue('linked_list', self.linked_list_queue, emergencies)
-                self._simulate_queue('binary_tree', self.binary_tree_queue, emergencies)
-                self._simulate_queue('heap', self.heap_queue, emergencies)
-                
-                # Update progress
-                self.status_var.set(f"Running simulation... ({run+1}/{runs})")
-                self.root.update()
-            
-            # Calculate averages
-            linked_list_avg = {
-                'enqueue': sum(self.results['linked_list']['enqueue']) / runs,
-                'dequeue': sum(self.results['linked_list']['dequeue']) / runs,
-                'total': sum(self.results['linked_list']['total']) / runs
-            }
-            
-            binary_tree_avg = {
-                'enqueue': sum(self.results['binary_tree']['enqueue']) / runs,
-                'dequeue': sum(self.results['binary_tree']['dequeue']) / runs,
-                'total': sum(self.results['binary_tree']['total']) / runs
-            }
-            
-            heap_avg = {
-                'enqueue': sum(self.results['heap']['enqueue']) / runs,
-                'dequeue': sum(self.results['heap']['dequeue']) / runs,
-                'total': sum(self.results['heap']['total']) / runs
-            }
-            
-            # Plot results
-            self._plot_time_comparison(linked_list_avg, binary_tree_avg, heap_avg)
-            self._plot_throughput_comparison(linked_list_avg, binary_tree_avg, heap_avg, count)
-            
-            # Display detailed results
-            self.details_text.delete(1.0, tk.END)
-            self.details_text.insert(tk.END, f"Simulation Results (Average of {runs} runs, {count} emergencies each):\n\n")
-            
-            self.details_text.insert(tk.END, "Linked List Priority Queue:\n")
-            self.details_text.insert(tk.END, f"  Enqueue Time: {linked_list_avg['enqueue']:.6f} seconds\n")
-            self.details_text.insert(tk.END, f"  Dequeue Time: {linked_list_avg['dequeue']:.6f} seconds\n")
-            self.details_text.insert(tk.END, f"  Total Time: {linked_list_avg['total']:.6f} seconds\n\n")
-            
-            self.details_text.insert(tk.END, "Binary Tree Priority Queue:\n")
-            self.details_text.insert(tk.END, f"  Enqueue Time: {binary_tree_avg['enqueue']:.6f} seconds\n")
-            self.details_text.insert(tk.END, f"  Dequeue Time: {binary_tree_avg['dequeue']:.6f} seconds\n")
-            self.details_text.insert(tk.END, f"  Total Time: {binary_tree_avg['total']:.6f} seconds\n\n")
-            
-            self.details_text.insert(tk.END, "Heap Priority Queue:\n")
-            self.details_text.insert(tk.END, f"  Enqueue Time: {heap_avg['enqueue']:.6f} seconds\n")
-            self.details_text.insert(tk.END, f"  Dequeue Time: {heap_avg['dequeue']:.6f} seconds\n")
-            self.details_text.insert(tk.END, f"  Total Time: {heap_avg['total']:.6f} seconds\n\n")
-            
-            # Calculate improvement percentages
-            ll_total = linked_list_avg['total']
-            bt_total = binary_tree_avg['total']
-            heap_total = heap_avg['total']
-            
-            bt_improvement = ((ll_total - bt_total) / ll_total) * 100
-            heap_improvement = ((ll_total - heap_total) / ll_total) * 100
-            
-            self.details_text.insert(tk.END, "Performance Improvement:\n")
-            self.details_text.insert(tk.END, f"  Binary Tree vs. Linked List: {bt_improvement:.2f}%\n")
-            self.details_text.insert(tk.END, f"  Heap vs. Linked List: {heap_improvement:.2f}%\n\n")
-            
-            fastest = min(ll_total, bt_total, heap_total)
-            if fastest == ll_total:
-                fastest_name = "Linked List"
-            elif fastest == bt_total:
-                fastest_name = "Binary Tree"
-            else:
-                fastest_name = "Heap"
-                
-            self.details_text.insert(tk.END, f"Fastest Implementation: {fastest_name} Priority Queue\n")
-            
-            # Update status
-            self.status_var.set("Simulation completed")
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Simulation failed: {str(e)}")
-            self.status_var.set("Simulation failed")
-    
+                for index, (queue_name, queue) in enumerate(queues):
+                    self._simulate_queue(queue_name, queue, emergencies, task)
+                    task.report_progress(
+                        (run * len(queues) + index + 1) / (runs * len(queues)),
+                        f"({run+1}/{runs})"
+                    )
+
+        self._start_task("Simulation", work, lambda result: self._show_simulation_results(count, runs))
+
+    def _show_simulation_results(self, count, runs):
+        """Plot and describe the averaged simulation results"""
+        # Calculate averages
+        linked_list_avg = {
+            'enqueue': sum(self.results['linked_list']['enqueue']) / runs,
+            'dequeue': sum(self.results['linked_list']['dequeue']) / runs,
+            'total': sum(self.results['linked_list']['total']) / runs
+        }
+
+        binary_tree_avg = {
+            'enqueue': sum(self.results['binary_tree']['enqueue']) / runs,
+            'dequeue': sum(self.results['binary_tree']['dequeue']) / runs,
+            'total': sum(self.results['binary_tree']['total']) / runs
+        }
+
+        heap_avg = {
+            'enqueue': sum(self.results['heap']['enqueue']) / runs,
+            'dequeue': sum(self.results['heap']['dequeue']) / runs,
+            'total': sum(self.results['heap']['total']) / runs
+        }
+
+        # Plot results
+        self._plot_time_comparison(linked_list_avg, binary_tree_avg, heap_avg)
+        self._plot_throughput_comparison(linked_list_avg, binary_tree_avg, heap_avg, count)
+
+        # Display detailed results
+        self.details_text.delete(1.0, tk.END)
+        self.details_text.insert(tk.END, f"Simulation Results (Average of {runs} runs, {count} emergencies each):\n\n")
+
+        self.details_text.insert(tk.END, "Linked List Priority Queue:\n")
+        self.details_text.insert(tk.END, f"  Enqueue Time: {linked_list_avg['enqueue']:.6f} seconds\n")
+        self.details_text.insert(tk.END, f"  Dequeue Time: {linked_list_avg['dequeue']:.6f} seconds\n")
+        self.details_text.insert(tk.END, f"  Total Time: {linked_list_avg['total']:.6f} seconds\n\n")
+
+        self.details_text.insert(tk.END, "Binary Tree Priority Queue:\n")
+        self.details_text.insert(tk.END, f"  Enqueue Time: {binary_tree_avg['enqueue']:.6f} seconds\n")
+        self.details_text.insert(tk.END, f"  Dequeue Time: {binary_tree_avg['dequeue']:.6f} seconds\n")
+        self.details_text.insert(tk.END, f"  Total Time: {binary_tree_avg['total']:.6f} seconds\n\n")
+
+        self.details_text.insert(tk.END, "Heap Priority Queue:\n")
+        self.details_text.insert(tk.END, f"  Enqueue Time: {heap_avg['enqueue']:.6f} seconds\n")
+        self.details_text.insert(tk.END, f"  Dequeue Time: {heap_avg['dequeue']:.6f} seconds\n")
+        self.details_text.insert(tk.END, f"  Total Time: {heap_avg['total']:.6f} seconds\n\n")
+
+        # Calculate improvement percentages
+        ll_total = linked_list_avg['total']
+        bt_total = binary_tree_avg['total']
+        heap_total = heap_avg['total']
+
+        bt_improvement = ((ll_total - bt_total) / ll_total) * 100
+        heap_improvement = ((ll_total - heap_total) / ll_total) * 100
+
+        self.details_text.insert(tk.END, "Performance Improvement:\n")
+        self.details_text.insert(tk.END, f"  Binary Tree vs. Linked List: {bt_improvement:.2f}%\n")
+        self.details_text.insert(tk.END, f"  Heap vs. Linked List: {heap_improvement:.2f}%\n\n")
+
+        fastest = min(ll_total, bt_total, heap_total)
+        if fastest == ll_total:
+            fastest_name = "Linked List"
+        elif fastest == bt_total:
+            fastest_name = "Binary Tree"
+        else:
+            fastest_name = "Heap"
+
+        self.details_text.insert(tk.END, f"Fastest Implementation: {fastest_name} Priority Queue\n")
+
     def _run_space_test(self):
         """运行空间复杂度测试"""
+        # 获取参数
         try:
-            # 获取参数
             count = self.emergency_count.get()
-            
-            if count <= 0:
-                messagebox.showerror("Error", "Number of emergencies must be positive")
-                return
-            
-            # 更新状态
-            self.status_var.set("Running space complexity test...")
-            self.root.update()
-            
-            # 定义不同的数据大小
-            # 使用更多的数据点以获得更平滑的曲线
-            max_size = count
-            # 确保至少有8个数据点
-            data_sizes = []
-            if max_size <= 1000:
-                # 对于较小的数据集，使用均匀间隔
-                step = max(1, max_size // 8)
-                data_sizes = list(range(step, max_size + 1, step))
-            else:
-                # 对于较大的数据集，使用指数间隔，以便更好地观察趋势
-                sizes = [100, 200, 400, 600, 800, 1000]
-                sizes.extend([s for s in range(2000, max_size + 1, 1000) if s <= max_size])
-                if max_size not in sizes:
-                    sizes.append(max_size)
-                data_sizes = sizes
-            
-            # 执行空间复杂度测试
-            self.performance_analyzer.measure_space_complexity(data_sizes)
-            
-            # 绘制结果
-            self._plot_space_comparison(data_sizes)
-            
-            # 更新详细信息
-            self.details_text.delete(1.0, tk.END)
-            self.details_text.insert(tk.END, f"Space Complexity Test Results (Max size: {max_size} emergencies):\n\n")
-            
-            space_results = self.performance_analyzer.results.get('space', {})
-            
-            if 'Linked List' in space_results and space_results['Linked List']:
-                ll_space = space_results['Linked List'][-1]
-                self.details_text.insert(tk.END, f"Linked List Memory Usage: {ll_space:.6f} KB\n\n")
-            
-            if 'Binary Tree' in space_results and space_results['Binary Tree']:
-                bt_space = space_results['Binary Tree'][-1]
-                self.details_text.insert(tk.END, f"Binary Tree Memory Usage: {bt_space:.6f} KB\n\n")
-            
-            if 'Heap' in space_results and space_results['Heap']:
-                heap_space = space_results['Heap'][-1]
-                self.details_text.insert(tk.END, f"Heap Memory Usage: {heap_space:.6f} KB\n\n")
-            
-            # 理论复杂度分析
-            complexity_analysis = self.performance_analyzer.get_complexity_analysis()
-            space_complexity = complexity_analysis['space']
-            
-            self.details_text.insert(tk.END, "Theoretical Space Complexity:\n")
-            for i, structure in enumerate(space_complexity['Data Structure']):
-                self.details_text.insert(tk.END, f"  {structure}: {space_complexity['Complexity'][i]}\n")
-            
-            # 更新状态
-            self.status_var.set("Space complexity test completed")
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Space complexity test failed: {str(e)}")
-            self.status_var.set("Space complexity test failed")
-    
-    def _simulate_queue(self, queue_name, queue, emergencies):
-        """Simulate operations on a specific queue type"""
+        except tk.TclError as e:
+            messagebox.showerror("Error", f"Invalid number of emergencies: {str(e)}")
+            return
+
+        if count <= 0:
+            messagebox.showerror("Error", "Number of emergencies must be positive")
+            return
+
+        # 定义不同的数据大小
+        # 使用更多的数据点以获得更平滑的曲线
+        max_size = count
+        # 确保至少有8个数据点
+        data_sizes = []
+        if max_size <= 1000:
+            # 对于较小的数据集，使用均匀间隔
+            step = max(1, max_size // 8)
+            data_sizes = list(range(step, max_size + 1, step))
+        else:
+            # 对于较大的数据集，使用指数间隔，以便更好地观察趋势
+            sizes = [100, 200, 400, 600, 800, 1000]
+            sizes.extend([s for s in range(2000, max_size + 1, 1000) if s <= max_size])
+            if max_size not in sizes:
+                sizes.append(max_size)
+            data_sizes = sizes
+
+        # 在主线程中读取测量方式，后台线程不访问Tk变量
+        method = self.space_method.get()
+
+        def work(task):
+            # 执行空间复杂度测试，进度和取消请求通过分析器的钩子传递
+            self.performance_analyzer.progress_callback = task.report_progress
+            self.performance_analyzer.cancel_event = task.cancel_event
+            try:
+                self.performance_analyzer.measure_space_complexity(data_sizes, method)
+            finally:
+                self.performance_analyzer.progress_callback = None
+                self.performance_analyzer.cancel_event = None
+
+        self._start_task("Space complexity test", work,
+                         lambda result: self._show_space_results(data_sizes, max_size, method))
+
+    def _show_space_results(self, data_sizes, max_size, method):
+        """显示空间复杂度测试结果"""
+        # 绘制结果
+        self._plot_space_comparison(data_sizes)
+
+        # 更新详细信息
+        self.details_text.delete(1.0, tk.END)
+        self.details_text.insert(tk.END, f"Space Complexity Test Results (Max size: {max_size} emergencies, "
+                                         f"measured with {method}):\n\n")
+
+        space_results = self.performance_analyzer.results.get('space', {})
+
+        if 'Linked List' in space_results and space_results['Linked List']:
+            ll_space = space_results['Linked List'][-1]
+            self.details_text.insert(tk.END, f"Linked List Memory Usage: {ll_space:.6f} KB\n\n")
+
+        if 'Binary Tree' in space_results and space_results['Binary Tree']:
+            bt_space = space_results['Binary Tree'][-1]
+            self.details_text.insert(tk.END, f"Binary Tree Memory Usage: {bt_space:.6f} KB\n\n")
+
+        if 'Heap' in space_results and space_results['Heap']:
+            heap_space = space_results['Heap'][-1]
+            self.details_text.insert(tk.END, f"Heap Memory Usage: {heap_space:.6f} KB\n\n")
+
+        # 理论复杂度分析
+        complexity_analysis = self.performance_analyzer.get_complexity_analysis()
+        space_complexity = complexity_analysis['space']
+
+        self.details_text.insert(tk.END, "Theoretical Space Complexity:\n")
+        for i, structure in enumerate(space_complexity['Data Structure']):
+            self.details_text.insert(tk.END, f"  {structure}: {space_complexity['Complexity'][i]}\n")
+
+    def _run_mixed_workload(self):
+        """Run the steady-state mixed-operation benchmark"""
+        try:
+            target_depth = self.target_depth.get()
+            operation_count = self.mixed_operation_count.get()
+            ratios = {
+                'enqueue': self.enqueue_ratio.get(),
+                'dequeue': self.dequeue_ratio.get(),
+                'change_priority': self.change_priority_ratio.get()
+            }
+            workload = self._create_workload()
+        except (tk.TclError, ValueError) as e:
+            messagebox.showerror("Error", f"Invalid mixed workload parameters: {str(e)}")
+            return
+
+        if target_depth <= 0 or operation_count <= 0:
+            messagebox.showerror("Error", "Target queue depth and number of operations must be positive")
+            return
+        if sum(ratios.values()) <= 0 or min(ratios.values()) < 0:
+            messagebox.showerror("Error", "Operation ratios must be non-negative and not all zero")
+            return
+
+        def work(task):
+            analyzer = PerformanceAnalyzer(
+                workload=workload,
+                progress_callback=task.report_progress,
+                cancel_event=task.cancel_event
+            )
+            return analyzer.measure_mixed_workload(target_depth, operation_count, ratios)
+
+        self._start_task(
+            "Mixed workload", work,
+            lambda results: self._show_mixed_results(results, target_depth, operation_count, ratios)
+        )
+
+    def _show_mixed_results(self, results, target_depth, operation_count, ratios):
+        """Plot and describe the mixed workload results"""
+        self._plot_mixed_workload(results)
+
+        # Display detailed results
+        self.details_text.delete(1.0, tk.END)
+        self.details_text.insert(
+            tk.END,
+            f"Mixed Workload Results (depth {target_depth}, {operation_count} operations, "
+            f"ratio {ratios['enqueue']}/{ratios['dequeue']}/{ratios['change_priority']}):\n\n"
+        )
+        for queue_name, result in results.items():
+            self.details_text.insert(tk.END, f"{queue_name} Priority Queue:\n")
+            self.details_text.insert(tk.END, f"  Sustained Throughput: {result['ops_per_sec']:.0f} ops/sec\n")
+            for op_name, latencies in result['latencies'].items():
+                if not latencies:
+                    continue
+                percentiles = PerformanceAnalyzer.latency_percentiles(latencies)
+                self.details_text.insert(
+                    tk.END,
+                    f"  {op_name}: {len(latencies)} ops, "
+                    f"p50 {percentiles[50] * 1e6:.2f} us, "
+                    f"p95 {percentiles[95] * 1e6:.2f} us, "
+                    f"p99 {percentiles[99] * 1e6:.2f} us\n"
+                )
+            self.details_text.insert(tk.END, "\n")
+
+    def _simulate_queue(self, queue_name, queue, emergencies, task=None):
+        """
+        Simulate operations on a specific queue type
+
+        Operations are timed in chunks so that a cancellation request can be
+        checked between chunks without the check being timed.
+        """
+        chunk_size = 1000
+
         # Clear the queue
         while not queue.is_empty():
             queue.dequeue()
-        
+
         # Measure enqueue time
-        start_time = time.perf_counter()
-        for emergency in emergencies:
-            queue.enqueue(emergency)
-        end_time = time.perf_counter()
-        enqueue_time = end_time - start_time
-        
+        enqueue_time = 0
+        for start in range(0, len(emergencies), chunk_size):
+            if task is not None:
+                task.check_cancelled()
+            chunk = emergencies[start:start + chunk_size]
+            start_time = time.perf_counter()
+            for emergency in chunk:
+                queue.enqueue(emergency)
+            end_time = time.perf_counter()
+            enqueue_time += end_time - start_time
+
         # Measure dequeue time
-        start_time = time.perf_counter()
+        dequeue_time = 0
         while not queue.is_empty():
-            queue.dequeue()
-        end_time = time.perf_counter()
-        dequeue_time = end_time - start_time
-        
+            if task is not None:
+                task.check_cancelled()
+            chunk = range(min(chunk_size, len(queue)))
+            start_time = time.perf_counter()
+            for _ in chunk:
+                queue.dequeue()
+            end_time = time.perf_counter()
+            dequeue_time += end_time - start_time
+
         # Calculate total time
         total_time = enqueue_time + dequeue_time
-        
+
         # Store results
         self.results[queue_name]['enqueue'].append(enqueue_time)
         self.results[queue_name]['dequeue'].append(dequeue_time)
         self.results[queue_name]['total'].append(total_time)
-    
+
     def _plot_time_comparison(self, linked_list_avg, binary_tree_avg, heap_avg):
         """Plot time comparison chart"""
         # Clear previous plot
@@ -512,6 +756,42 @@ class EmergencySimulationGUI:
         # 重绘画布
         self.space_canvas.draw()
     
+    def _plot_mixed_workload(self, results):
+        """Plot sustained throughput and per-operation latency histograms"""
+        self.mixed_figure.clear()
+        
+        queue_types = list(results.keys())
+        
+        # Sustained throughput
+        ax = self.mixed_figure.add_subplot(221)
+        ax.bar(queue_types, [results[name]['ops_per_sec'] for name in queue_types], color=['C0', 'C1', 'C2'])
+        ax.set_ylabel('Operations per Second')
+        ax.set_title('Sustained Throughput')
+        
+        # One latency histogram per operation, log-spaced bins in microseconds
+        for position, op_name in zip((222, 223, 224), ('enqueue', 'dequeue', 'change_priority')):
+            ax = self.mixed_figure.add_subplot(position)
+            all_latencies = [
+                value * 1e6
+                for name in queue_types
+                for value in results[name]['latencies'][op_name]
+                if value > 0
+            ]
+            if all_latencies:
+                bins = np.logspace(np.log10(min(all_latencies)), np.log10(max(all_latencies)), 40)
+                for name in queue_types:
+                    values = [value * 1e6 for value in results[name]['latencies'][op_name] if value > 0]
+                    if values:
+                        ax.hist(values, bins=bins, histtype='step', label=name)
+                ax.set_xscale('log')
+                ax.legend(fontsize=7)
+            ax.set_xlabel('Latency (us)')
+            ax.set_ylabel('Count')
+            ax.set_title(f'{op_name} Latency')
+        
+        self.mixed_figure.tight_layout()
+        self.mixed_canvas.draw()
+    
     def _clear_results(self):
         """Clear simulation results"""
         # Clear results data
@@ -527,6 +807,9 @@ class EmergencySimulationGUI:
         self.space_figure.clear()
         self.space_canvas.draw()
         
+        self.mixed_figure.clear()
+        self.mixed_canvas.draw()
+        
         # Clear details text
         self.details_text.delete(1.0, tk.END)
         
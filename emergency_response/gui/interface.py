@@ -13,11 +13,36 @@ from ..data_structures.linked_list import LinkedListPriorityQueue
 from ..data_structures.binary_tree import BinaryTreePriorityQueue
 from ..data_structures.heap import HeapPriorityQueue
 from ..utils.data_loader import load_emergency_data, initialize_priority_queues
-# 导入性能分析工具
-from ..utils.performance_analyzer import compare_performance
+from ..utils.incremental_stats import IncrementalStats
+from ..utils.streaming_stats import StreamingStats
 # 导入自定义对话框
 from .custom_dialogs import AddEmergencyDialog
 from .statistics import run_statistics_gui
+from .virtual_list import VirtualTreeview
+from .live_charts import LivePieChart, LiveBarChart, ThrottledDraw
+from .tree_layout import TreeLayout, TreeViewport, CanvasNode, NodeGrid, NODE_RADIUS, MIN_NODE_SPACING
+
+# 队列变更事件的合并窗口（毫秒）：窗口内的所有事件只触发一次重绘
+EVENT_COALESCE_MS = 50
+
+# 类型分布饼图中每种紧急情况的颜色
+TYPE_COLORS = {
+    EmergencyType.FIRE: 'red',
+    EmergencyType.MEDICAL: 'green',
+    EmergencyType.POLICE: 'blue',
+    EmergencyType.TRAFFIC: 'orange',
+    EmergencyType.NATURAL: 'purple',
+}
+
+def priority_key(emergency, severity):
+    """
+    返回队列中使用的排序键：严重程度数值越小越靠前，相同时ID越小越靠前
+
+    参数:
+        emergency: 紧急情况对象
+        severity: 计算排序键使用的严重程度（可以是更改前的值）
+    """
+    return (severity, emergency.emergency_id)
 
 class EmergencyResponseGUI:
     """应急响应管理系统的图形用户界面"""
@@ -48,6 +73,18 @@ class EmergencyResponseGUI:
         # 当前选择的队列
         self.current_queue = self.heap_queue
         
+        # 等待合并处理的队列变更事件
+        self.pending_events = []
+        self._refresh_job = None
+        self.display_mode = None
+        for queue in (self.linked_list_queue, self.binary_tree_queue, self.heap_queue):
+            queue.subscribe(self._on_queue_event)
+        
+        # 三个队列的内容相同，统计只需跟踪其中一个
+        self.stats = IncrementalStats.attach(self.heap_queue)
+        # 最近一个时间窗口内的到达速率、严重程度分布和等待时间
+        self.stream_stats = StreamingStats.attach(self.heap_queue)
+        
         # 创建界面组件
         self._create_widgets()
         
@@ -150,9 +187,19 @@ class EmergencyResponseGUI:
         self.queue_display_container = ttk.Frame(queue_frame)
         self.queue_display_container.pack(fill=tk.BOTH, expand=True)
         
-        # 1. Treeview (用于列表显示)
+        # 1. Treeview (用于列表显示)，只创建可见的行
         columns = ("id", "type", "severity", "location")
-        self.queue_tree_view = ttk.Treeview(self.queue_display_container, columns=columns, show="headings")
+        self.queue_list = VirtualTreeview(
+            self.queue_display_container,
+            columns,
+            lambda emergency: (
+                emergency.emergency_id,
+                emergency.type.name,
+                emergency.severity_level,
+                emergency.location
+            )
+        )
+        self.queue_tree_view = self.queue_list.tree
         self.queue_tree_view.heading("id", text="ID")
         self.queue_tree_view.heading("type", text="Type")
         self.queue_tree_view.heading("severity", text="Severity (Lower value = Higher priority)")
@@ -162,15 +209,17 @@ class EmergencyResponseGUI:
         self.queue_tree_view.column("severity", width=100, anchor='center')
         self.queue_tree_view.column("location", width=150, anchor='center')
         
-        scrollbar = ttk.Scrollbar(self.queue_display_container, orient=tk.VERTICAL, command=self.queue_tree_view.yview)
-        self.queue_tree_view.configure(yscroll=scrollbar.set)
-        
         # 默认不直接 pack，由 _update_queue_display 控制
         
         # 2. Canvas (用于树状显示)
         self.tree_canvas = tk.Canvas(self.queue_display_container, bg="white")
-        # 存储树节点的位置信息，用于点击检测
-        self.tree_nodes = {}  # 格式: {emergency_id: (x, y, radius)}
+        # 已绘制的树节点的网格索引，用于点击和悬停检测
+        self.tree_hits = NodeGrid()
+        self._hovered_index = None
+        # 树状图布局只在结构变化时计算，平移和缩放只改变视口
+        self.tree_layout = None
+        self.tree_viewport = TreeViewport()
+        self._pan_start = None
         
         # 右侧图表显示
         self.chart_frame = ttk.LabelFrame(display_frame, text="Statistics Chart", padding="10")
@@ -180,6 +229,23 @@ class EmergencyResponseGUI:
         self.figure = plt.Figure(figsize=(5, 4), dpi=100)
         self.canvas = FigureCanvasTkAgg(self.figure, master=self.chart_frame)
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        
+        # 图表对象只创建一次，之后原地更新数据
+        self.type_chart = LivePieChart(
+            self.figure.add_subplot(211),  # 上面的子图 - 类型分布
+            [t.name for t in EmergencyType],
+            [TYPE_COLORS[t] for t in EmergencyType],
+            'Emergency Type Distribution'
+        )
+        self.severity_chart = LiveBarChart(
+            self.figure.add_subplot(212),  # 下面的子图 - 严重程度分布
+            range(1, 11),
+            'Emergency Severity Distribution',
+            'Severity (Lower value = Higher priority)',
+            'Count'
+        )
+        self.figure.tight_layout()
+        self.chart_draw = ThrottledDraw(self.canvas, self.root.after, self.root.after_cancel)
     
     def _create_status_bar(self):
         """创建底部状态栏"""
@@ -204,6 +270,88 @@ class EmergencyResponseGUI:
         # 绑定树状图 Canvas 事件
         self.tree_canvas.bind("<Button-1>", self._on_canvas_click)
         self.tree_canvas.bind("<Motion>", self._on_canvas_hover)
+        # 右键（或中键）拖动平移，滚轮水平缩放，大小变化时重绘
+        for button in (2, 3):
+            self.tree_canvas.bind(f"<ButtonPress-{button}>", self._on_canvas_pan_start)
+            self.tree_canvas.bind(f"<B{button}-Motion>", self._on_canvas_pan)
+        self.tree_canvas.bind("<MouseWheel>", lambda event: self._zoom_tree(event.x, event.delta > 0))
+        self.tree_canvas.bind("<Button-4>", lambda event: self._zoom_tree(event.x, True))
+        self.tree_canvas.bind("<Button-5>", lambda event: self._zoom_tree(event.x, False))
+        self.tree_canvas.bind("<Configure>", self._on_canvas_resize)
+        
+        # 窗口关闭时取消订阅共享队列
+        self.root.bind("<Destroy>", self._on_destroy, add="+")
+    
+    def _on_destroy(self, event):
+        """窗口销毁时取消订阅和尚未执行的重绘"""
+        if event.widget is not self.root:
+            return
+        for queue in (self.linked_list_queue, self.binary_tree_queue, self.heap_queue):
+            queue.unsubscribe(self._on_queue_event)
+        self.stats.detach()
+        self.stream_stats.detach()
+        if self._refresh_job is not None:
+            self.root.after_cancel(self._refresh_job)
+            self._refresh_job = None
+        self.chart_draw.cancel()
+    
+    def _on_queue_event(self, queue, event):
+        """
+        记录队列变更事件，并在合并窗口结束时统一刷新
+        
+        三个队列执行相同的操作，只需要跟踪当前显示的队列。
+        """
+        if queue is not self.current_queue:
+            return
+        self.pending_events.append(event)
+        if self._refresh_job is None:
+            self._refresh_job = self.root.after(EVENT_COALESCE_MS, self._flush_queue_events)
+    
+    def _flush_queue_events(self):
+        """按合并后的事件更新显示：视图类型不变时只刷新变化的部分"""
+        self._refresh_job = None
+        events, self.pending_events = self.pending_events, []
+        if not events:
+            return
+        
+        if self._queue_display_mode() != self.display_mode:
+            # 队列变空或不再为空时切换视图
+            self._update_queue_display()
+            return
+        
+        if self.display_mode == 'list':
+            # 按事件移动已读取的行，保持滚动位置，只改写可见行中变化的值
+            self.queue_list.apply_events(events, len(self.current_queue))
+        elif self.display_mode == 'tree':
+            # 任何插入或删除都会移动中序坐标，事件只作为需要重新布局的标志
+            self._rebuild_tree_layout()
+            self._draw_tree()
+        self._update_statistics_chart()
+        self.queue_info_var.set(f"Queue size: {len(self.current_queue)}")
+    
+    def _queue_display_mode(self):
+        """返回当前队列应使用的视图：'empty'、'list'或'tree'"""
+        if self.current_queue.is_empty():
+            return 'empty'
+        if self.current_queue_type.get() == 'linked_list':
+            return 'list'
+        return 'tree'
+    
+    def _apply_priority_change(self, emergency_id, new_severity):
+        """
+        在所有三个队列中更改紧急情况的优先级
+        
+        先更新当前队列，再同步另外两个队列。
+        
+        返回:
+            当前队列中的更改是否成功
+        """
+        success = self.current_queue.change_priority(emergency_id, new_severity)
+        if success:
+            for queue in (self.linked_list_queue, self.binary_tree_queue, self.heap_queue):
+                if queue is not self.current_queue:
+                    queue.change_priority(emergency_id, new_severity)
+        return success
     
     def _on_queue_type_changed(self, event=None):
         """处理队列类型更改"""
@@ -242,8 +390,7 @@ class EmergencyResponseGUI:
             self.binary_tree_queue.enqueue(new_emergency)
             self.heap_queue.enqueue(new_emergency)
 
-            # 更新显示
-            self._update_queue_display()
+            # 显示由队列变更事件更新
             messagebox.showinfo("Success", "Emergency added successfully.")
     
     def _process_emergency(self):
@@ -261,8 +408,6 @@ class EmergencyResponseGUI:
         if not (removed_from_linked_list == removed_from_binary_tree and removed_from_binary_tree == removed_from_heap):
             messagebox.showwarning("Warning", "Data inconsistency detected between queues after processing an emergency.")
         
-        # 更新显示
-        self._update_queue_display()
         messagebox.showinfo("Processed", f"Processed emergency: {removed_from_linked_list}")
     
     def _search_emergency(self):
@@ -312,21 +457,9 @@ class EmergencyResponseGUI:
             return
         
         # 更新所有队列
-        success = self.current_queue.change_priority(emergency_id, new_severity)
+        success = self._apply_priority_change(emergency_id, new_severity)
         
         if success:
-            # 同步更新其他队列
-            if self.current_queue_type.get() == "linked_list":
-                self.binary_tree_queue.change_priority(emergency_id, new_severity)
-                self.heap_queue.change_priority(emergency_id, new_severity)
-            elif self.current_queue_type.get() == "binary_tree":
-                self.linked_list_queue.change_priority(emergency_id, new_severity)
-                self.heap_queue.change_priority(emergency_id, new_severity)
-            else: # heap
-                self.linked_list_queue.change_priority(emergency_id, new_severity)
-                self.binary_tree_queue.change_priority(emergency_id, new_severity)
-                
-            self._update_queue_display()
             messagebox.showinfo("Success", "Priority changed successfully.")
         else:
             messagebox.showerror("Error", "Failed to change priority.")
@@ -337,26 +470,28 @@ class EmergencyResponseGUI:
             messagebox.showinfo("Notice", "Queue is empty, no statistics to show.")
             return
         
-        emergencies = list(self.current_queue)
-        run_statistics_gui(emergencies, self.root)
+        run_statistics_gui(self.stats, self.stream_stats)
     
     def _run_performance_analysis(self):
         """运行性能分析"""
+        # 性能分析工具依赖psutil和pympler，首次使用时才导入
+        from ..utils.performance_analyzer import compare_performance
         compare_performance(self.root)
     
     def _update_queue_display(self):
         """更新队列显示，根据队列类型选择列表或树状图"""
         # 清空当前所有视图
-        self.queue_tree_view.delete(*self.queue_tree_view.get_children())
         self.tree_canvas.delete("all")
         
         # 隐藏所有视图
-        self.queue_tree_view.pack_forget()
+        self.queue_list.pack_forget()
         self.tree_canvas.pack_forget()
         
-        queue_type = self.current_queue_type.get()
+        # 显示完整刷新，之前等待的事件已经包含在内
+        self.pending_events = []
+        self.display_mode = self._queue_display_mode()
         
-        if self.current_queue.is_empty():
+        if self.display_mode == 'empty':
             self.tree_canvas.pack(fill=tk.BOTH, expand=True)
             self.tree_canvas.create_text(
                 self.tree_canvas.winfo_width() / 2, 
@@ -364,193 +499,139 @@ class EmergencyResponseGUI:
                 text="Queue is empty",
                 font=("Arial", 16)
             )
-        elif queue_type == 'linked_list':
-            # 显示 Treeview
-            self.queue_tree_view.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-            # 填充 Treeview
-            for emergency in self.current_queue:
-                self.queue_tree_view.insert(
-                    "", 
-                    "end", 
-                    values=(
-                        emergency.emergency_id,
-                        emergency.type.name,
-                        emergency.severity_level,
-                        emergency.location
-                    )
-                )
+        elif self.display_mode == 'list':
+            # 显示 Treeview，只按需读取可见的行
+            self.queue_list.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+            self.queue_list.set_source(self.current_queue.iter_by_priority, len(self.current_queue), priority_key)
         else:
             # 显示 Canvas
             self.tree_canvas.pack(fill=tk.BOTH, expand=True)
             # 强制更新UI以获取正确的Canvas尺寸
             self.root.update_idletasks()
-            # 在 Canvas 上绘制树
+            # 切换队列后重新适配视口，再在 Canvas 上绘制树
+            self.tree_viewport = TreeViewport()
+            self._rebuild_tree_layout()
             self._draw_tree()
 
         # 更新统计图和状态栏
         self._update_statistics_chart()
         self.queue_info_var.set(f"Queue size: {len(self.current_queue)}")
 
+    def _canvas_size(self):
+        """返回树状图画布的尺寸，画布还没完全渲染时使用默认值"""
+        width = self.tree_canvas.winfo_width()
+        height = self.tree_canvas.winfo_height()
+        return (width if width > 1 else 800), (height if height > 1 else 600)
+
+    def _rebuild_tree_layout(self):
+        """队列结构变化后重新计算树状图布局"""
+        if self.current_queue_type.get() == 'binary_tree':
+            self.tree_layout = TreeLayout.from_binary_tree(self.current_queue.root)
+        else:
+            self.tree_layout = TreeLayout.from_heap(self.current_queue.heap, self.current_queue.count)
+        if self.tree_viewport.fitted:
+            self.tree_viewport.fit(self.tree_layout, self._canvas_size()[0])
+
     def _draw_tree(self):
+        """只绘制视口内的节点，过密或超出视口深度的子树折叠为摘要"""
         self.tree_canvas.delete("all")
-        self.tree_nodes = {}  # 清空节点位置信息
-        queue_type = self.current_queue_type.get()
+        # 网格边长等于节点直径，查找一个点最多检查相邻的4个网格
+        self.tree_hits = NodeGrid()
+        self._hovered_index = None
+        layout = self.tree_layout
+        if layout is None or len(layout) == 0:
+            return
 
-        # 获取画布的当前宽度
-        canvas_width = self.tree_canvas.winfo_width()
-        if canvas_width <= 1: # 如果画布还没完全渲染，给一个默认值
-            canvas_width = 800
+        width, height = self._canvas_size()
+        viewport = self.tree_viewport
+        fill = "lightblue" if self.current_queue_type.get() == 'binary_tree' else "lightgreen"
+        indices, cut_depth = layout.visible(
+            *viewport.column_range(width),
+            *viewport.depth_range(height),
+            max(1, width // MIN_NODE_SPACING)
+        )
+        indices = indices.tolist()
 
-        # 动态计算初始位置和水平间距
-        initial_x = canvas_width / 2
-        initial_y = 50  # 增加顶部的边距
-        initial_h_gap = canvas_width / 4 # 水平间距为宽度的1/4
+        if not indices:
+            self.tree_canvas.create_text(
+                width / 2, height / 2,
+                text="No nodes in view\nScroll to zoom, drag with the right mouse button to pan",
+                font=("Arial", 12), justify=tk.CENTER
+            )
+            return
 
-        if queue_type == 'binary_tree' and self.current_queue.root:
-            self._draw_binary_tree_node(self.current_queue.root, initial_x, initial_y, initial_h_gap)
-        elif queue_type == 'heap' and not self.current_queue.is_empty():
-            self._draw_heap_node(1, initial_x, initial_y, initial_h_gap)
+        # 先画连线，节点画在连线之上
+        positions = {}
+        for index in indices:
+            positions[index] = viewport.to_screen(index, layout.depth[index])
+            parent = layout.parent[index]
+            if parent >= 0:
+                x, y = positions[index]
+                parent_x, parent_y = viewport.to_screen(parent, layout.depth[parent])
+                self.tree_canvas.create_line(parent_x, parent_y + NODE_RADIUS, x, y - NODE_RADIUS)
 
-    def _draw_binary_tree_node(self, node, x, y, h_gap):
-        if not node:
-            return
+        for index in indices:
+            x, y = positions[index]
+            emergency = layout.items[index]
+            text = f"S:{emergency.severity_level}\nID:{emergency.emergency_id}"
+            self.tree_canvas.create_oval(x-NODE_RADIUS, y-NODE_RADIUS, x+NODE_RADIUS, y+NODE_RADIUS, fill=fill, outline="black", tags=f"node_{emergency.emergency_id}")
+            self.tree_canvas.create_text(x, y, text=text, font=("Arial", 9), tags=f"text_{emergency.emergency_id}")
 
-        v_gap = 70  # 固定的垂直间距
-        node_radius = 30  # 节点半径
-
-        # 绘制节点
-        text = f"S:{node.data.severity_level}\nID:{node.data.emergency_id}"
-        self.tree_canvas.create_oval(x-node_radius, y-node_radius, x+node_radius, y+node_radius, fill="lightblue", outline="black", tags=f"node_{node.data.emergency_id}")
-        self.tree_canvas.create_text(x, y, text=text, font=("Arial", 9), tags=f"text_{node.data.emergency_id}")
-        
-        # 存储节点位置信息，用于点击检测
-        self.tree_nodes[node.data.emergency_id] = (x, y, node_radius)
-
-        # 绘制到左子节点的连线
-        if node.left:
-            x_left = x - h_gap
-            y_left = y + v_gap
-            self.tree_canvas.create_line(x, y + node_radius, x_left, y_left - node_radius)
-            self._draw_binary_tree_node(node.left, x_left, y_left, h_gap / 2)
-
-        # 绘制到右子节点的连线
-        if node.right:
-            x_right = x + h_gap
-            y_right = y + v_gap
-            self.tree_canvas.create_line(x, y + node_radius, x_right, y_right - node_radius)
-            self._draw_binary_tree_node(node.right, x_right, y_right, h_gap / 2)
-
-    def _draw_heap_node(self, index, x, y, h_gap):
-        if index > self.current_queue.count:
-            return
-        
-        v_gap = 70  # 固定的垂直间距
-        node_radius = 30  # 节点半径
+            # 折叠的子树画成节点下方的三角形，标出隐藏的节点数量
+            if layout.is_collapsed(index, cut_depth):
+                top = y + NODE_RADIUS
+                self.tree_canvas.create_polygon(
+                    x, top, x - NODE_RADIUS * 0.8, top + 25, x + NODE_RADIUS * 0.8, top + 25,
+                    fill="lightgray", outline="gray"
+                )
+                self.tree_canvas.create_text(x, top + 17, text=f"+{layout.subtree_size[index] - 1}", font=("Arial", 8))
 
-        # 绘制节点
-        node_data = self.current_queue.heap[index]
-        text = f"S:{node_data.severity_level}\nID:{node_data.emergency_id}"
-        self.tree_canvas.create_oval(x-node_radius, y-node_radius, x+node_radius, y+node_radius, fill="lightgreen", outline="black", tags=f"node_{node_data.emergency_id}")
-        self.tree_canvas.create_text(x, y, text=text, font=("Arial", 9), tags=f"text_{node_data.emergency_id}")
-        
-        # 存储节点位置信息，用于点击检测
-        self.tree_nodes[node_data.emergency_id] = (x, y, node_radius)
+            # 存储节点位置信息，用于点击检测
+            self.tree_hits.insert(CanvasNode(emergency, x, y, index))
 
-        left_child_index = 2 * index
-        right_child_index = 2 * index + 1
+    def _on_canvas_pan_start(self, event):
+        """记录平移的起点"""
+        self._pan_start = (event.x, event.y)
 
-        # 绘制到左子节点的连线
-        if left_child_index <= self.current_queue.count:
-            x_left = x - h_gap
-            y_left = y + v_gap
-            self.tree_canvas.create_line(x, y + node_radius, x_left, y_left - node_radius)
-            self._draw_heap_node(left_child_index, x_left, y_left, h_gap / 2)
+    def _on_canvas_pan(self, event):
+        """拖动时平移树状图"""
+        if self._pan_start is None or self.tree_layout is None:
+            return
+        start_x, start_y = self._pan_start
+        self._pan_start = (event.x, event.y)
+        self.tree_viewport.pan(event.x - start_x, event.y - start_y)
+        self._draw_tree()
 
-        # 绘制到右子节点的连线
-        if right_child_index <= self.current_queue.count:
-            x_right = x + h_gap
-            y_right = y + v_gap
-            self.tree_canvas.create_line(x, y + node_radius, x_right, y_right - node_radius)
-            self._draw_heap_node(right_child_index, x_right, y_right, h_gap / 2)
+    def _zoom_tree(self, x, zoom_in):
+        """以鼠标位置为中心缩放树状图"""
+        if self.tree_layout is None:
+            return
+        self.tree_viewport.zoom(1.25 if zoom_in else 0.8, x)
+        self._draw_tree()
 
-    def _update_statistics_chart(self):
-        """更新统计图表"""
-        # 清除之前的图表
-        self.figure.clear()
-        
-        # 获取当前队列中的所有紧急事件
-        emergencies = list(self.current_queue)
-        
-        if not emergencies:
-            # 如果队列为空，则不更新图表
-            self.canvas.draw()
+    def _on_canvas_resize(self, event):
+        """画布大小变化后重新适配并重绘树状图"""
+        if self.display_mode != 'tree' or self.tree_layout is None:
             return
-        
-        # 创建两个子图
-        ax1 = self.figure.add_subplot(211)  # 上面的子图 - 类型分布
-        ax2 = self.figure.add_subplot(212)  # 下面的子图 - 严重程度分布
-        
-        # 计算类型统计
-        type_counts = {}
-        for e in emergencies:
-            type_name = e.type.name
-            if type_name in type_counts:
-                type_counts[type_name] += 1
-            else:
-                type_counts[type_name] = 1
-        
-        # 绘制类型分布饼图
-        labels = list(type_counts.keys())
-        sizes = list(type_counts.values())
-        colors = ['red', 'green', 'blue']
-        
-        ax1.pie(
-            sizes, 
-            labels=labels,
-            colors=colors, 
-            autopct='%1.1f%%',
-            shadow=True, 
-            startangle=90
-        )
-        ax1.axis('equal')
-        ax1.set_title('Emergency Type Distribution')
-        
-        # 计算严重程度统计
-        severity_counts = {}
-        for e in emergencies:
-            severity = e.severity_level
-            if severity in severity_counts:
-                severity_counts[severity] += 1
-            else:
-                severity_counts[severity] = 1
-        
-        # 绘制严重程度条形图
-        x = sorted(severity_counts.keys())
-        y = [severity_counts[i] for i in x]
-        
-        bars = ax2.bar(x, y, color='skyblue', edgecolor='black')
-        
-        # 在条形上方添加数值标签
-        for bar in bars:
-            height = bar.get_height()
-            if height > 0:
-                ax2.text(
-                    bar.get_x() + bar.get_width()/2.,
-                    height + 0.1,
-                    str(int(height)),
-                    ha='center', 
-                    va='bottom'
-                )
-        
-        ax2.set_xlabel('Severity (Lower value = Higher priority)')
-        ax2.set_ylabel('Count')
-        ax2.set_title('Emergency Severity Distribution')
-        
-        # 调整子图之间的间距
-        self.figure.tight_layout()
+        if self.tree_viewport.fitted:
+            self.tree_viewport.fit(self.tree_layout, event.width)
+        self._draw_tree()
+
+    def _update_statistics_chart(self):
+        """更新统计图表（原地更新数据，限制重绘频率）"""
+        # 使用增量维护的统计，不需要遍历队列
+        stats = self.stats
+        
+        # 队列为空时隐藏图表
+        has_data = stats.total > 0
+        self.type_chart.ax.set_visible(has_data)
+        self.severity_chart.ax.set_visible(has_data)
+        if has_data:
+            self.type_chart.update([stats.type_counts[t] for t in EmergencyType])
+            self.severity_chart.update([stats.severity_counts[i] for i in self.severity_chart.categories])
         
         # 更新画布
-        self.canvas.draw()
+        self.chart_draw.request()
     
     def _on_tree_hover(self, event):
         """当鼠标悬停在Treeview项目上时"""
@@ -595,12 +676,7 @@ class EmergencyResponseGUI:
                 return
             
             # 在所有队列中更改优先级
-            self.linked_list_queue.change_priority(emergency_id, new_severity)
-            self.binary_tree_queue.change_priority(emergency_id, new_severity)
-            self.heap_queue.change_priority(emergency_id, new_severity)
-            
-            # 更新显示
-            self._update_queue_display()
+            self._apply_priority_change(emergency_id, new_severity)
             
             # 关闭对话框
             self.root.update()
@@ -634,9 +710,6 @@ class EmergencyResponseGUI:
             for e in heap_emergencies:
                 self.heap_queue.enqueue(e)
             
-            # 更新显示
-            self._update_queue_display()
-            
             # 关闭对话框
             self.root.update()
             
@@ -658,20 +731,20 @@ class EmergencyResponseGUI:
         while not self.heap_queue.is_empty():
             self.heap_queue.dequeue()
 
-        self._update_queue_display()
         messagebox.showinfo("Success", "All queues have been cleared.")
 
     def _on_canvas_hover(self, event):
         """当鼠标在Canvas上移动时，检测是否悬停在节点上"""
-        emergency_id = self._find_node_at_position(event.x, event.y)
-        if emergency_id:
-            emergency = self.current_queue.search(emergency_id)
-            if emergency:
-                self.status_var.set(f"ID: {emergency.emergency_id}, Type: {emergency.type.name}, Severity: {emergency.severity_level}, Location: {emergency.location}")
-                self.tree_canvas.config(cursor="hand2")  # 改变鼠标指针
-            else:
-                self.status_var.set("Ready")
-                self.tree_canvas.config(cursor="")
+        node = self._node_at_position(event.x, event.y)
+        index = None if node is None else node.index
+        # 仍在同一个节点（或空白处）上移动时不需要更新
+        if index == self._hovered_index:
+            return
+        self._hovered_index = index
+        if node is not None:
+            emergency = node.emergency
+            self.status_var.set(f"ID: {emergency.emergency_id}, Type: {emergency.type.name}, Severity: {emergency.severity_level}, Location: {emergency.location}")
+            self.tree_canvas.config(cursor="hand2")  # 改变鼠标指针
         else:
             self.status_var.set("Ready")
             self.tree_canvas.config(cursor="")
@@ -679,7 +752,7 @@ class EmergencyResponseGUI:
     def _on_canvas_click(self, event):
         """当点击Canvas上的节点时，显示上下文菜单"""
         emergency_id = self._find_node_at_position(event.x, event.y)
-        if not emergency_id:
+        if emergency_id is None:
             return
             
         emergency = self.current_queue.search(emergency_id)
@@ -707,13 +780,16 @@ class EmergencyResponseGUI:
         finally:
             context_menu.grab_release()
 
+    def _node_at_position(self, x, y):
+        """返回包含给定坐标的已绘制节点（CanvasNode），没有则返回None"""
+        # 所有节点半径相同，圆内的点就是半径内最近的节点中心
+        hits = self.tree_hits.within_radius(x, y, NODE_RADIUS)
+        return hits[0][0] if hits else None
+
     def _find_node_at_position(self, x, y):
-        """检查给定的坐标是否在某个节点内"""
-        for emergency_id, (node_x, node_y, radius) in self.tree_nodes.items():
-            # 使用距离公式检查点是否在圆内
-            if (x - node_x) ** 2 + (y - node_y) ** 2 <= radius ** 2:
-                return emergency_id
-        return None
+        """检查给定的坐标是否在某个节点内，返回紧急情况ID"""
+        node = self._node_at_position(x, y)
+        return None if node is None else node.emergency.emergency_id
 
     def _change_node_priority(self, emergency_id):
         """更改节点优先级"""
@@ -735,21 +811,7 @@ class EmergencyResponseGUI:
             return
             
         # 更新所有队列
-        if self.current_queue_type.get() == "linked_list":
-            self.linked_list_queue.change_priority(emergency_id, new_severity)
-            self.binary_tree_queue.change_priority(emergency_id, new_severity)
-            self.heap_queue.change_priority(emergency_id, new_severity)
-        elif self.current_queue_type.get() == "binary_tree":
-            self.binary_tree_queue.change_priority(emergency_id, new_severity)
-            self.linked_list_queue.change_priority(emergency_id, new_severity)
-            self.heap_queue.change_priority(emergency_id, new_severity)
-        else:  # heap
-            self.heap_queue.change_priority(emergency_id, new_severity)
-            self.linked_list_queue.change_priority(emergency_id, new_severity)
-            self.binary_tree_queue.change_priority(emergency_id, new_severity)
-            
-        # 更新显示
-        self._update_queue_display()
+        self._apply_priority_change(emergency_id, new_severity)
         self.status_var.set(f"Changed priority of emergency {emergency_id} to {new_severity}")
 
     def _delete_node(self, emergency_id):
@@ -792,8 +854,6 @@ class EmergencyResponseGUI:
         for item in temp_list:
             self.heap_queue.enqueue(item)
             
-        # 更新显示
-        self._update_queue_display()
         self.status_var.set(f"Deleted emergency {emergency_id}")
 
 def run_gui():
@@ -1,12 +1,18 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
 # 导入自定义对话框
 from .custom_dialogs import askinteger
 import numpy as np
 import random
 from ..data_structures.emergency import Emergency, EmergencyType
+from ..data_structures.emergency_unit import EmergencyUnit, UNIT_TYPES, responding_unit_types
+from ..data_structures.spatial_index import SpatialIndex
+from ..utils.batch_knn import recommend_units
+from ..utils.dispatch_assignment import assign_units, top_emergencies, severity_weight
+from ..utils.knn_cache import KNNCache
+from .map_renderer import MapRenderer
 import heapq
 
 class PrioritizedUnit:
@@ -48,30 +54,15 @@ class PrioritizedUnit:
             raise TypeError("不能与非PrioritizedUnit类型对象比较")
         return self.severity_level >= other.severity_level
 
-class EmergencyUnit:
-    """表示紧急响应单元（如消防车、救护车、警车等）"""
-    
-    def __init__(self, unit_id, unit_type, location_x, location_y):
-        """
-        初始化紧急响应单元
-        
-        Parameters:
-            unit_id: 单位ID
-            unit_type: 单位类型（如消防车、救护车、警车等）
-            location_x: X坐标
-            location_y: Y坐标
-        """
-        self.unit_id = unit_id
-        self.unit_type = unit_type
-        self.location_x = location_x
-        self.location_y = location_y
-    
-    def __repr__(self):
-        return f"EmergencyUnit(id={self.unit_id}, type={self.unit_type}, loc=({self.location_x}, {self.location_y}))"
-
 class KNNVisualizationGUI:
     """K最近邻紧急响应推荐可视化界面"""
     
+    # 全局分配时考虑的最高优先级紧急事件数量
+    DISPATCH_BATCH_SIZE = 1000
+    
+    # K的上限；查询时总是取MAX_K个，改变K只需取缓存结果的前缀
+    MAX_K = 10
+    
     def __init__(self, root, priority_queue):
         """
         初始化GUI
@@ -87,11 +78,14 @@ class KNNVisualizationGUI:
         # 存储优先级队列
         self.priority_queue = priority_queue
         
-        # 存储紧急响应单位
+        # 存储紧急响应单位及其空间索引
         self.emergency_units = []
+        self.unit_index = SpatialIndex()
+        self.knn_cache = KNNCache(self.unit_index)
         
-        # 存储当前紧急事件
+        # 存储当前紧急事件及其推荐单位（计算一次，供结果表和地图共用）
         self.current_emergency = None
+        self.recommendation = []
         
         # 存储队列中的紧急事件（用于在地图上显示）
         self.emergencies = list(self.priority_queue)
@@ -99,14 +93,16 @@ class KNNVisualizationGUI:
         # 存储K值
         self.k_value = tk.IntVar(value=3)
         
+        # 是否只推荐能处理该类型事件的单位 / 是否只推荐空闲单位
+        self.match_unit_type = tk.BooleanVar(value=True)
+        self.available_only = tk.BooleanVar(value=True)
+        
         # 创建界面组件
         self._create_widgets()
+        self.map_renderer.set_emergencies(self.emergencies)
         
-        # 生成样本紧急响应单位
+        # 生成样本紧急响应单位（同时完成初始地图绘制）
         self._generate_sample_units()
-        
-        # 初始地图绘制
-        self._draw_map()
     
     def _create_widgets(self):
         """创建界面组件"""
@@ -126,12 +122,26 @@ class KNNVisualizationGUI:
         ttk.Spinbox(
             k_frame, 
             from_=1, 
-            to=10, 
+            to=self.MAX_K, 
             textvariable=self.k_value,
             width=5,
             command=self._update_recommendation
         ).pack(side=tk.LEFT, padx=5)
         
+        ttk.Checkbutton(
+            k_frame,
+            text="Match unit type",
+            variable=self.match_unit_type,
+            command=self._update_recommendation
+        ).pack(side=tk.LEFT, padx=5)
+        
+        ttk.Checkbutton(
+            k_frame,
+            text="Available only",
+            variable=self.available_only,
+            command=self._update_recommendation
+        ).pack(side=tk.LEFT, padx=5)
+        
         # 添加紧急事件按钮
         ttk.Button(
             control_frame, 
@@ -146,6 +156,20 @@ class KNNVisualizationGUI:
             command=self._generate_sample_units
         ).pack(side=tk.LEFT, padx=5)
         
+        # 为队列中所有紧急事件批量推荐单位
+        ttk.Button(
+            control_frame, 
+            text="Recommend Backlog",
+            command=self._recommend_backlog
+        ).pack(side=tk.LEFT, padx=5)
+        
+        # 为队列中优先级最高的紧急事件全局分配单位
+        ttk.Button(
+            control_frame, 
+            text="Optimal Dispatch",
+            command=self._optimal_dispatch
+        ).pack(side=tk.LEFT, padx=5)
+        
         # 清除所有按钮
         ttk.Button(
             control_frame, 
@@ -162,24 +186,32 @@ class KNNVisualizationGUI:
         self.canvas = FigureCanvasTkAgg(self.figure, master=map_frame)
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
         
+        # 图形元素只创建一次，之后增量更新
+        self.map_renderer = MapRenderer(self.figure, self.canvas)
+        
         # 添加工具栏
         toolbar_frame = ttk.Frame(map_frame)
         toolbar_frame.pack(fill=tk.X)
+        # 平移/缩放：放大后才显示视口内的标签，缩小时显示密度图
+        self.toolbar = NavigationToolbar2Tk(self.canvas, toolbar_frame)
+        self.toolbar.update()
         
         # 创建结果显示区域
         results_frame = ttk.LabelFrame(main_frame, text="Recommended Units", padding="10")
         results_frame.pack(fill=tk.X, padx=5, pady=5)
         
         # 创建Treeview以显示推荐结果
-        columns = ("id", "type", "distance")
+        columns = ("emergency", "id", "type", "distance")
         self.results_tree = ttk.Treeview(results_frame, columns=columns, show="headings", height=5)
         
         # 设置列标题
+        self.results_tree.heading("emergency", text="Emergency ID")
         self.results_tree.heading("id", text="Unit ID")
         self.results_tree.heading("type", text="Unit Type")
         self.results_tree.heading("distance", text="Distance")
         
         # 设置列宽
+        self.results_tree.column("emergency", width=100)
         self.results_tree.column("id", width=100)
         self.results_tree.column("type", width=100)
         self.results_tree.column("distance", width=100)
@@ -206,18 +238,25 @@ class KNNVisualizationGUI:
         self.emergency_units = []
         
         # 生成随机单位
-        unit_types = ["Fire Truck", "Ambulance", "Police Car"]
-        
         for i in range(20):
-            unit_type = random.choice(unit_types)
+            unit_type = random.choice(UNIT_TYPES)
             x = random.uniform(0, 100)
             y = random.uniform(0, 100)
             
             unit = EmergencyUnit(i+1, unit_type, x, y)
             self.emergency_units.append(unit)
         
-        # 更新地图
-        self._draw_map()
+        # 一次性构建按单位类型分区的KD树
+        self.unit_index.rebuild(self.emergency_units)
+        
+        # 随机将约四分之一的单位标记为正在执行任务
+        for unit in self.emergency_units:
+            if random.random() < 0.25:
+                self.unit_index.set_available(unit, False)
+        self.map_renderer.set_units(self.emergency_units, self.unit_index.is_available)
+        
+        # 单位变化后重新计算推荐并更新地图
+        self._update_recommendation()
         
         # 更新状态
         self.status_var.set(f"Generated {len(self.emergency_units)} random emergency response units")
@@ -259,8 +298,7 @@ class KNNVisualizationGUI:
             index = selection[0]
             self.current_emergency = self.emergencies[index]
             
-            # 更新地图和推荐
-            self._draw_map()
+            # 更新推荐和地图
             self._update_recommendation()
             
             # 关闭对话框
@@ -346,9 +384,9 @@ class KNNVisualizationGUI:
                 
                 # 添加到紧急事件列表
                 self.emergencies.append(emergency)
+                self.map_renderer.set_emergencies(self.emergencies)
                 
-                # 更新地图和推荐
-                self._draw_map()
+                # 更新推荐和地图
                 self._update_recommendation()
                 
                 # 关闭对话框
@@ -366,9 +404,11 @@ class KNNVisualizationGUI:
         """清除所有数据并重置可视化"""
         # 清除当前紧急事件
         self.current_emergency = None
+        self.recommendation = []
         
         # 清除紧急响应单位
         self.emergency_units = []
+        self.unit_index.rebuild([])
         
         # 清除结果树
         for item in self.results_tree.get_children():
@@ -381,99 +421,25 @@ class KNNVisualizationGUI:
         self.status_var.set("All data cleared")
     
     def _draw_map(self):
-        """绘制包含紧急事件和响应单位的地图"""
-        # 清除以前的图表
-        self.figure.clear()
-        
-        # 创建子图
-        ax = self.figure.add_subplot(111)
-        
-        # 设置图表限制
-        ax.set_xlim(0, 100)
-        ax.set_ylim(0, 100)
-        
-        # 绘制网格
-        ax.grid(True, linestyle='--', alpha=0.7)
-        
-        # 绘制紧急响应单位
-        for unit in self.emergency_units:
-            if unit.unit_type == "Fire Truck":
-                color = 'red'
-                marker = 's'  # 方形
-            elif unit.unit_type == "Ambulance":
-                color = 'green'
-                marker = '^'  # 三角形
-            else:  # 警车
-                color = 'blue'
-                marker = 'o'  # 圆形
-            
-            ax.scatter(unit.location_x, unit.location_y, color=color, marker=marker, s=50, label=f"{unit.unit_type}")
-        
-        # 绘制队列中的紧急事件
-        for emergency in self.emergencies:
-            if hasattr(emergency, 'coordinates') and emergency.coordinates:
-                x, y = emergency.coordinates
-                
-                if emergency.type == EmergencyType.FIRE:
-                    color = 'red'
-                elif emergency.type == EmergencyType.MEDICAL:
-                    color = 'green'
-                else:  # 警察
-                    color = 'blue'
-                
-                ax.scatter(x, y, color=color, marker='*', s=100, alpha=0.5)
-                ax.text(x, y+2, f"ID: {emergency.emergency_id}", fontsize=8)
-        
-        # 突出显示当前紧急事件并绘制KNN
-        if self.current_emergency and hasattr(self.current_emergency, 'coordinates') and self.current_emergency.coordinates:
-            x, y = self.current_emergency.coordinates
-            
-            # 用更大的标记绘制当前紧急事件
-            ax.scatter(x, y, color='black', marker='*', s=200, edgecolor='yellow', linewidth=2)
-            ax.text(x, y+3, f"Current: {self.current_emergency.emergency_id}", fontsize=10, weight='bold')
-            
-            # 查找K个最近的单位
-            k = self.k_value.get()
-            nearest_units = self._find_k_nearest_units(x, y, k)
-            
-            # 绘制到最近单位的线
-            for unit, distance in nearest_units:
-                ax.plot([x, unit.location_x], [y, unit.location_y], 'k--', alpha=0.5)
-                
-                # 添加距离标签
-                mid_x = (x + unit.location_x) / 2
-                mid_y = (y + unit.location_y) / 2
-                ax.text(mid_x, mid_y, f"{distance:.2f}", fontsize=8, backgroundcolor='white')
-        
-        # 添加图例（仅显示唯一的单位类型）
-        handles, labels = ax.get_legend_handles_labels()
-        by_label = dict(zip(labels, handles))
-        ax.legend(by_label.values(), by_label.keys(), loc='upper right')
-        
-        # 设置标签和标题
-        ax.set_xlabel('X Coordinate')
-        ax.set_ylabel('Y Coordinate')
-        ax.set_title('Emergency Response Units and Emergencies')
-        
-        # 刷新画布
-        self.canvas.draw()
+        """同步地图的所有图层（单位、紧急事件和当前推荐）"""
+        self.map_renderer.set_units(self.emergency_units, self.unit_index.is_available)
+        self.map_renderer.set_emergencies(self.emergencies)
+        self.map_renderer.set_highlight(self.current_emergency, self.recommendation)
+    
+    def _required_unit_types(self, emergency):
+        """返回推荐时允许的单位类型，未启用类型匹配时返回None（所有类型）"""
+        if not self.match_unit_type.get():
+            return None
+        return responding_unit_types(emergency.type)
     
     def _find_k_nearest_units(self, x, y, k):
-        """使用直接排序查找给定坐标的k个最近的紧急响应单位。"""
-        # 创建一个列表存储所有单位及其距离
-        all_units = []
-        
-        # 计算从每个单位到紧急事件的距离
-        for unit in self.emergency_units:
-            # 计算欧几里得距离
-            distance = np.sqrt((unit.location_x - x)**2 + (unit.location_y - y)**2)
-            all_units.append((unit, distance))
-        
-        # 按距离排序（最近的在前）
-        all_units.sort(key=lambda x: x[1])
-        
-        # 返回前k个最近的单位
-        return all_units[:k]
+        """使用KD树空间索引查找给定坐标的k个最近的紧急响应单位。"""
+        types = self._required_unit_types(self.current_emergency) if self.current_emergency else None
+        key = self.current_emergency.emergency_id if self.current_emergency else None
+        nearest = self.knn_cache.nearest(
+            x, y, max(k, self.MAX_K), types=types, available_only=self.available_only.get(), key=key
+        )
+        return nearest[:k]
     
     def _update_recommendation(self):
         """根据当前紧急事件和K值更新推荐"""
@@ -483,32 +449,104 @@ class KNNVisualizationGUI:
         
         # 检查是否已设置当前紧急事件
         if not self.current_emergency or not hasattr(self.current_emergency, 'coordinates') or not self.current_emergency.coordinates:
+            self.recommendation = []
+            self.map_renderer.set_highlight(None, [])
             return
         
         # 获取坐标
         x, y = self.current_emergency.coordinates
         
-        # 查找K个最近的单位
+        # 查找K个最近的单位，结果保存下来供地图绘制复用
         k = self.k_value.get()
-        nearest_units = self._find_k_nearest_units(x, y, k)
+        self.recommendation = self._find_k_nearest_units(x, y, k)
         
         # 添加到结果树
-        for i, (unit, distance) in enumerate(nearest_units):
+        for unit, distance in self.recommendation:
             self.results_tree.insert(
                 "", 
                 "end", 
                 values=(
+                    self.current_emergency.emergency_id,
                     unit.unit_id,
                     unit.unit_type,
                     f"{distance:.2f}"
                 )
             )
         
-        # 更新地图
-        self._draw_map()
+        # 只更新地图的当前紧急事件和推荐连线
+        self.map_renderer.set_highlight(self.current_emergency, self.recommendation)
         
         # 更新状态
-        self.status_var.set(f"Found {len(nearest_units)} nearest units for emergency ID: {self.current_emergency.emergency_id}")
+        self.status_var.set(f"Found {len(self.recommendation)} nearest units for emergency ID: {self.current_emergency.emergency_id}")
+    
+    def _recommend_backlog(self):
+        """用一次向量化的批量k近邻计算为队列中的所有紧急事件推荐单位"""
+        if not self.emergency_units:
+            messagebox.showinfo("Notice", "Please generate emergency response units first")
+            return
+        
+        emergencies = [e for e in self.emergencies if getattr(e, 'coordinates', None)]
+        units = self.emergency_units
+        if self.available_only.get():
+            units = [unit for unit in units if self.unit_index.is_available(unit)]
+        types_for = self._required_unit_types if self.match_unit_type.get() else None
+        recommendations = recommend_units(emergencies, units, self.k_value.get(), types_for=types_for)
+        
+        # 清除以前的结果
+        for item in self.results_tree.get_children():
+            self.results_tree.delete(item)
+        
+        for emergency, nearest_units in recommendations:
+            for unit, distance in nearest_units:
+                self.results_tree.insert(
+                    "", 
+                    "end", 
+                    values=(
+                        emergency.emergency_id,
+                        unit.unit_id,
+                        unit.unit_type,
+                        f"{distance:.2f}"
+                    )
+                )
+        
+        self.status_var.set(f"Recommended units for {len(recommendations)} queued emergencies")
+    
+    def _optimal_dispatch(self):
+        """为优先级最高的紧急事件求解全局最优的单位分配（每个单位只分配一次）"""
+        units = [unit for unit in self.emergency_units if self.unit_index.is_available(unit)]
+        if not units:
+            messagebox.showinfo("Notice", "No available emergency response units")
+            return
+        
+        emergencies = top_emergencies(
+            [e for e in self.emergencies if getattr(e, 'coordinates', None)],
+            self.DISPATCH_BATCH_SIZE
+        )
+        types_for = self._required_unit_types if self.match_unit_type.get() else None
+        assignments, total_cost = assign_units(emergencies, units, types_for=types_for)
+        
+        # 清除以前的结果
+        for item in self.results_tree.get_children():
+            self.results_tree.delete(item)
+        
+        assigned = 0
+        weighted_distance = 0.0
+        for emergency, unit, distance in assignments:
+            if unit is None:
+                values = (emergency.emergency_id, "-", "unassigned", "-")
+            else:
+                assigned += 1
+                weighted_distance += severity_weight(emergency) * distance
+                values = (emergency.emergency_id, unit.unit_id, unit.unit_type, f"{distance:.2f}")
+            self.results_tree.insert("", "end", values=values)
+        
+        # total_cost还包含未分配紧急情况的惩罚成本，与实际距离分开显示
+        status = (f"Assigned {assigned}/{len(assignments)} emergencies, "
+                  f"severity-weighted distance {weighted_distance:.2f}")
+        if assigned < len(assignments):
+            status += f", unassigned penalty {total_cost - weighted_distance:.2f}"
+        self.status_var.set(status)
+
 
 def run_knn_gui(priority_queue):
     """运行KNN可视化GUI"""
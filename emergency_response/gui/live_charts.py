@@ -0,0 +1,170 @@
+import math
+import time
+
+from matplotlib.patches import Wedge
+
+
+class LivePieChart:
+    """
+    数据原地更新的饼图
+
+    每个类别的扇形、标签和百分比文字只创建一次，update只修改角度、位置和文字，
+    不需要clear()后重新调用ax.pie。数量为0的类别被隐藏。
+    """
+
+    def __init__(self, ax, labels, colors, title, explode=None, startangle=90):
+        """
+        初始化饼图
+
+        参数:
+            ax: 绘制用的坐标轴
+            labels: 类别标签列表
+            colors: 与labels对应的颜色列表
+            title: 图表标题
+            explode: 可选，每个扇形沿半径方向偏移的比例
+            startangle: 第一个扇形的起始角度（度）
+        """
+        self.ax = ax
+        self.explode = list(explode) if explode is not None else [0.0] * len(labels)
+        self.startangle = startangle
+        self.wedges = []
+        self.labels = []
+        self.percentages = []
+        for label, color in zip(labels, colors):
+            wedge = Wedge((0, 0), 1, 0, 0, facecolor=color, edgecolor='white')
+            ax.add_patch(wedge)
+            self.wedges.append(wedge)
+            self.labels.append(ax.text(0, 0, label, ha='center', va='center'))
+            self.percentages.append(ax.text(0, 0, "", ha='center', va='center'))
+        ax.set_xlim(-1.35, 1.35)
+        ax.set_ylim(-1.25, 1.25)
+        ax.set_aspect('equal')
+        ax.axis('off')
+        ax.set_title(title)
+        self.update([0] * len(labels))
+
+    def update(self, sizes):
+        """
+        更新每个类别的数量
+
+        参数:
+            sizes: 与labels对应的数量列表
+        """
+        total = float(sum(sizes))
+        angle = self.startangle
+        for index, size in enumerate(sizes):
+            wedge, label, percentage = self.wedges[index], self.labels[index], self.percentages[index]
+            visible = total > 0 and size > 0
+            for artist in (wedge, label, percentage):
+                artist.set_visible(visible)
+            if not visible:
+                continue
+
+            span = 360.0 * size / total
+            middle = math.radians(angle + span / 2)
+            dx, dy = math.cos(middle), math.sin(middle)
+            offset = self.explode[index]
+            wedge.set_center((offset * dx, offset * dy))
+            wedge.set_theta1(angle)
+            wedge.set_theta2(angle + span)
+            label.set_position(((1.1 + offset) * dx, (1.1 + offset) * dy))
+            percentage.set_position(((0.6 + offset) * dx, (0.6 + offset) * dy))
+            percentage.set_text(f"{100.0 * size / total:.1f}%")
+            angle += span
+
+
+class LiveBarChart:
+    """
+    数据原地更新的柱状图
+
+    柱子和柱顶的数值标签只创建一次，update只修改高度、文字和y轴范围。
+    数量为0的柱子不显示数值标签。
+    """
+
+    def __init__(self, ax, categories, title, xlabel, ylabel, color='skyblue'):
+        """
+        初始化柱状图
+
+        参数:
+            ax: 绘制用的坐标轴
+            categories: 柱子的x坐标（例如严重程度1-10）
+            title, xlabel, ylabel: 标题和坐标轴标签
+            color: 柱子颜色
+        """
+        self.ax = ax
+        self.categories = list(categories)
+        self.bars = ax.bar(self.categories, [0] * len(self.categories), color=color, edgecolor='black')
+        self.values = [
+            ax.text(bar.get_x() + bar.get_width() / 2., 0, "", ha='center', va='bottom')
+            for bar in self.bars
+        ]
+        ax.set_xticks(self.categories)
+        ax.set_xlim(min(self.categories) - 0.5, max(self.categories) + 0.5)
+        ax.set_xlabel(xlabel)
+        ax.set_ylabel(ylabel)
+        ax.set_title(title)
+        self.update([0] * len(self.categories))
+
+    def update(self, counts):
+        """
+        更新每个柱子的数量
+
+        参数:
+            counts: 与categories对应的数量列表
+        """
+        for bar, value, count in zip(self.bars, self.values, counts):
+            bar.set_height(count)
+            value.set_position((value.get_position()[0], count))
+            value.set_text(str(int(count)))
+            value.set_visible(count > 0)
+        # 顶部留出数值标签的空间
+        self.ax.set_ylim(0, max(1, max(counts, default=0)) * 1.15)
+
+
+class ThrottledDraw:
+    """
+    限制画布重绘频率
+
+    request()可以被频繁调用：距离上次重绘不足interval秒时，用after安排一次
+    延迟的draw_idle，期间的其他请求都合并到这一次重绘中。画布所在的窗口
+    销毁时需要调用cancel()，否则已安排的重绘会在销毁后的画布上执行。
+    """
+
+    def __init__(self, canvas, after, after_cancel, interval=0.2):
+        """
+        初始化
+
+        参数:
+            canvas: matplotlib画布
+            after: 形如widget.after(ms, callback)的定时函数，返回定时任务ID
+            after_cancel: 形如widget.after_cancel(job)的取消函数
+            interval: 两次重绘之间的最短间隔（秒）
+        """
+        self.canvas = canvas
+        self.after = after
+        self.after_cancel = after_cancel
+        self.interval = interval
+        self.last_draw = -math.inf
+        self.pending_job = None  # 已安排但尚未执行的重绘
+
+    def request(self):
+        """请求一次重绘"""
+        if self.pending_job is not None:
+            return
+        wait = self.last_draw + self.interval - time.monotonic()
+        if wait <= 0:
+            self._draw()
+        else:
+            self.pending_job = self.after(int(math.ceil(wait * 1000)), self._draw)
+
+    def cancel(self):
+        """取消尚未执行的重绘（窗口销毁时调用）"""
+        if self.pending_job is not None:
+            self.after_cancel(self.pending_job)
+            self.pending_job = None
+
+    def _draw(self):
+        """执行（合并后的）重绘"""
+        self.pending_job = None
+        self.last_draw = time.monotonic()
+        self.canvas.draw_idle()
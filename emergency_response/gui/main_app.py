@@ -11,12 +11,11 @@ from emergency_response.data_structures.linked_list import LinkedListPriorityQue
 from emergency_response.data_structures.binary_tree import BinaryTreePriorityQueue
 from emergency_response.data_structures.heap import HeapPriorityQueue
 from emergency_response.utils.data_loader import load_emergency_data
-from emergency_response.utils.performance_analyzer import PerformanceAnalyzer
+from emergency_response.utils.incremental_stats import IncrementalStats
+from emergency_response.utils.streaming_stats import StreamingStats
 
-from .interface import EmergencyResponseGUI
-from .knn_visualization import run_knn_gui
-from .statistics import run_statistics_gui
-from .emergency_simulation import run_simulation_gui
+# 子窗口和性能分析工具会导入matplotlib、NumPy、psutil和pympler，
+# 在各自的入口方法中首次使用时才导入，主窗口启动时只加载标准库和数据结构
 
 class MainApplication:
     """主应用程序的应急响应管理系统"""
@@ -38,6 +37,11 @@ class MainApplication:
         self.binary_tree_queue = BinaryTreePriorityQueue()
         self.heap_queue = HeapPriorityQueue()
         
+        # 随队列变更增量维护的统计（三个队列内容相同，跟踪堆即可）
+        self.stats = IncrementalStats.attach(self.heap_queue)
+        # 最近一个时间窗口内的到达速率、严重程度分布和等待时间
+        self.stream_stats = StreamingStats.attach(self.heap_queue)
+        
         # 当前选择的队列类型
         self.current_queue_type = tk.StringVar(value="linked_list")
         
@@ -188,6 +192,8 @@ class MainApplication:
     
     def _open_emergency_management(self):
         """打开应急管理界面"""
+        from .interface import EmergencyResponseGUI
+        
         # 创建新窗口
         management_window = tk.Toplevel(self.root)
         
@@ -218,6 +224,7 @@ class MainApplication:
             return
         
         # 运行KNN可视化GUI
+        from .knn_visualization import run_knn_gui
         run_knn_gui(self.current_queue)
         
         # 更新状态
@@ -230,11 +237,9 @@ class MainApplication:
             messagebox.showinfo("Notice", "Queue is empty, please load data first")
             return
         
-        # 从当前队列中获取所有紧急情况
-        emergencies = list(self.current_queue)
-        
-        # 运行统计分析GUI
-        run_statistics_gui(emergencies)
+        # 运行统计分析GUI，刷新时读取随队列变更维护的统计
+        from .statistics import run_statistics_gui
+        run_statistics_gui(self.stats, self.stream_stats)
         
         # 更新状态
         self.status_var.set("Statistical analysis interface opened")
@@ -343,6 +348,24 @@ class MainApplication:
         
         space_tree.pack(fill=tk.X, padx=5, pady=5)
         
+        # 二叉搜索树队列的形状统计（二叉搜索树不做旋转平衡，可能退化）
+        shape_frame = ttk.LabelFrame(main_frame, text="Binary Tree Shape", padding="10")
+        shape_frame.pack(fill=tk.X, padx=5, pady=5)
+        
+        shape_var = tk.StringVar()
+        ttk.Label(shape_frame, textvariable=shape_var, justify=tk.LEFT).pack(side=tk.LEFT, padx=5)
+        ttk.Button(
+            shape_frame,
+            text="Rebuild Tree",
+            command=lambda: self._rebuild_binary_tree(shape_var)
+        ).pack(side=tk.RIGHT, padx=5)
+        ttk.Button(
+            shape_frame,
+            text="Refresh",
+            command=lambda: self._update_tree_shape(shape_var)
+        ).pack(side=tk.RIGHT, padx=5)
+        self._update_tree_shape(shape_var)
+        
         # 关闭按钮
         ttk.Button(
             main_frame, 
@@ -376,6 +399,26 @@ class MainApplication:
         # 更新状态
         self.status_var.set("Performance analysis window opened")
     
+    def _update_tree_shape(self, shape_var):
+        """显示二叉搜索树队列的形状统计"""
+        stats = self.binary_tree_queue.shape_statistics()
+        balance = ", ".join(
+            f"{factor:+d}: {count}" for factor, count in sorted(stats['balance_factors'].items())
+        )
+        shape_var.set(
+            f"Nodes: {stats['size']}    Max depth: {stats['max_depth']} "
+            f"(optimal {stats['optimal_depth']}, ratio {stats['depth_ratio']:.2f})    "
+            f"Average depth: {stats['average_depth']:.2f}\n"
+            f"Height estimate: {stats['height_estimate']}    Rebuilds: {stats['rebuild_count']}    "
+            f"Balance factors: {balance or '-'}"
+        )
+    
+    def _rebuild_binary_tree(self, shape_var):
+        """手动重建二叉搜索树队列并刷新形状统计"""
+        self.binary_tree_queue.rebuild()
+        self._update_tree_shape(shape_var)
+        self.status_var.set("Binary tree rebuilt")
+    
     def _execute_performance_analysis(self, data_sizes, operation, chart_frame, complexity_frame):
         """使用选定的设置执行性能分析"""
         if not data_sizes:
@@ -386,6 +429,7 @@ class MainApplication:
         
         try:
             # 使用当前队列实例创建分析器
+            from emergency_response.utils.performance_analyzer import PerformanceAnalyzer
             analyzer = PerformanceAnalyzer()
             
             # 根据选择的操作运行相应的性能测试
@@ -424,6 +468,7 @@ class MainApplication:
     
     def _open_simulation(self):
         """打开应急调度模拟界面"""
+        from .emergency_simulation import run_simulation_gui
         run_simulation_gui()  # 调用emergency_simulation.py中的函数
     
     def _load_data(self):
@@ -0,0 +1,352 @@
+import argparse
+import time
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection
+from matplotlib.colors import to_rgba
+from matplotlib.figure import Figure
+
+from ..data_structures.emergency import EmergencyType
+
+# 单位类型 -> (颜色, 标记)
+UNIT_STYLES = {
+    "Fire Truck": ('red', 's'),    # 方形
+    "Ambulance": ('green', '^'),   # 三角形
+    "Police Car": ('blue', 'o'),   # 圆形
+}
+
+# 紧急事件类型 -> 颜色，其他类型使用蓝色
+EMERGENCY_COLORS = {
+    EmergencyType.FIRE: 'red',
+    EmergencyType.MEDICAL: 'green',
+}
+
+# 正在执行任务的单位的透明度
+BUSY_ALPHA = 0.25
+
+# 视口内紧急事件超过这个数量时改为显示六边形密度图
+LOD_THRESHOLD = 2000
+
+# 视口内紧急事件不超过这个数量时才显示ID标签
+MAX_LABELS = 150
+
+
+class MapRenderer:
+    """
+    KNN地图的增量渲染器
+
+    所有图形元素只创建一次，之后原地更新：
+        - 每种单位类型一个PathCollection，紧急事件一个PathCollection，
+          通过set_offsets / set_facecolors更新
+        - 紧急事件ID标签对象在更新之间复用
+        - 当前紧急事件、KNN连线和距离标签是动画元素，在缓存的背景上用blitting绘制
+
+    单位或紧急事件变化时只安排一次draw_idle；只有当前紧急事件变化时，
+    恢复缓存的背景并blit动画层，不重画静态图层。
+
+    紧急事件图层按视口分级显示（LOD）：
+        - 视口内的紧急事件超过lod_threshold时，隐藏散点，改为六边形密度图
+        - 只为视口内的紧急事件创建ID标签，且数量不超过max_labels，
+          放大到足够小的区域后标签才会出现
+    平移或缩放（例如通过导航工具栏）时自动重新计算。一次交互会先后触发
+    xlim_changed和ylim_changed，回调只标记视口已变化并启动一个0延迟的画布定时器，
+    两个回调合并为一次重新计算；没有事件循环的画布（Agg）需要调用flush_view()。
+    """
+
+    def __init__(self, figure, canvas, bounds=(0, 100, 0, 100), lod_threshold=LOD_THRESHOLD,
+                 max_labels=MAX_LABELS, gridsize=40):
+        """
+        初始化渲染器
+
+        参数:
+            figure: 绘制用的matplotlib Figure（会被清空）
+            canvas: figure的画布（FigureCanvasTkAgg或其他Agg画布）
+            bounds: 地图范围 (xmin, xmax, ymin, ymax)
+            lod_threshold: 视口内紧急事件超过该数量时显示密度图
+            max_labels: 视口内紧急事件不超过该数量时显示ID标签
+            gridsize: 密度图横向的六边形数量
+        """
+        self.figure = figure
+        self.canvas = canvas
+        self.lod_threshold = lod_threshold
+        self.max_labels = max_labels
+        self.gridsize = gridsize
+        self.figure.clear()
+        self.ax = self.figure.add_subplot(111)
+        ax = self.ax
+
+        ax.set_xlim(bounds[0], bounds[1])
+        ax.set_ylim(bounds[2], bounds[3])
+        ax.grid(True, linestyle='--', alpha=0.7)
+        ax.set_xlabel('X Coordinate')
+        ax.set_ylabel('Y Coordinate')
+        ax.set_title('Emergency Response Units and Emergencies')
+
+        # 静态层：每种单位一个集合，紧急事件一个集合
+        self.unit_collections = {}
+        for unit_type, (color, marker) in UNIT_STYLES.items():
+            self.unit_collections[unit_type] = ax.scatter(
+                [], [], color=color, marker=marker, s=50, label=unit_type
+            )
+        self.emergency_collection = ax.scatter([], [], marker='*', s=100)
+        self.emergency_labels = []
+        ax.legend(loc='upper right')
+
+        # 所有紧急事件的数据；图层只显示视口内的部分
+        self.emergency_offsets = np.empty((0, 2))
+        self.emergency_colors = np.empty((0, 4))
+        self.emergency_ids = []
+        self.density = None       # LOD模式下的hexbin集合
+        self.lod_active = False
+        self._updating_view = False
+        self._view_pending = False
+        self.view_timer = canvas.new_timer(interval=0)
+        self.view_timer.single_shot = True
+        self.view_timer.add_callback(self.flush_view)
+        ax.callbacks.connect('xlim_changed', self._on_view_changed)
+        ax.callbacks.connect('ylim_changed', self._on_view_changed)
+
+        # 动画层：当前紧急事件、到推荐单位的连线和距离标签
+        self.highlight = ax.scatter(
+            [], [], color='black', marker='*', s=200, edgecolor='yellow', linewidth=2, animated=True
+        )
+        self.highlight_label = ax.text(0, 0, "", fontsize=10, weight='bold', animated=True)
+        self.knn_lines = LineCollection([], colors='k', linestyles='--', alpha=0.5, animated=True)
+        ax.add_collection(self.knn_lines)
+        self.distance_labels = []
+
+        self.background = None
+        self._static_dirty = True
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+
+    def _animated_artists(self):
+        """返回需要在背景之上绘制的动画元素"""
+        return [self.knn_lines, self.highlight, self.highlight_label] + self.distance_labels
+
+    def _on_draw(self, event):
+        """完整重绘后缓存静态背景，再画上动画层"""
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self._static_dirty = False
+        for artist in self._animated_artists():
+            self.figure.draw_artist(artist)
+
+    def _request_draw(self):
+        """静态层改变：安排一次完整重绘，背景在draw_event中重新缓存"""
+        self._static_dirty = True
+        self.canvas.draw_idle()
+
+    def _blit(self):
+        """只重画动画层"""
+        if self._static_dirty or self.background is None:
+            self._request_draw()
+            return
+        self.canvas.restore_region(self.background)
+        for artist in self._animated_artists():
+            self.figure.draw_artist(artist)
+        self.canvas.blit(self.figure.bbox)
+
+    def set_units(self, units, is_available=None):
+        """
+        更新单位图层
+
+        参数:
+            units: EmergencyUnit列表
+            is_available: 可选，函数 fn(unit) -> bool；不可用的单位以半透明显示
+        """
+        by_type = {unit_type: [] for unit_type in self.unit_collections}
+        for unit in units:
+            # 未知类型按警车样式显示
+            unit_type = unit.unit_type if unit.unit_type in by_type else "Police Car"
+            by_type[unit_type].append(unit)
+
+        for unit_type, typed_units in by_type.items():
+            collection = self.unit_collections[unit_type]
+            offsets = np.array([(u.location_x, u.location_y) for u in typed_units], dtype=float).reshape(-1, 2)
+            colors = np.tile(to_rgba(UNIT_STYLES[unit_type][0]), (len(typed_units), 1))
+            if is_available is not None and len(typed_units):
+                colors[:, 3] = [1.0 if is_available(u) else BUSY_ALPHA for u in typed_units]
+            collection.set_offsets(offsets)
+            collection.set_facecolors(colors)
+            collection.set_edgecolors(colors)
+        self._request_draw()
+
+    def set_emergencies(self, emergencies):
+        """
+        更新紧急事件图层
+
+        参数:
+            emergencies: 带coordinates属性的紧急事件列表
+        """
+        located = [e for e in emergencies if getattr(e, 'coordinates', None)]
+        self.emergency_offsets = np.array([e.coordinates for e in located], dtype=float).reshape(-1, 2)
+        self.emergency_colors = np.array(
+            [to_rgba(EMERGENCY_COLORS.get(e.type, 'blue'), 0.5) for e in located]
+        ).reshape(-1, 4)
+        self.emergency_ids = [e.emergency_id for e in located]
+        self._update_view()
+        self._request_draw()
+
+    def _on_view_changed(self, ax):
+        """平移或缩放后安排一次视口更新（同一次交互中的多个回调只安排一次）"""
+        if self._updating_view or self._view_pending:
+            return
+        self._view_pending = True
+        self.view_timer.start()
+
+    def flush_view(self):
+        """执行尚未完成的视口更新，并安排一次重绘"""
+        if not self._view_pending:
+            return
+        self._update_view()
+        self._request_draw()
+
+    def _update_view(self):
+        """按当前视口选择显示散点还是密度图，并只为视口内的紧急事件显示标签"""
+        self._view_pending = False
+        self._updating_view = True
+        try:
+            x0, x1 = sorted(self.ax.get_xlim())
+            y0, y1 = sorted(self.ax.get_ylim())
+            points = self.emergency_offsets
+            inside = np.flatnonzero(
+                (points[:, 0] >= x0) & (points[:, 0] <= x1) & (points[:, 1] >= y0) & (points[:, 1] <= y1)
+            )
+
+            if self.density is not None:
+                self.density.remove()
+                self.density = None
+            self.lod_active = len(inside) > self.lod_threshold
+            if self.lod_active:
+                self.emergency_collection.set_visible(False)
+                self.density = self.ax.hexbin(
+                    points[inside, 0], points[inside, 1], gridsize=self.gridsize,
+                    extent=(x0, x1, y0, y1), mincnt=1, cmap='Reds', alpha=0.6
+                )
+            else:
+                # 散点图层只包含视口内的点
+                self.emergency_collection.set_visible(True)
+                self.emergency_collection.set_offsets(points[inside])
+                self.emergency_collection.set_facecolors(self.emergency_colors[inside])
+                self.emergency_collection.set_edgecolors(self.emergency_colors[inside])
+
+            labelled = inside if len(inside) <= self.max_labels else inside[:0]
+            # 复用标签对象，只在数量增加时创建新的
+            while len(self.emergency_labels) < len(labelled):
+                self.emergency_labels.append(self.ax.text(0, 0, "", fontsize=8))
+            for label, index in zip(self.emergency_labels, labelled.tolist()):
+                x, y = points[index]
+                label.set_position((x, y + 2))
+                label.set_text(f"ID: {self.emergency_ids[index]}")
+                label.set_visible(True)
+            for label in self.emergency_labels[len(labelled):]:
+                label.set_visible(False)
+        finally:
+            self._updating_view = False
+
+    def set_highlight(self, emergency, recommendation):
+        """
+        更新当前紧急事件和推荐连线，只重画动画层
+
+        参数:
+            emergency: 当前紧急事件，None表示没有
+            recommendation: [(unit, distance), ...]
+        """
+        if emergency is None or not getattr(emergency, 'coordinates', None):
+            self.highlight.set_offsets(np.empty((0, 2)))
+            self.highlight_label.set_text("")
+            self.knn_lines.set_segments([])
+            recommendation = []
+        else:
+            x, y = emergency.coordinates
+            self.highlight.set_offsets([(x, y)])
+            self.highlight_label.set_position((x, y + 3))
+            self.highlight_label.set_text(f"Current: {emergency.emergency_id}")
+            self.knn_lines.set_segments([
+                [(x, y), (unit.location_x, unit.location_y)] for unit, _ in recommendation
+            ])
+
+        while len(self.distance_labels) < len(recommendation):
+            self.distance_labels.append(
+                self.ax.text(0, 0, "", fontsize=8, backgroundcolor='white', animated=True)
+            )
+        for label, (unit, distance) in zip(self.distance_labels, recommendation):
+            x, y = emergency.coordinates
+            label.set_position(((x + unit.location_x) / 2, (y + unit.location_y) / 2))
+            label.set_text(f"{distance:.2f}")
+            label.set_visible(True)
+        for label in self.distance_labels[len(recommendation):]:
+            label.set_visible(False)
+        self._blit()
+
+
+def benchmark_rendering(counts=(1000, 10000, 100000), seed=0, repeats=3):
+    """
+    测量不同紧急事件数量下地图完整重绘的时间（Agg后端，不需要显示器）
+
+    参数:
+        counts: 要测量的紧急事件数量
+        seed: 随机种子
+        repeats: 每项重复次数，取最小值
+
+    返回:
+        {count: {'all_points': 秒, 'lod': 秒, 'zoomed': 秒}}
+            all_points: 关闭LOD和标签，绘制全部散点
+            lod: 默认设置下的全图视图
+            zoomed: 放大到10x10区域（显示视口内的标签）
+    """
+    from ..data_structures.emergency import Emergency
+
+    rng = np.random.default_rng(seed)
+    types = list(EmergencyType)
+    results = {}
+    for count in counts:
+        coordinates = rng.uniform(0, 100, size=(count, 2)).tolist()
+        emergencies = [
+            Emergency(i, types[i % len(types)], 1 + i % 10, "Benchmark", tuple(xy))
+            for i, xy in enumerate(coordinates)
+        ]
+
+        def timed(renderer, canvas):
+            best = float('inf')
+            for _ in range(repeats):
+                start = time.perf_counter()
+                canvas.draw()
+                best = min(best, time.perf_counter() - start)
+            return best
+
+        timings = {}
+        for name, options in (('all_points', dict(lod_threshold=float('inf'), max_labels=0)),
+                              ('lod', {})):
+            figure = Figure(figsize=(6, 5), dpi=100)
+            canvas = FigureCanvasAgg(figure)
+            renderer = MapRenderer(figure, canvas, **options)
+            renderer.set_emergencies(emergencies)
+            timings[name] = timed(renderer, canvas)
+
+        renderer.ax.set_xlim(45, 55)
+        renderer.ax.set_ylim(45, 55)
+        renderer.flush_view()
+        timings['zoomed'] = timed(renderer, canvas)
+        results[count] = timings
+    return results
+
+
+def main(argv=None):
+    """命令行入口：打印地图渲染基准测试结果"""
+    parser = argparse.ArgumentParser(description="Benchmark KNN map rendering")
+    parser.add_argument('--counts', type=int, nargs='+', default=[1000, 10000, 100000],
+                        help="emergency counts to render")
+    parser.add_argument('--repeats', type=int, default=3, help="draws per measurement (best is kept)")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    results = benchmark_rendering(args.counts, args.seed, args.repeats)
+    print(f"{'emergencies':>12} {'all points':>12} {'LOD':>12} {'zoomed':>12}")
+    for count, timings in results.items():
+        print(f"{count:>12} {timings['all_points'] * 1000:>10.1f}ms "
+              f"{timings['lod'] * 1000:>10.1f}ms {timings['zoomed'] * 1000:>10.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -3,32 +3,48 @@ from tkinter import ttk, messagebox
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import numpy as np
-from collections import Counter
 from ..data_structures.emergency import EmergencyType
+from ..utils.incremental_stats import IncrementalStats
+from .live_charts import LivePieChart, LiveBarChart, ThrottledDraw
+
+# 实时面板的刷新间隔（毫秒）
+LIVE_REFRESH_MS = 1000
 
 class StatisticsGUI:
     """紧急情况统计分析与可视化界面"""
     
-    def __init__(self, root, emergencies):
+    def __init__(self, root, emergencies, stream=None):
         """
         初始化GUI
         
         Parameters:
             root: tkinter根窗口
-            emergencies: 紧急情况对象列表
+            emergencies: 紧急情况对象列表，或增量维护的IncrementalStats
+                （传入后者时刷新直接读取最新的统计）
+            stream: 可选，StreamingStats；传入时显示按时间窗口实时刷新的面板
         """
         self.root = root
         self.root.title("Emergency Statistics Analysis")
         self.root.geometry("900x800")
         
-        # 存储紧急情况
-        self.emergencies = emergencies
+        # 存储统计（列表只在这里遍历一次）
+        if isinstance(emergencies, IncrementalStats):
+            self.stats = emergencies
+        else:
+            self.stats = IncrementalStats(emergencies)
+        self.stream = stream
+        self._live_job = None
         
         # 创建界面组件
         self._create_widgets()
         
         # 更新统计数据
         self._update_statistics()
+        
+        # 窗口关闭时停止定时刷新和尚未执行的重绘
+        self.root.bind("<Destroy>", self._on_destroy, add="+")
+        if self.stream is not None:
+            self._update_live()
     
     def _create_widgets(self):
         """创建界面组件"""
@@ -69,6 +85,22 @@ class StatisticsGUI:
         self.space_complexity_var = tk.StringVar(value="Space Complexity: O(n) for all structures")
         ttk.Label(info_frame, textvariable=self.space_complexity_var, anchor='center').grid(row=2, column=1, sticky=tk.W, padx=10)
         
+        # 实时面板 - 最近一个时间窗口内的到达速率、严重程度分布和等待时间
+        if self.stream is not None:
+            live_frame = ttk.LabelFrame(
+                main_frame, text=f"Live (last {self.stream.window:.0f} s)", padding="10"
+            )
+            live_frame.pack(fill=tk.X, padx=5, pady=5)
+            
+            self.arrival_rate_var = tk.StringVar(value="Arrivals/min: -")
+            ttk.Label(live_frame, textvariable=self.arrival_rate_var).grid(row=0, column=0, sticky=tk.W, padx=10)
+            
+            self.live_severity_var = tk.StringVar(value="Severity: -")
+            ttk.Label(live_frame, textvariable=self.live_severity_var).grid(row=1, column=0, sticky=tk.W, padx=10)
+            
+            self.wait_var = tk.StringVar(value="Queue wait: -")
+            ttk.Label(live_frame, textvariable=self.wait_var).grid(row=2, column=0, sticky=tk.W, padx=10)
+        
         # 创建图表框架
         charts_frame = ttk.Frame(main_frame)
         charts_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
@@ -81,6 +113,17 @@ class StatisticsGUI:
         self.type_canvas = FigureCanvasTkAgg(self.type_figure, master=type_frame)
         self.type_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
         
+        # 饼图只创建一次，之后原地更新数据
+        self.type_chart = LivePieChart(
+            self.type_figure.add_subplot(111),
+            ['Fire', 'Medical', 'Police'],
+            ['red', 'green', 'blue'],
+            'Emergency Type Distribution',
+            explode=(0.1, 0, 0)  # 突出显示火灾
+        )
+        self.type_figure.tight_layout()
+        self.type_draw = ThrottledDraw(self.type_canvas, self.root.after, self.root.after_cancel)
+        
         # 右侧图表 - 严重程度分布
         severity_frame = ttk.LabelFrame(charts_frame, text="Severity Distribution", padding="10")
         severity_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=5, pady=5)
@@ -89,6 +132,17 @@ class StatisticsGUI:
         self.severity_canvas = FigureCanvasTkAgg(self.severity_figure, master=severity_frame)
         self.severity_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
         
+        # 条形图只创建一次，之后原地更新数据
+        self.severity_chart = LiveBarChart(
+            self.severity_figure.add_subplot(111),
+            range(1, 11),
+            'Emergency Severity Distribution',
+            'Severity',
+            'Count'
+        )
+        self.severity_figure.tight_layout()
+        self.severity_draw = ThrottledDraw(self.severity_canvas, self.root.after, self.root.after_cancel)
+        
         # 创建底部按钮框架
         button_frame = ttk.Frame(main_frame)
         button_frame.pack(fill=tk.X, pady=10)
@@ -122,23 +176,22 @@ class StatisticsGUI:
     
     def _update_statistics(self):
         """更新统计数据和图表"""
-        if not self.emergencies:
+        stats = self.stats
+        if stats.total == 0:
             messagebox.showinfo("Notice", "No emergency data available for analysis")
             return
         
-        # 计算基本统计信息
-        total = len(self.emergencies)
+        # 读取缓存的统计信息
+        total = stats.total
         
         # 按类型计数
-        type_counts = Counter(e.type for e in self.emergencies)
-        fire_count = type_counts.get(EmergencyType.FIRE, 0)
-        medical_count = type_counts.get(EmergencyType.MEDICAL, 0)
-        police_count = type_counts.get(EmergencyType.POLICE, 0)
+        fire_count = stats.type_counts[EmergencyType.FIRE]
+        medical_count = stats.type_counts[EmergencyType.MEDICAL]
+        police_count = stats.type_counts[EmergencyType.POLICE]
         
-        # 计算严重程度统计
-        severities = [e.severity_level for e in self.emergencies]
-        avg_severity = sum(severities) / len(severities) if severities else 0
-        max_severity = max(severities) if severities else 0
+        # 严重程度统计
+        avg_severity = stats.mean_severity
+        max_severity = stats.max_severity
         
         # 更新信息标签
         self.total_var.set(f"Total Emergencies: {total}")
@@ -152,88 +205,60 @@ class StatisticsGUI:
         self._update_type_chart(fire_count, medical_count, police_count)
         
         # 更新严重程度分布图
-        self._update_severity_chart(severities)
+        self._update_severity_chart(stats.severity_counts)
+    
+    def _update_live(self):
+        """刷新实时面板并安排下一次刷新"""
+        summary = self.stream.current()
+        rates = self.stream.arrivals_per_minute()
+        self.arrival_rate_var.set("Arrivals/min: " + ", ".join(
+            f"{emergency_type.name.title()} {rate:.1f}" for emergency_type, rate in rates.items()
+        ))
+        
+        severities = summary.severity_counts
+        self.live_severity_var.set("Severity: " + (", ".join(
+            f"{level}: {severities[level]}" for level in sorted(severities)
+        ) or "-"))
+        
+        if summary.wait_p50 is None:
+            self.wait_var.set("Queue wait: no dispatches in window")
+        else:
+            self.wait_var.set(f"Queue wait: p50 {summary.wait_p50:.1f} s, p95 {summary.wait_p95:.1f} s")
+        
+        self._live_job = self.root.after(LIVE_REFRESH_MS, self._update_live)
+    
+    def _on_destroy(self, event):
+        """窗口销毁时取消实时面板的定时刷新和尚未执行的重绘"""
+        if event.widget is not self.root:
+            return
+        if self._live_job is not None:
+            self.root.after_cancel(self._live_job)
+            self._live_job = None
+        self.type_draw.cancel()
+        self.severity_draw.cancel()
     
     def _update_type_chart(self, fire_count, medical_count, police_count):
         """更新类型分布图"""
-        # 清除之前的图表
-        self.type_figure.clear()
-        
-        # 创建子图
-        ax = self.type_figure.add_subplot(111)
-        
-        # 准备数据
-        labels = ['Fire', 'Medical', 'Police']
-        sizes = [fire_count, medical_count, police_count]
-        colors = ['red', 'green', 'blue']
-        explode = (0.1, 0, 0)  # 突出显示火灾
-        
-        # 绘制饼图
-        ax.pie(
-            sizes, 
-            explode=explode, 
-            labels=labels, 
-            colors=colors,
-            autopct='%1.1f%%',
-            shadow=True, 
-            startangle=90
-        )
-        
-        ax.axis('equal')  # 确保饼图是圆形的
-        ax.set_title('Emergency Type Distribution')
+        self.type_chart.update([fire_count, medical_count, police_count])
         
         # 刷新画布
-        self.type_canvas.draw()
+        self.type_draw.request()
     
-    def _update_severity_chart(self, severities):
+    def _update_severity_chart(self, severity_counts):
         """更新严重程度分布图"""
-        # 清除之前的图表
-        self.severity_figure.clear()
-        
-        # 创建子图
-        ax = self.severity_figure.add_subplot(111)
-        
-        # 准备数据
-        severity_counts = Counter(severities)
-        x = list(range(1, 11))
-        y = [severity_counts.get(i, 0) for i in x]
-        
-        # 绘制条形图
-        bars = ax.bar(x, y, color='skyblue', edgecolor='black')
-        
-        # 在条形图顶部添加数值标签
-        for bar in bars:
-            height = bar.get_height()
-            if height > 0:
-                ax.text(
-                    bar.get_x() + bar.get_width()/2.,
-                    height + 0.1,
-                    str(int(height)),
-                    ha='center', 
-                    va='bottom'
-                )
-        
-        # 设置标签和标题
-        ax.set_xlabel('Severity')
-        ax.set_ylabel('Count')
-        ax.set_title('Emergency Severity Distribution')
-        ax.set_xticks(x)
-        ax.set_xlim(0.5, 10.5)
+        self.severity_chart.update([severity_counts.get(i, 0) for i in self.severity_chart.categories])
         
         # 刷新画布
-        self.severity_canvas.draw()
-    
-
-    
+        self.severity_draw.request()
 
 
-def run_statistics_gui(emergencies):
+def run_statistics_gui(emergencies, stream=None):
     """运行统计分析GUI"""
     # 创建一个新窗口
     stats_window = tk.Toplevel()
     
     # 创建统计GUI
-    app = StatisticsGUI(stats_window, emergencies)
+    app = StatisticsGUI(stats_window, emergencies, stream)
     
     # 返回窗口对象，使其不会被垃圾回收
     return stats_window
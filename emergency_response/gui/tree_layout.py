@@ -0,0 +1,283 @@
+import math
+import numpy as np
+
+# 画布上的节点尺寸（像素）
+NODE_RADIUS = 30
+# 同一层相邻节点的最小屏幕间距；更密时把下面的层折叠为摘要
+MIN_NODE_SPACING = 2 * NODE_RADIUS + 10
+# 层与层之间的垂直距离和顶部边距
+LEVEL_HEIGHT = 70
+TOP_MARGIN = 50
+
+
+class TreeLayout:
+    """
+    二叉树（或堆）的节点布局
+
+    节点按中序排列，第i个节点放在第i列、第depth层，所以节点之间不会重叠，
+    也不依赖逐层减半的水平间距。布局只在树的结构变化时计算一次，
+    平移和缩放只改变TreeViewport。
+    """
+
+    def __init__(self, items, parents, depths):
+        """
+        初始化布局（通常使用from_binary_tree或from_heap创建）
+
+        参数:
+            items: 按中序排列的紧急情况对象列表，下标即列号
+            parents: 每个节点父节点的列号，根节点为-1
+            depths: 每个节点的深度，根节点为0
+        """
+        self.items = items
+        self.parent = np.asarray(parents, dtype=np.int64).reshape(-1)
+        self.depth = np.asarray(depths, dtype=np.int64).reshape(-1)
+        self.height = int(self.depth.max()) + 1 if len(self.items) else 0
+
+        # 从最深的一层开始把子树大小累加到父节点
+        self.subtree_size = np.ones(len(self.items), dtype=np.int64)
+        if len(self.items):
+            order = np.argsort(-self.depth, kind='stable')
+            levels = np.split(order, np.flatnonzero(np.diff(self.depth[order])) + 1)
+            for level in levels:
+                level = level[self.parent[level] >= 0]
+                np.add.at(self.subtree_size, self.parent[level], self.subtree_size[level])
+
+    def __len__(self):
+        """返回节点数量"""
+        return len(self.items)
+
+    @classmethod
+    def from_binary_tree(cls, root):
+        """
+        根据二叉搜索树计算布局
+
+        参数:
+            root: 树的根节点（TreeNode），可以为None
+        """
+        return cls._from_children(root, lambda node: (node.left, node.right), lambda node: node.data)
+
+    @classmethod
+    def from_heap(cls, heap, count):
+        """
+        根据数组形式的二叉堆计算布局
+
+        参数:
+            heap: 堆数组，下标从1开始
+            count: 堆中的元素数量
+        """
+        def children(index):
+            left, right = 2 * index, 2 * index + 1
+            return (left if left <= count else None, right if right <= count else None)
+
+        return cls._from_children(1 if count else None, children, lambda index: heap[index])
+
+    @classmethod
+    def _from_children(cls, root, children, item_of):
+        """用迭代中序遍历为任意二叉结构计算列号、深度和父节点"""
+        order, depths, parent_handles = [], [], []
+        position = {}
+        stack = []
+        current = None if root is None else (root, 0, None)
+        while current is not None or stack:
+            while current is not None:
+                stack.append(current)
+                node, depth, _ = current
+                left = children(node)[0]
+                current = None if left is None else (left, depth + 1, node)
+            node, depth, parent = stack.pop()
+            position[node] = len(order)
+            order.append(node)
+            depths.append(depth)
+            parent_handles.append(parent)
+            right = children(node)[1]
+            current = None if right is None else (right, depth + 1, node)
+
+        parents = [-1 if parent is None else position[parent] for parent in parent_handles]
+        return cls([item_of(node) for node in order], parents, depths)
+
+    def visible(self, first_column, last_column, min_depth, max_depth, per_row):
+        """
+        选择视口内需要绘制的节点
+
+        只考虑列号在[first_column, last_column]、深度在[min_depth, max_depth]内的节点。
+        从上往下逐层加入，某一层的节点超过per_row个时停止，
+        这一层及以下的节点折叠到上一层节点的摘要中。
+
+        参数:
+            first_column, last_column: 可见的列号范围
+            min_depth, max_depth: 可见的深度范围
+            per_row: 每层最多绘制的节点数
+
+        返回:
+            (indices, cut_depth)：要绘制的节点列号数组，以及绘制的最深一层
+            （深度等于cut_depth且有子节点的节点应绘制为折叠摘要）
+        """
+        lo = max(0, int(np.ceil(first_column)))
+        hi = min(len(self.items), int(np.floor(last_column)) + 1)
+        if hi <= lo or max_depth < min_depth:
+            return np.empty(0, dtype=np.int64), min_depth - 1
+
+        depths = self.depth[lo:hi]
+        in_range = (depths >= min_depth) & (depths <= max_depth)
+        counts = np.bincount(depths[in_range] - min_depth, minlength=max_depth - min_depth + 1)
+        crowded = np.flatnonzero(counts > per_row)
+        cut_depth = min_depth + (crowded[0] if len(crowded) else len(counts)) - 1
+        indices = lo + np.flatnonzero(in_range & (depths <= cut_depth))
+        return indices, cut_depth
+
+    def is_collapsed(self, index, cut_depth):
+        """返回节点是否需要绘制为折叠摘要（位于最深的绘制层且有子节点）"""
+        return self.depth[index] == cut_depth and self.subtree_size[index] > 1
+
+
+class TreeViewport:
+    """
+    布局坐标到画布坐标的变换
+
+    水平方向可以缩放（scale为每列的像素数），垂直方向固定为每层LEVEL_HEIGHT像素，
+    两个方向都可以平移。
+    """
+
+    def __init__(self):
+        """初始化视口"""
+        self.scale = float(MIN_NODE_SPACING)
+        self.left = 0.0       # 画布左边缘对应的列号
+        self.top = 0.0        # 画布上边缘向下平移的像素数
+        self.fitted = True    # 用户平移或缩放之前，布局变化后自动适配宽度
+
+    def fit(self, layout, width):
+        """
+        让整棵树的宽度适配画布宽度
+
+        参数:
+            layout: TreeLayout
+            width: 画布宽度（像素）
+        """
+        columns = max(1, len(layout))
+        self.scale = min(float(MIN_NODE_SPACING), width / columns)
+        self.left = (columns - 1) / 2 - width / (2 * self.scale)
+        self.top = 0.0
+        self.fitted = True
+
+    def to_screen(self, column, depth):
+        """返回列号和深度对应的画布坐标 (x, y)"""
+        return (column - self.left) * self.scale, TOP_MARGIN + depth * LEVEL_HEIGHT - self.top
+
+    def column_range(self, width):
+        """返回画布宽度内可见的列号范围（包含节点半径的余量）"""
+        margin = NODE_RADIUS / self.scale
+        return self.left - margin, self.left + width / self.scale + margin
+
+    def depth_range(self, height):
+        """返回画布高度内可见的深度范围"""
+        first = int(np.ceil((self.top - TOP_MARGIN - NODE_RADIUS) / LEVEL_HEIGHT))
+        last = int(np.floor((self.top + height - TOP_MARGIN + NODE_RADIUS) / LEVEL_HEIGHT))
+        return max(0, first), last
+
+    def pan(self, dx, dy):
+        """
+        按像素平移视口
+
+        参数:
+            dx, dy: 内容移动的像素数（向右、向下为正）
+        """
+        self.left -= dx / self.scale
+        self.top = max(0.0, self.top - dy)
+        self.fitted = False
+
+    def zoom(self, factor, anchor_x):
+        """
+        以画布上的anchor_x为中心水平缩放
+
+        参数:
+            factor: 缩放倍数（大于1放大）
+            anchor_x: 保持不动的画布x坐标
+        """
+        column = self.left + anchor_x / self.scale
+        self.scale = min(max(self.scale * factor, 1e-4), 4.0 * MIN_NODE_SPACING)
+        self.left = column - anchor_x / self.scale
+        self.fitted = False
+
+
+class CanvasNode:
+    """已绘制节点在画布上的位置，index是节点在TreeLayout中的编号（队列允许重复的紧急情况ID）"""
+
+    __slots__ = ('index', 'x', 'y', 'emergency')
+
+    def __init__(self, emergency, x, y, index):
+        """
+        初始化画布节点
+
+        参数:
+            emergency: 节点对应的紧急情况对象
+            x, y: 节点中心的画布坐标
+            index: 节点在TreeLayout中的编号
+        """
+        self.index = index
+        self.x = x
+        self.y = y
+        self.emergency = emergency
+
+
+class NodeGrid:
+    """
+    已绘制节点的均匀网格，用于点击检测
+
+    网格边长取节点直径时，半径内的查询只需检查2x2到3x3个网格。
+    每次重绘都重新建立，所以只支持插入。
+    """
+
+    def __init__(self, cell_size=2 * NODE_RADIUS):
+        """
+        初始化网格
+
+        参数:
+            cell_size: 网格边长（像素）
+        """
+        self.cell_size = cell_size
+        self.cells = {}  # (cx, cy) -> [CanvasNode, ...]
+        self.count = 0
+
+    def __len__(self):
+        """返回节点数量"""
+        return self.count
+
+    def __iter__(self):
+        """遍历所有节点"""
+        for cell in self.cells.values():
+            yield from cell
+
+    def insert(self, node):
+        """
+        插入一个节点
+
+        参数:
+            node: CanvasNode
+        """
+        key = (math.floor(node.x / self.cell_size), math.floor(node.y / self.cell_size))
+        self.cells.setdefault(key, []).append(node)
+        self.count += 1
+
+    def within_radius(self, x, y, radius):
+        """
+        查找中心在给定半径内的所有节点
+
+        参数:
+            x, y: 画布坐标
+            radius: 搜索半径
+
+        返回:
+            [(node, distance), ...]，按距离从近到远排序（距离相同时按布局编号）
+        """
+        low_x, high_x = math.floor((x - radius) / self.cell_size), math.floor((x + radius) / self.cell_size)
+        low_y, high_y = math.floor((y - radius) / self.cell_size), math.floor((y + radius) / self.cell_size)
+        limit = radius * radius
+        found = []
+        for cx in range(low_x, high_x + 1):
+            for cy in range(low_y, high_y + 1):
+                for node in self.cells.get((cx, cy), ()):
+                    distance = (node.x - x) ** 2 + (node.y - y) ** 2
+                    if distance <= limit:
+                        found.append((distance, node.index, node))
+        found.sort(key=lambda entry: entry[:2])
+        return [(node, math.sqrt(distance)) for distance, _, node in found]
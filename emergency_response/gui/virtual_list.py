@@ -0,0 +1,249 @@
+import tkinter as tk
+from tkinter import ttk
+from bisect import bisect_left, bisect_right
+from itertools import islice
+
+from ..data_structures.queue_events import INSERTED, REMOVED, REPRIORITISED
+
+
+class LazyRowSource:
+    """
+    从惰性有序迭代器中按位置读取行
+
+    已经读取过的行按行号保存在一个前缀列表中，迭代器只在需要更靠后的行时
+    继续消费：向下滚动的代价与新翻过的行数成正比，向上滚动或跳回已经看过的
+    位置直接切片，不会从第0行重新遍历。缓存只保存对行对象的引用，大小等于
+    滚动到过的最远行号（10^6行约8MB）。
+
+    提供排序键函数时，队列变更事件可以直接应用到前缀上（见apply_events），
+    数据变化后不需要重新创建数据源。
+    """
+
+    def __init__(self, iter_factory, length, key=None):
+        """
+        初始化行数据源
+
+        参数:
+            iter_factory: 无参数函数，返回按显示顺序排列的新迭代器
+            length: 总行数
+            key: 可选的函数key(item, severity)，返回严重程度为severity时行的排序键
+        """
+        self.iter_factory = iter_factory
+        self.length = length
+        self.key = key
+        self._iterator = None
+        self._rows = []  # 已读取的前缀行，_iterator下一次返回第len(_rows)行
+        self._keys = []  # 读取时每一行的排序键，与_rows一一对应
+
+    def __len__(self):
+        """返回总行数"""
+        return self.length
+
+    def rows(self, start, count):
+        """
+        读取从start开始的最多count行
+
+        参数:
+            start: 起始行号
+            count: 行数
+
+        返回:
+            行对象列表
+        """
+        start = max(0, min(start, self.length))
+        count = max(0, min(count, self.length - start))
+        end = start + count
+        if end > len(self._rows):
+            if self._iterator is None:
+                # 数据变化后旧迭代器已失效，新迭代器跳过已缓存的前缀
+                self._iterator = self.iter_factory()
+                next(islice(self._iterator, len(self._rows), len(self._rows)), None)
+            new_rows = list(islice(self._iterator, end - len(self._rows)))
+            self._rows.extend(new_rows)
+            if self.key is not None:
+                self._keys.extend(self.key(row, row.severity_level) for row in new_rows)
+        return self._rows[start:end]
+
+    def apply_events(self, events, length):
+        """
+        把队列变更事件应用到已读取的前缀
+
+        插入和移除按排序键二分定位，只移动前缀列表中的引用，不重新遍历队列。
+        无法确定位置时（没有排序键，或者行对象的严重程度在别处被改过），
+        从该位置起丢弃前缀，之后按需重新读取。
+
+        参数:
+            events: 按发生顺序排列的QueueEvent列表
+            length: 应用事件后的总行数
+        """
+        if not events:
+            return
+        # 队列的惰性迭代器在修改后不再有效
+        self._iterator = None
+        if self.key is None:
+            self._truncate(0)
+        else:
+            total = self.length
+            for event in events:
+                if event.kind in (REMOVED, REPRIORITISED):
+                    self._remove_row(event.item, event.old_severity, total)
+                    total -= 1
+                if event.kind in (INSERTED, REPRIORITISED):
+                    self._insert_row(event.item, total)
+                    total += 1
+        self.length = length
+        self._truncate(min(len(self._rows), length))
+
+    def _insert_row(self, item, total):
+        """把新行插入前缀（total为插入前的总行数）"""
+        key = self.key(item, item.severity_level)
+        low = bisect_left(self._keys, key)
+        high = bisect_right(self._keys, key)
+        if low != high:
+            # 排序键相同的行在队列中的先后无法确定
+            self._truncate(low)
+        elif high < len(self._rows) or len(self._rows) == total:
+            self._rows.insert(high, item)
+            self._keys.insert(high, key)
+
+    def _remove_row(self, item, old_severity, total):
+        """从前缀中删除一行（total为删除前的总行数）"""
+        severities = {item.severity_level}
+        if old_severity is not None:
+            severities.add(old_severity)
+        keys = [self.key(item, severity) for severity in severities]
+        for key in keys:
+            index = bisect_left(self._keys, key)
+            while index < len(self._keys) and self._keys[index] == key:
+                if self._rows[index] is item:
+                    del self._rows[index]
+                    del self._keys[index]
+                    return
+                index += 1
+        if len(self._rows) < total and all(key > self._keys[-1] for key in keys if self._keys):
+            return  # 还没有读取到的行
+        self._truncate(0)
+
+    def _truncate(self, count):
+        """只保留前count行缓存"""
+        if count < len(self._rows):
+            del self._rows[count:]
+            del self._keys[count:]
+            self._iterator = None
+
+
+class VirtualTreeview(ttk.Frame):
+    """
+    只创建可见行的虚拟化Treeview
+
+    Treeview中始终只有一屏的行，滚动或数据变化时只改写值发生变化的行；
+    滚动条由本类根据起始行号和总行数设置，而不是由Treeview自己计算。
+    """
+
+    def __init__(self, master, columns, row_values, row_height=20, header_height=25, **kwargs):
+        """
+        初始化虚拟列表
+
+        参数:
+            master: 父控件
+            columns: 列名元组，与ttk.Treeview的columns参数相同
+            row_values: 将行对象转换为values元组的函数
+            row_height: 每行的像素高度
+            header_height: 表头的像素高度
+        """
+        super().__init__(master, **kwargs)
+        self.row_values = row_values
+        self.row_height = row_height
+        self.header_height = header_height
+        self.source = LazyRowSource(lambda: iter(()), 0)
+        self.first = 0          # 第一可见行的行号
+        self.visible_rows = 1   # 一屏的行数
+        self.items = []         # Treeview中复用的行ID
+        self.rendered = {}      # 行ID -> 当前显示的values，用于跳过未变化的行
+
+        self.tree = ttk.Treeview(self, columns=columns, show="headings")
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.tree.bind("<Configure>", self._on_configure)
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        self.tree.bind("<Button-4>", lambda event: self.scroll_to(self.first - 3))
+        self.tree.bind("<Button-5>", lambda event: self.scroll_to(self.first + 3))
+        self.tree.bind("<Prior>", lambda event: self.scroll_to(self.first - self.visible_rows))
+        self.tree.bind("<Next>", lambda event: self.scroll_to(self.first + self.visible_rows))
+
+    def set_source(self, iter_factory, length, key=None):
+        """
+        设置新的数据，保持当前滚动位置
+
+        参数:
+            iter_factory: 无参数函数，返回按显示顺序排列的新迭代器
+            length: 总行数
+            key: 可选的函数key(item, severity)，提供后可以用apply_events增量更新
+        """
+        self.source = LazyRowSource(iter_factory, length, key)
+        self.scroll_to(self.first)
+
+    def apply_events(self, events, length):
+        """
+        数据变化后按队列变更事件更新已读取的行，保持当前滚动位置
+
+        参数:
+            events: 按发生顺序排列的QueueEvent列表
+            length: 应用事件后的总行数
+        """
+        self.source.apply_events(events, length)
+        self.scroll_to(self.first)
+
+    def scroll_to(self, first):
+        """
+        滚动到指定的第一可见行并重新填充可见行
+
+        参数:
+            first: 第一可见行的行号
+        """
+        self.first = max(0, min(first, len(self.source) - self.visible_rows))
+        self._render()
+
+    def _render(self):
+        """用当前窗口的行改写Treeview，只增删数量变化的行"""
+        rows = self.source.rows(self.first, self.visible_rows)
+        while len(self.items) < len(rows):
+            self.items.append(self.tree.insert("", "end"))
+        if len(self.items) > len(rows):
+            self.tree.delete(*self.items[len(rows):])
+            for item in self.items[len(rows):]:
+                self.rendered.pop(item, None)
+            del self.items[len(rows):]
+        for item, row in zip(self.items, rows):
+            values = self.row_values(row)
+            if self.rendered.get(item) != values:
+                self.tree.item(item, values=values)
+                self.rendered[item] = values
+
+        total = len(self.source)
+        if total == 0:
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            self.scrollbar.set(self.first / total, (self.first + len(rows)) / total)
+
+    def _on_configure(self, event):
+        """控件大小变化时重新计算一屏的行数"""
+        visible_rows = max(1, (event.height - self.header_height) // self.row_height)
+        if visible_rows != self.visible_rows:
+            self.visible_rows = visible_rows
+            self.scroll_to(self.first)
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        """处理滚动条的moveto/scroll命令"""
+        if action == "moveto":
+            self.scroll_to(int(float(amount) * len(self.source)))
+        elif action == "scroll":
+            step = self.visible_rows if unit == "pages" else 1
+            self.scroll_to(self.first + int(amount) * step)
+
+    def _on_mousewheel(self, event):
+        """处理Windows/macOS的鼠标滚轮"""
+        self.scroll_to(self.first - 3 * (1 if event.delta > 0 else -1))
+        return "break"
@@ -0,0 +1,99 @@
+import numpy as np
+
+# 每个距离块的默认内存上限（字节）
+DEFAULT_BLOCK_BYTES = 32 * 1024 * 1024
+
+
+def batch_k_nearest(queries, points, k, max_block_bytes=DEFAULT_BLOCK_BYTES):
+    """
+    一次性为多个查询点查找k个最近的点
+
+    按行分块计算平方距离矩阵，每块使用argpartition选出k个候选再排序，
+    因此内存占用不超过max_block_bytes，与查询数量无关。
+
+    参数:
+        queries: (m, 2)数组，查询坐标（例如紧急情况位置）
+        points: (n, 2)数组，被查询的坐标（例如响应单位位置）
+        k: 每个查询返回的最近点数量，超过n时按n处理
+        max_block_bytes: 每个距离块的内存上限
+
+    返回:
+        (indices, distances): 两个(m, min(k, n))数组，按距离从近到远排序，
+        indices是points中的行号
+    """
+    queries = np.asarray(queries, dtype=float).reshape(-1, 2)
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    m, n = len(queries), len(points)
+    k = max(0, min(k, n))
+
+    indices = np.empty((m, k), dtype=np.intp)
+    distances = np.empty((m, k), dtype=float)
+    if m == 0 or k == 0:
+        return indices, distances
+
+    # 每行需要n个float64的距离、同样大小的临时数组和argpartition的索引数组
+    block_rows = max(1, int(max_block_bytes // (n * 8 * 3)))
+    point_x = points[:, 0]
+    point_y = points[:, 1]
+
+    for start in range(0, m, block_rows):
+        block = queries[start:start + block_rows]
+        squared = (block[:, 0, None] - point_x) ** 2
+        squared += (block[:, 1, None] - point_y) ** 2
+
+        if k < n:
+            candidates = np.argpartition(squared, k - 1, axis=1)[:, :k]
+        else:
+            candidates = np.broadcast_to(np.arange(n), (len(block), n))
+        candidate_distances = np.take_along_axis(squared, candidates, axis=1)
+
+        order = np.argsort(candidate_distances, axis=1, kind='stable')
+        indices[start:start + len(block)] = np.take_along_axis(candidates, order, axis=1)
+        distances[start:start + len(block)] = np.sqrt(np.take_along_axis(candidate_distances, order, axis=1))
+
+    return indices, distances
+
+
+def unit_coordinates(units):
+    """返回EmergencyUnit列表的(n, 2)坐标数组"""
+    return np.array([(unit.location_x, unit.location_y) for unit in units], dtype=float).reshape(-1, 2)
+
+
+def recommend_units(emergencies, units, k, max_block_bytes=DEFAULT_BLOCK_BYTES, types_for=None):
+    """
+    为一批紧急情况推荐最近的k个单位
+
+    参数:
+        emergencies: 带coordinates属性的紧急情况列表
+        units: EmergencyUnit列表
+        k: 每个紧急情况推荐的单位数量
+        max_block_bytes: 每个距离块的内存上限
+        types_for: 可选，函数 fn(emergency) -> 允许的单位类型集合。设置后按所需类型
+                   对紧急情况分组，每组只在对应类型的单位中做一次批量查询
+
+    返回:
+        [(emergency, [(unit, distance), ...]), ...]，与emergencies顺序一致
+    """
+    if not emergencies:
+        return []
+
+    if types_for is None:
+        groups = {None: (list(range(len(emergencies))), list(units))}
+    else:
+        groups = {}
+        for position, emergency in enumerate(emergencies):
+            types = frozenset(types_for(emergency))
+            if types not in groups:
+                groups[types] = ([], [unit for unit in units if unit.unit_type in types])
+            groups[types][0].append(position)
+
+    recommendations = [None] * len(emergencies)
+    for positions, group_units in groups.values():
+        queries = np.array([emergencies[position].coordinates for position in positions], dtype=float)
+        indices, distances = batch_k_nearest(queries, unit_coordinates(group_units), k, max_block_bytes)
+        for position, row_indices, row_distances in zip(positions, indices, distances):
+            recommendations[position] = (
+                emergencies[position],
+                [(group_units[index], float(distance)) for index, distance in zip(row_indices, row_distances)]
+            )
+    return recommendations
@@ -0,0 +1,433 @@
+import argparse
+import hashlib
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+from datetime import datetime
+
+from .performance_analyzer import PerformanceAnalyzer
+from .workload import ORDERINGS, SEVERITY_DISTRIBUTIONS, WorkloadGenerator
+
+# 项目根目录，默认的结果存储位于其中的.benchmarks目录
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+DEFAULT_STORE_PATH = os.path.join(PROJECT_ROOT, '.benchmarks', 'results.jsonl')
+
+DEFAULT_OPERATIONS = ['enqueue', 'dequeue', 'search']
+DEFAULT_DATA_SIZES = [100, 500, 1000]
+DEFAULT_SEED = 42
+
+
+def get_git_sha(cwd=PROJECT_ROOT):
+    """返回当前代码的git提交SHA，如果无法获取则返回'unknown'"""
+    try:
+        output = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'],
+            cwd=cwd,
+            capture_output=True,
+            text=True,
+            timeout=5
+        )
+    except (OSError, subprocess.SubprocessError):
+        return 'unknown'
+    if output.returncode != 0:
+        return 'unknown'
+    return output.stdout.strip()
+
+
+def get_machine_fingerprint():
+    """
+    根据硬件和操作系统信息生成机器指纹
+
+    只有指纹相同的两次运行之间的比较才是可靠的。
+    """
+    parts = [
+        platform.system(),
+        platform.release(),
+        platform.machine(),
+        platform.processor(),
+        str(os.cpu_count()),
+        platform.python_implementation(),
+    ]
+    return hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()[:12]
+
+
+def collect_environment():
+    """收集一次基准运行的环境信息"""
+    return {
+        'git_sha': get_git_sha(),
+        'python_version': platform.python_version(),
+        'machine_fingerprint': get_machine_fingerprint(),
+        'platform': platform.platform(),
+    }
+
+
+def summarize_samples(samples):
+    """计算一组耗时样本的统计量"""
+    if not samples:
+        return {'n': 0, 'mean': 0.0, 'median': 0.0, 'stdev': 0.0, 'min': 0.0, 'max': 0.0}
+    return {
+        'n': len(samples),
+        'mean': statistics.fmean(samples),
+        'median': statistics.median(samples),
+        'stdev': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        'min': min(samples),
+        'max': max(samples),
+    }
+
+
+def mann_whitney_u(sample_a, sample_b):
+    """
+    双侧Mann-Whitney U检验（正态近似，带结值校正）
+
+    耗时样本通常不服从正态分布，因此使用基于秩的检验而不是t检验。
+
+    参数:
+        sample_a, sample_b: 两组样本
+
+    返回:
+        p值；任意一组为空或所有值都相同时返回1.0
+    """
+    n1, n2 = len(sample_a), len(sample_b)
+    if n1 == 0 or n2 == 0:
+        return 1.0
+
+    combined = sorted([(value, 0) for value in sample_a] + [(value, 1) for value in sample_b])
+    ranks = [0.0] * len(combined)
+    tie_term = 0
+    i = 0
+    while i < len(combined):
+        j = i
+        while j + 1 < len(combined) and combined[j + 1][0] == combined[i][0]:
+            j += 1
+        # 结值取平均秩
+        average_rank = (i + j) / 2 + 1
+        for k in range(i, j + 1):
+            ranks[k] = average_rank
+        tie_count = j - i + 1
+        tie_term += tie_count ** 3 - tie_count
+        i = j + 1
+
+    rank_sum_a = sum(rank for rank, (_, group) in zip(ranks, combined) if group == 0)
+    u_a = rank_sum_a - n1 * (n1 + 1) / 2
+    mean_u = n1 * n2 / 2
+    n = n1 + n2
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+
+    z = (abs(u_a - mean_u) - 0.5) / math.sqrt(variance)  # 连续性校正
+    z = max(z, 0.0)
+    return math.erfc(z / math.sqrt(2))
+
+
+def build_run_record(analyzer, data_sizes, label=None):
+    """
+    将PerformanceAnalyzer的测量结果转换为可存储的运行记录
+
+    参数:
+        analyzer: 已经执行过测量的PerformanceAnalyzer实例
+        data_sizes: 测量时使用的数据大小列表
+        label: 可选，本次运行的说明
+
+    返回:
+        运行记录字典
+    """
+    environment = collect_environment()
+    timestamp = datetime.now().isoformat(timespec='seconds')
+    run_id = f"{timestamp.replace(':', '').replace('-', '')}-{environment['git_sha'][:8]}"
+
+    operations = {}
+    for operation, per_queue in analyzer.samples.items():
+        operations[operation] = {}
+        for queue_type, samples_per_size in per_queue.items():
+            operations[operation][queue_type] = {
+                str(size): {'stats': summarize_samples(samples), 'samples': samples}
+                for size, samples in zip(data_sizes, samples_per_size)
+            }
+
+    return {
+        'run_id': run_id,
+        'timestamp': timestamp,
+        'label': label,
+        'environment': environment,
+        'workload': analyzer.workload.describe() if analyzer.workload else None,
+        'data_sizes': list(data_sizes),
+        'operations': operations,
+    }
+
+
+class BenchmarkStore:
+    """基于JSON Lines文件的本地基准结果存储，每行保存一次运行"""
+
+    def __init__(self, path=None):
+        """
+        初始化结果存储
+
+        参数:
+            path: 结果文件路径，默认为项目根目录下的.benchmarks/results.jsonl
+        """
+        self.path = path or DEFAULT_STORE_PATH
+
+    def save_run(self, record):
+        """追加保存一次运行记录"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        return record
+
+    def load_runs(self):
+        """按保存顺序返回所有运行记录"""
+        if not os.path.exists(self.path):
+            return []
+        runs = []
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    runs.append(json.loads(line))
+        return runs
+
+    def get_run(self, run_id):
+        """
+        按ID查找运行记录
+
+        参数:
+            run_id: 运行ID、运行ID的唯一前缀，或'latest'/'previous'
+
+        返回:
+            找到的运行记录，如果未找到则返回None
+        """
+        runs = self.load_runs()
+        if not runs:
+            return None
+        if run_id == 'latest':
+            return runs[-1]
+        if run_id == 'previous':
+            return runs[-2] if len(runs) > 1 else None
+        matches = [run for run in runs if run['run_id'].startswith(run_id)]
+        return matches[-1] if matches else None
+
+
+def compare_runs(baseline, current, threshold=0.10, alpha=0.05):
+    """
+    比较两次运行中每个(操作, 队列, 数据大小)的耗时
+
+    仅当中位数变慢超过threshold且Mann-Whitney检验显著（p < alpha）时才判定为回归。
+
+    参数:
+        baseline: 基线运行记录
+        current: 新的运行记录
+        threshold: 允许的相对变慢比例，默认10%
+        alpha: 显著性水平
+
+    返回:
+        比较结果字典列表
+    """
+    comparisons = []
+    for operation, per_queue in current['operations'].items():
+        baseline_queues = baseline['operations'].get(operation, {})
+        for queue_type, per_size in per_queue.items():
+            baseline_sizes = baseline_queues.get(queue_type, {})
+            for size, entry in per_size.items():
+                if size not in baseline_sizes:
+                    continue
+                baseline_median = baseline_sizes[size]['stats']['median']
+                current_median = entry['stats']['median']
+                if baseline_median > 0:
+                    change = (current_median - baseline_median) / baseline_median
+                else:
+                    change = 0.0
+                p_value = mann_whitney_u(baseline_sizes[size]['samples'], entry['samples'])
+                comparisons.append({
+                    'operation': operation,
+                    'queue_type': queue_type,
+                    'data_size': int(size),
+                    'baseline_median': baseline_median,
+                    'current_median': current_median,
+                    'change': change,
+                    'p_value': p_value,
+                    'regression': change > threshold and p_value < alpha,
+                })
+    return comparisons
+
+
+def plot_trend(runs, operation, data_size, figure=None, ax=None):
+    """
+    使用PerformanceAnalyzer.plot_results绘制某个操作在多次运行中的趋势
+
+    参数:
+        runs: 按时间排序的运行记录列表
+        operation: 操作名称
+        data_size: 要跟踪的数据大小
+        figure, ax: 可选，要绘制到的图形和坐标轴
+
+    返回:
+        绘制所用的PerformanceAnalyzer实例
+
+    没有测量该数据大小的运行不出现在横轴上；某次运行缺少某种队列时，
+    该队列的曲线在这一点记为NaN（画成断开的线），而不是0。
+    """
+    size_key = str(data_size)
+    measured = []
+    queue_types = []
+    for index, run in enumerate(runs, 1):
+        per_queue = run['operations'].get(operation, {})
+        if not any(size_key in per_size for per_size in per_queue.values()):
+            continue
+        measured.append((index, per_queue))
+        for queue_type in per_queue:
+            if queue_type not in queue_types:
+                queue_types.append(queue_type)
+
+    run_indices = [index for index, _ in measured]
+    trend = {
+        queue_type: [
+            per_queue.get(queue_type, {}).get(size_key, {}).get('stats', {}).get('median', math.nan)
+            for _, per_queue in measured
+        ]
+        for queue_type in queue_types
+    }
+
+    analyzer = PerformanceAnalyzer()
+    analyzer.results['trend'] = trend
+    analyzer.plot_results(
+        'trend',
+        run_indices,
+        figure,
+        ax,
+        title=f'{operation.capitalize()} Trend (Data Size {data_size})',
+        x_label='Benchmark Run'
+    )
+    return analyzer
+
+
+def run_benchmark(data_sizes, operations, label=None, workload_config=None):
+    """
+    执行一次基准测试并返回运行记录
+
+    参数:
+        data_sizes: 数据大小列表
+        operations: 要测量的操作列表
+        label: 可选，本次运行的说明
+        workload_config: 可选，WorkloadGenerator的参数字典（见describe()），
+                         默认使用固定种子的随机顺序，保证两次运行的数据相同
+    """
+    workload_config = workload_config or {'seed': DEFAULT_SEED}
+    analyzer = PerformanceAnalyzer(workload=WorkloadGenerator(**workload_config))
+    for operation in operations:
+        analyzer._run_test_for_operation(data_sizes, operation)
+    return build_run_record(analyzer, data_sizes, label)
+
+
+def _print_comparisons(comparisons):
+    """打印比较结果表"""
+    for item in comparisons:
+        flag = 'REGRESSION' if item['regression'] else 'ok'
+        print(f"{item['operation']:<8} {item['queue_type']:<12} n={item['data_size']:<6} "
+              f"{item['baseline_median']:.6f}s -> {item['current_median']:.6f}s "
+              f"({item['change']:+.1%}, p={item['p_value']:.3f}) {flag}")
+
+
+def main(argv=None):
+    """
+    命令行入口
+
+    示例:
+        python -m emergency_response.utils.benchmark_store run --label before-change
+        python -m emergency_response.utils.benchmark_store compare --baseline <run_id>
+        python -m emergency_response.utils.benchmark_store trend --operation enqueue --size 1000
+
+    返回:
+        进程退出码；compare检测到回归时返回1
+    """
+    parser = argparse.ArgumentParser(description='Priority queue benchmark regression tracking')
+    parser.add_argument('--store', default=None, help='Path of the results store')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help='Run the benchmark and save the results')
+    run_parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_DATA_SIZES)
+    run_parser.add_argument('--operations', nargs='+', default=DEFAULT_OPERATIONS)
+    run_parser.add_argument('--label', default=None)
+    run_parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    run_parser.add_argument('--ordering', choices=ORDERINGS, default='random')
+    run_parser.add_argument('--severity', choices=SEVERITY_DISTRIBUTIONS, default='uniform')
+
+    compare_parser = subparsers.add_parser('compare', help='Compare a run against a baseline')
+    compare_parser.add_argument('--baseline', required=True, help="Baseline run ID, 'latest' or 'previous'")
+    compare_parser.add_argument('--current', default=None, help='Stored run to compare; runs a new benchmark if omitted')
+    compare_parser.add_argument('--threshold', type=float, default=0.10)
+    compare_parser.add_argument('--alpha', type=float, default=0.05)
+    compare_parser.add_argument('--label', default=None)
+
+    trend_parser = subparsers.add_parser('trend', help='Plot the trend of stored runs')
+    trend_parser.add_argument('--operation', default='enqueue')
+    trend_parser.add_argument('--size', type=int, default=DEFAULT_DATA_SIZES[-1])
+    trend_parser.add_argument('--output', default='benchmark_trend.png')
+
+    args = parser.parse_args(argv)
+    store = BenchmarkStore(args.store)
+
+    if args.command == 'run':
+        workload_config = {
+            'seed': args.seed,
+            'ordering': args.ordering,
+            'severity_distribution': args.severity,
+        }
+        record = store.save_run(run_benchmark(args.sizes, args.operations, args.label, workload_config))
+        print(f"Saved run {record['run_id']} to {store.path}")
+        return 0
+
+    if args.command == 'compare':
+        baseline = store.get_run(args.baseline)
+        if baseline is None:
+            print(f"Error: baseline run '{args.baseline}' not found in {store.path}")
+            return 2
+        if args.current:
+            current = store.get_run(args.current)
+            if current is None:
+                print(f"Error: run '{args.current}' not found in {store.path}")
+                return 2
+        else:
+            current = store.save_run(
+                run_benchmark(baseline['data_sizes'], list(baseline['operations']), args.label,
+                              baseline.get('workload'))
+            )
+            print(f"Saved run {current['run_id']} to {store.path}")
+
+        if baseline['environment']['machine_fingerprint'] != current['environment']['machine_fingerprint']:
+            print("Warning: runs were recorded on different machines, results may not be comparable")
+
+        comparisons = compare_runs(baseline, current, args.threshold, args.alpha)
+        _print_comparisons(comparisons)
+        regressions = [item for item in comparisons if item['regression']]
+        if regressions:
+            print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%} detected")
+            return 1
+        print("No regressions detected")
+        return 0
+
+    # trend
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    runs = store.load_runs()
+    if not runs:
+        print(f"Error: no runs stored in {store.path}")
+        return 2
+    figure, ax = plt.subplots(figsize=(10, 6))
+    plot_trend(runs, args.operation, args.size, figure, ax)
+    figure.savefig(args.output)
+    plt.close(figure)
+    print(f"Trend chart saved to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,239 @@
+import heapq
+
+import numpy as np
+
+from .batch_knn import DEFAULT_BLOCK_BYTES, batch_k_nearest, unit_coordinates
+
+
+def severity_weight(emergency):
+    """
+    返回紧急情况的成本权重
+
+    严重程度1（最严重）的权重为10，严重程度10的权重为1，
+    因此越严重的紧急情况，派遣距离远的单位代价越高。
+    """
+    return 11 - emergency.severity_level
+
+
+def top_emergencies(priority_queue, n):
+    """
+    返回队列中优先级最高的n个紧急情况，按优先级排序
+
+    只遍历队列一次，不修改队列。
+    """
+    return heapq.nsmallest(n, priority_queue)
+
+
+def _candidate_columns(queries, points, k, groups, max_block_bytes):
+    """
+    k近邻剪枝：返回至少是一个查询点的k个最近点之一的点的行号（升序）
+
+    当k不小于查询点数量时，最优匹配只会用到这些点：如果某个查询点用了
+    更远的点，它的k个最近点中至少有一个空闲，换过去成本不会增加。
+    """
+    selected = []
+    for rows, allowed in groups:
+        if len(rows) == 0 or len(allowed) == 0:
+            continue
+        indices, _ = batch_k_nearest(queries[rows], points[allowed], k, max_block_bytes)
+        selected.append(allowed[indices.ravel()])
+    if not selected:
+        return np.empty(0, dtype=np.intp)
+    return np.unique(np.concatenate(selected))
+
+
+def _shortest_augmenting_paths(costs, unassigned_costs):
+    """
+    带势函数的最短增广路算法（Hungarian/JV算法的增广阶段）
+
+    每个行还有一个只属于自己的"不分配"列，成本为unassigned_costs[row]；
+    这些列始终空闲且势为0，因此不放进矩阵，只在扫描到该行时比较。
+    Dijkstra的每一步都是对整行的向量化运算。
+
+    参数:
+        costs: (m, n)成本矩阵，不允许的配对为inf
+        unassigned_costs: 长度为m的不分配成本
+
+    返回:
+        长度为m的数组，每行匹配的列号，未分配为-1
+    """
+    m, n = costs.shape
+    prices = np.zeros(n)                    # 列势（对偶变量）
+    column_owner = np.full(n, -1, dtype=np.intp)
+    row_column = np.full(m, -1, dtype=np.intp)
+    if n == 0:
+        return row_column
+
+    # 不分配成本高（权重高）的行先增广，使后面的增广路尽量短
+    for start in np.argsort(-unassigned_costs, kind='stable').tolist():
+        distances = costs[start] - prices
+        # offsets[j] = -prices[j]；已确定最短距离的列为inf，不再被松弛
+        offsets = -prices
+        previous = np.full(n, start, dtype=np.intp)
+        settled = []
+        settled_distances = []
+
+        # 经过某一行后把它改为不分配时的最短距离和该行
+        best_release, release_row = unassigned_costs[start], start
+
+        while True:
+            column = int(distances.argmin())
+            distance = distances[column]
+            if best_release <= distance:
+                end_column, total = -1, best_release
+                break
+            settled.append(column)
+            settled_distances.append(distance)
+            distances[column] = np.inf
+            offsets[column] = np.inf
+            owner = column_owner[column]
+            if owner < 0:
+                end_column, total = column, distance
+                break
+
+            # 沿匹配边回到owner，再松弛它的所有列
+            base = distance - costs[owner, column] + prices[column]
+            relaxed = costs[owner] + offsets
+            relaxed += base
+            improved = relaxed < distances
+            np.minimum(distances, relaxed, out=distances)
+            previous[improved] = owner
+            if base + unassigned_costs[owner] < best_release:
+                best_release, release_row = base + unassigned_costs[owner], owner
+
+        # 更新列势，保持所有匹配边的约化成本为各行最小
+        prices[settled] += np.array(settled_distances) - total
+
+        # 终点是某一行的"不分配"列：该行原来的列沿路径交给前驱
+        if end_column < 0:
+            column = row_column[release_row]
+            row_column[release_row] = -1
+            if release_row == start:
+                continue
+        else:
+            column = end_column
+
+        # 沿前驱交替翻转匹配
+        while True:
+            row = previous[column]
+            column_owner[column] = row
+            row_column[row], column = column, row_column[row]
+            if row == start:
+                break
+
+    return row_column
+
+
+def solve_assignment(queries, weights, points, k=None, unassigned_distance=None,
+                     groups=None, max_block_bytes=DEFAULT_BLOCK_BYTES):
+    """
+    按严重程度加权的最小成本匹配
+
+    成本为 weight * 距离；每个查询点至多匹配一个点，每个点至多被一个查询点使用。
+    每个查询点还可以不分配，成本为 weight * unassigned_distance，
+    因此点不足时会优先放弃权重低的查询点。
+
+    先用k近邻剪枝去掉不可能被用到的点，再在向量化的成本矩阵上用最短增广路算法
+    求精确解。k默认为查询点数量，此时剪枝不影响最优性；设置更小的k会更快，
+    但只在每个查询点的k个最近点中选择。
+
+    参数:
+        queries: (m, 2)数组，查询坐标（紧急情况位置）
+        weights: 长度为m的权重
+        points: (n, 2)数组，可分配的坐标（可用单位位置）
+        k: 每个查询点的候选数量，默认为m
+        unassigned_distance: 不分配的等效距离，默认为所有坐标包围盒对角线的10倍，
+                             使分配数量和严重程度优先于距离
+        groups: 可选，[(查询行号数组, 允许的点行号数组), ...]，用于按单位类型限制候选；
+                不在任何组中的查询点只能不分配
+        max_block_bytes: k近邻计算中每个距离块的内存上限
+
+    返回:
+        (assignment, total_cost): assignment[i]为查询点i分配到的点行号，未分配为-1
+    """
+    queries = np.asarray(queries, dtype=float).reshape(-1, 2)
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    weights = np.asarray(weights, dtype=float).reshape(-1)
+    m, n = len(queries), len(points)
+    if len(weights) != m:
+        raise ValueError("权重数量必须与查询点数量一致")
+    if groups is None:
+        groups = [(np.arange(m), np.arange(n))]
+    else:
+        groups = [(np.asarray(rows, dtype=np.intp), np.asarray(allowed, dtype=np.intp)) for rows, allowed in groups]
+
+    if unassigned_distance is None:
+        everything = np.vstack([queries, points]) if m + n else np.zeros((1, 2))
+        diagonal = float(np.hypot(*(everything.max(axis=0) - everything.min(axis=0))))
+        unassigned_distance = 10.0 * (diagonal + 1.0)
+    unassigned_costs = weights * unassigned_distance
+
+    columns = _candidate_columns(queries, points, m if k is None else max(1, k), groups, max_block_bytes)
+    candidate_points = points[columns]
+    costs = np.hypot(queries[:, 0, None] - candidate_points[:, 0], queries[:, 1, None] - candidate_points[:, 1])
+    costs *= weights[:, None]
+
+    # 按组屏蔽不允许的配对；只有一个包含全部点的组时不需要
+    if len(groups) != 1 or len(groups[0][1]) != n:
+        allowed_mask = np.zeros(costs.shape, dtype=bool)
+        for rows, allowed in groups:
+            allowed_columns = np.searchsorted(columns, np.intersect1d(allowed, columns))
+            allowed_mask[np.ix_(rows, allowed_columns)] = True
+        costs[~allowed_mask] = np.inf
+
+    row_column = _shortest_augmenting_paths(costs, unassigned_costs)
+
+    assigned = row_column >= 0
+    assignment = np.full(m, -1, dtype=np.intp)
+    assignment[assigned] = columns[row_column[assigned]]
+    total_cost = float(costs[assigned, row_column[assigned]].sum() + unassigned_costs[~assigned].sum())
+    return assignment.tolist(), total_cost
+
+
+def assign_units(emergencies, units, k=None, types_for=None, unassigned_distance=None,
+                 max_block_bytes=DEFAULT_BLOCK_BYTES):
+    """
+    为一批紧急情况全局分配响应单位
+
+    与逐个为紧急情况选择最近单位的贪心方式不同，这里最小化所有紧急情况的
+    严重程度加权距离之和。
+
+    参数:
+        emergencies: 带coordinates和severity_level属性的紧急情况列表
+        units: 可用的EmergencyUnit列表
+        k: 每个紧急情况的候选单位数量，见solve_assignment
+        types_for: 可选，函数 fn(emergency) -> 允许的单位类型集合
+        unassigned_distance: 不分配的等效距离，见solve_assignment
+        max_block_bytes: k近邻计算中每个距离块的内存上限
+
+    返回:
+        (assignments, total_cost): assignments为[(emergency, unit或None, distance或None), ...]，
+        与emergencies顺序一致
+    """
+    queries = np.array([emergency.coordinates for emergency in emergencies], dtype=float).reshape(-1, 2)
+    points = unit_coordinates(units)
+    weights = [severity_weight(emergency) for emergency in emergencies]
+
+    groups = None
+    if types_for is not None:
+        by_types = {}
+        for row, emergency in enumerate(emergencies):
+            by_types.setdefault(frozenset(types_for(emergency)), []).append(row)
+        groups = [
+            (rows, [index for index, unit in enumerate(units) if unit.unit_type in types])
+            for types, rows in by_types.items()
+        ]
+
+    assignment, total_cost = solve_assignment(
+        queries, weights, points, k, unassigned_distance, groups, max_block_bytes
+    )
+
+    assignments = []
+    for emergency, (x, y), index in zip(emergencies, queries.tolist(), assignment):
+        if index < 0:
+            assignments.append((emergency, None, None))
+        else:
+            unit = units[index]
+            distance = float(np.hypot(unit.location_x - x, unit.location_y - y))
+            assignments.append((emergency, unit, distance))
+    return assignments, total_cost
@@ -0,0 +1,336 @@
+import argparse
+import heapq
+import math
+import random
+import statistics
+import sys
+import time
+
+from ..data_structures.emergency import Emergency
+from ..data_structures.emergency_unit import EmergencyUnit, UNIT_TYPES, responding_unit_types
+from ..data_structures.spatial_index import SpatialIndex
+from ..data_structures.linked_list import LinkedListPriorityQueue
+from ..data_structures.binary_tree import BinaryTreePriorityQueue
+from ..data_structures.heap import HeapPriorityQueue
+from .workload import WorkloadGenerator
+
+# 事件类型
+ON_SCENE = 1          # 单位到达现场
+SERVICE_COMPLETE = 2  # 现场处置完成，单位重新可用
+
+QUEUE_CLASSES = {
+    'linked_list': LinkedListPriorityQueue,
+    'binary_tree': BinaryTreePriorityQueue,
+    'heap': HeapPriorityQueue,
+}
+
+
+def default_service_time(emergency, rng, mean_service_time):
+    """
+    默认的现场处置时间：指数分布，严重程度越高（数值越小）平均处置时间越长
+
+    严重程度1的平均处置时间是严重程度10的两倍。
+    """
+    scale = 2.0 - (emergency.severity_level - 1) / 9
+    return rng.expovariate(1.0 / (mean_service_time * scale))
+
+
+def _percentile(values, percent):
+    """返回样本的百分位数，样本少于2个时直接返回唯一值或0"""
+    if not values:
+        return 0.0
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method='inclusive')[percent - 1]
+
+
+class DispatchSimulation:
+    """
+    离散事件调度模拟引擎
+
+    使用虚拟时钟和事件堆推进模拟，不依赖任何GUI组件：
+        - 到达的紧急情况进入等待队列（三种优先队列之一），队列决定调度顺序
+        - 有空闲单位时，取出优先级最高的紧急情况，派出离它最近的空闲单位
+        - 行驶时间 = 坐标距离 / 单位速度，到达后按处置时间占用单位
+        - 处置完成后单位在现场位置重新变为可用
+
+    单位保存在按类型分区并记录可用状态的SpatialIndex中。match_unit_types=True时
+    每种紧急情况只派出对应类型的单位（见RESPONDING_UNIT_TYPES），每种紧急情况类型
+    使用一个等待队列，调度时在队首有可派单位的队列中选择优先级最高的一项。
+    """
+
+    def __init__(self, units, queue_factory=None, unit_speed=1.0, mean_service_time=20.0,
+                 service_time_fn=None, seed=None, match_unit_types=False):
+        """
+        初始化模拟引擎
+
+        参数:
+            units: EmergencyUnit列表，其坐标作为单位的初始位置
+            queue_factory: 可选，创建等待队列的函数，参数为最大容量；默认使用堆
+            unit_speed: 单位行驶速度（坐标单位/时间单位）
+            mean_service_time: 平均现场处置时间
+            service_time_fn: 可选，自定义处置时间函数 fn(emergency, rng) -> 时间
+            seed: 随机种子
+            match_unit_types: 是否只派出与紧急情况类型匹配的单位
+        """
+        if not units:
+            raise ValueError("至少需要一个响应单位")
+        if unit_speed <= 0:
+            raise ValueError("单位速度必须为正数")
+
+        self.units = list(units)
+        self.queue_factory = queue_factory or (lambda capacity: HeapPriorityQueue(max_size=max(capacity, 1)))
+        self.unit_speed = unit_speed
+        self.mean_service_time = mean_service_time
+        self.service_time_fn = service_time_fn
+        self.seed = seed
+        self.match_unit_types = match_unit_types
+
+    def run(self, incidents, until=None):
+        """
+        运行模拟
+
+        参数:
+            incidents: (到达时间, Emergency)列表，紧急情况ID必须唯一
+            until: 可选，模拟结束的虚拟时间；默认处理完所有事件
+
+        返回:
+            模拟报告字典
+        """
+        rng = random.Random(self.seed)
+        service_time_fn = self.service_time_fn
+        mean_service_time = self.mean_service_time
+        speed = self.unit_speed
+        horizon = math.inf if until is None else until
+
+        incidents = sorted(incidents, key=lambda incident: incident[0])
+
+        # 等待队列: 按类型匹配时每种紧急情况类型一个队列，否则只有一个（键为None）
+        queues = {}
+        required_types = {}
+
+        def queue_for(emergency):
+            key = emergency.type if self.match_unit_types else None
+            queue = queues.get(key)
+            if queue is None:
+                queue = queues[key] = self.queue_factory(len(incidents))
+                required_types[key] = responding_unit_types(key) if key is not None else None
+            return queue
+
+        # 使用单位的副本，避免修改调用者的EmergencyUnit对象
+        fleet = [EmergencyUnit(unit.unit_id, unit.unit_type, unit.location_x, unit.location_y)
+                 for unit in self.units]
+        index = SpatialIndex(fleet)
+        busy_since = {}
+        busy_time = 0.0
+
+        arrival_time = {}
+        waits = []
+        responses = []
+        events = []  # (时间, 序号, 事件类型, 单位, 紧急情况)
+        sequence = 0
+        event_count = 0
+        depth = 0
+        max_depth = 0
+        served = 0
+        now = 0.0
+
+        heappush = heapq.heappush
+        heappop = heapq.heappop
+
+        next_incident = 0
+        incident_count = len(incidents)
+        wall_start = time.perf_counter()
+
+        while True:
+            next_arrival = incidents[next_incident][0] if next_incident < incident_count else math.inf
+            if events and events[0][0] <= next_arrival:
+                if events[0][0] > horizon:
+                    break
+                now, _, kind, unit, emergency = heappop(events)
+                event_count += 1
+
+                if kind == ON_SCENE:
+                    responses.append(now - arrival_time[emergency.emergency_id])
+                    if service_time_fn is not None:
+                        service = service_time_fn(emergency, rng)
+                    else:
+                        service = default_service_time(emergency, rng, mean_service_time)
+                    index.move(unit, *emergency.coordinates)
+                    sequence += 1
+                    heappush(events, (now + service, sequence, SERVICE_COMPLETE, unit, emergency))
+                    continue
+
+                # SERVICE_COMPLETE
+                served += 1
+                busy_time += now - busy_since.pop(unit.unit_id)
+                del arrival_time[emergency.emergency_id]
+                index.set_available(unit, True)
+            elif next_arrival <= horizon and next_arrival != math.inf:
+                now, emergency = incidents[next_incident]
+                next_incident += 1
+                event_count += 1
+                arrival_time[emergency.emergency_id] = now
+                queue_for(emergency).enqueue(emergency)
+                depth += 1
+                if depth > max_depth:
+                    max_depth = depth
+            else:
+                break
+
+            # 调度：在队首有可派单位的队列中选择优先级最高的紧急情况，派出最近的可用单位
+            while depth:
+                best_key = None
+                best = None
+                for key, queue in queues.items():
+                    head = queue.peek()
+                    if head is None or not index.available_count(required_types[key]):
+                        continue
+                    if best is None or head < best:
+                        best_key, best = key, head
+                if best is None:
+                    break
+
+                emergency = queues[best_key].dequeue()
+                depth -= 1
+                x, y = emergency.coordinates
+                unit, distance = index.nearest(x, y, 1, required_types[best_key], available_only=True)[0]
+                index.set_available(unit, False)
+
+                waits.append(now - arrival_time[emergency.emergency_id])
+                busy_since[unit.unit_id] = now
+                sequence += 1
+                heappush(events, (now + distance / speed, sequence, ON_SCENE, unit, emergency))
+
+        wall_time = time.perf_counter() - wall_start
+
+        # 统计模拟结束时仍在执行任务的单位的占用时间
+        busy_time += sum(now - since for since in busy_since.values())
+
+        return {
+            'incidents': incident_count,
+            'arrived': next_incident,
+            'served': served,
+            'units': len(self.units),
+            'events': event_count,
+            'sim_time': now,
+            'wall_time': wall_time,
+            'events_per_sec': event_count / wall_time if wall_time > 0 else 0.0,
+            'mean_wait': statistics.fmean(waits) if waits else 0.0,
+            'p95_wait': _percentile(waits, 95),
+            'mean_response': statistics.fmean(responses) if responses else 0.0,
+            'p50_response': _percentile(responses, 50),
+            'p95_response': _percentile(responses, 95),
+            'max_queue_depth': max_depth,
+            'utilization': busy_time / (len(self.units) * now) if now > 0 else 0.0,
+        }
+
+
+def incidents_from_history(emergencies, count, rate, seed=None, bursty=False):
+    """
+    根据历史紧急情况生成模拟到达流
+
+    从历史记录中有放回地抽样类型、严重程度、位置和坐标，分配新的唯一ID，
+    到达时间服从泊松过程（bursty=True时使用突发到达过程）。
+
+    参数:
+        emergencies: 历史紧急情况列表
+        count: 要生成的到达次数
+        rate: 平均到达率
+        seed: 随机种子
+        bursty: 是否使用突发到达过程
+
+    返回:
+        (到达时间, Emergency)列表
+    """
+    if not emergencies:
+        return []
+    workload = WorkloadGenerator(seed=seed)
+    if bursty:
+        times = workload.bursty_arrivals(count, base_rate=rate / 2, burst_rate=rate * 5)
+    else:
+        times = workload.poisson_arrivals(count, rate)
+
+    incidents = []
+    for index, arrival in enumerate(times, 1):
+        template = workload.rng.choice(emergencies)
+        emergency = Emergency(index, template.type, template.severity_level,
+                              template.location, template.coordinates)
+        incidents.append((arrival, emergency))
+    return incidents
+
+
+def place_units(count, seed=None):
+    """在0-100坐标范围内随机放置count个单位，单位类型轮流分配"""
+    rng = random.Random(seed)
+    return [
+        EmergencyUnit(i + 1, UNIT_TYPES[i % len(UNIT_TYPES)], rng.uniform(0, 100), rng.uniform(0, 100))
+        for i in range(count)
+    ]
+
+
+def capacity_plan(incidents, unit_counts, seed=None, **simulation_options):
+    """
+    对不同的单位数量分别运行模拟，用于容量规划
+
+    参数:
+        incidents: (到达时间, Emergency)列表
+        unit_counts: 要评估的单位数量列表
+        seed: 随机种子（单位位置和处置时间）
+        simulation_options: 传递给DispatchSimulation的其他参数
+
+    返回:
+        [(单位数量, 模拟报告), ...]
+    """
+    plan = []
+    for unit_count in unit_counts:
+        simulation = DispatchSimulation(place_units(unit_count, seed), seed=seed, **simulation_options)
+        plan.append((unit_count, simulation.run(incidents)))
+    return plan
+
+
+def main(argv=None):
+    """
+    命令行入口，例如:
+        python -m emergency_response.utils.dispatch_simulation --units 5 10 20 --incidents 100000
+    """
+    parser = argparse.ArgumentParser(description='Headless discrete-event dispatch simulation')
+    parser.add_argument('--data', default=None, help='Historical incidents CSV (defaults to synthetic incidents)')
+    parser.add_argument('--incidents', type=int, default=100000)
+    parser.add_argument('--rate', type=float, default=0.2, help='Mean arrivals per time unit')
+    parser.add_argument('--bursty', action='store_true')
+    parser.add_argument('--units', type=int, nargs='+', default=[10, 20, 40, 80])
+    parser.add_argument('--speed', type=float, default=1.0)
+    parser.add_argument('--service-time', type=float, default=20.0)
+    parser.add_argument('--queue', choices=list(QUEUE_CLASSES), default='heap')
+    parser.add_argument('--match-types', action='store_true', help='Only dispatch unit types matching the emergency type')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args(argv)
+
+    if args.data:
+        from .data_loader import load_emergency_data
+        history = load_emergency_data(args.data)
+    else:
+        history = WorkloadGenerator(seed=args.seed).generate_emergencies(1000)
+    incidents = incidents_from_history(history, args.incidents, args.rate, args.seed, args.bursty)
+
+    queue_class = QUEUE_CLASSES[args.queue]
+    if queue_class is HeapPriorityQueue:
+        queue_factory = lambda capacity: HeapPriorityQueue(max_size=max(capacity, 1))
+    else:
+        queue_factory = lambda capacity: queue_class()
+
+    print(f"{'units':>6} {'served':>8} {'mean wait':>10} {'p95 resp':>10} {'max depth':>10} "
+          f"{'util':>6} {'events/s':>10}")
+    plan = capacity_plan(incidents, args.units, args.seed, queue_factory=queue_factory,
+                         unit_speed=args.speed, mean_service_time=args.service_time,
+                         match_unit_types=args.match_types)
+    for unit_count, report in plan:
+        print(f"{unit_count:>6} {report['served']:>8} {report['mean_wait']:>10.2f} "
+              f"{report['p95_response']:>10.2f} {report['max_queue_depth']:>10} "
+              f"{report['utilization']:>6.1%} {report['events_per_sec']:>10.0f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,112 @@
+import argparse
+import os
+import subprocess
+import sys
+
+# 启动时不应加载的重量级依赖（只在子窗口或性能分析中首次使用时导入）
+HEAVY_MODULES = ('numpy', 'matplotlib', 'psutil', 'pympler', 'PIL')
+
+# 主窗口模块的冷启动预算（毫秒，-X importtime的累计时间）
+COLD_START_BUDGET_MS = 500
+
+# 项目根目录，子进程在这里运行以便导入emergency_response
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+
+def parse_importtime(output, module=None):
+    """
+    解析python -X importtime的输出
+
+    参数:
+        output: 标准错误输出文本
+        module: 可选，只返回该模块及其导入的模块（排除解释器启动时由site加载的模块）
+
+    返回:
+        {模块名: (自身耗时微秒, 累计耗时微秒)}
+    """
+    entries = []
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # 表头
+        name = fields[2].lstrip()
+        depth = (len(fields[2]) - len(name) - 1) // 2
+        entries.append((name.strip(), int(fields[0]), int(fields[1]), depth))
+
+    if module is not None:
+        # 子模块的行出现在导入它的模块之前，并且缩进更深
+        end = max(i for i, entry in enumerate(entries) if entry[0] == module)
+        start = end
+        while start > 0 and entries[start - 1][3] > entries[end][3]:
+            start -= 1
+        entries = entries[start:end + 1]
+    return {name: (self_us, cumulative_us) for name, self_us, cumulative_us, _ in entries}
+
+
+def measure_import_time(module, repeats=3, python=None):
+    """
+    在新的解释器中导入模块并测量导入时间
+
+    参数:
+        module: 要导入的模块名
+        repeats: 重复次数（取模块累计耗时最短的一次）
+        python: 可选，解释器路径，默认为当前解释器
+
+    返回:
+        {模块名: (自身耗时微秒, 累计耗时微秒)}，包含导入过程中加载的所有模块
+    """
+    best = None
+    for _ in range(repeats):
+        completed = subprocess.run(
+            [python or sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+            cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+        )
+        modules = parse_importtime(completed.stderr, module)
+        if best is None or modules[module][1] < best[module][1]:
+            best = modules
+    return best
+
+
+def heavy_imports(modules):
+    """返回导入过程中加载的重量级依赖（顶层包名）"""
+    return sorted({name.split('.')[0] for name in modules} & set(HEAVY_MODULES))
+
+
+def non_stdlib_imports(modules, package='emergency_response'):
+    """返回导入过程中加载的既不属于标准库也不属于本项目的顶层包名"""
+    top_level = {name.split('.')[0] for name in modules}
+    return sorted(top_level - set(sys.stdlib_module_names) - {package})
+
+
+def main(argv=None):
+    """
+    命令行入口，例如:
+        python -m emergency_response.utils.import_time emergency_response.gui.main_app
+    """
+    parser = argparse.ArgumentParser(description='Measure cold-start import time with -X importtime')
+    parser.add_argument('modules', nargs='*', default=['emergency_response.gui.main_app'])
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--top', type=int, default=10, help='Number of slowest imports to list')
+    parser.add_argument('--budget', type=float, default=COLD_START_BUDGET_MS, help='Cumulative budget in ms')
+    args = parser.parse_args(argv)
+
+    failed = False
+    for module in args.modules:
+        modules = measure_import_time(module, args.repeats)
+        total_ms = modules[module][1] / 1000
+        heavy = heavy_imports(modules)
+        print(f"{module}: {total_ms:.1f}ms cumulative, {len(modules)} modules loaded")
+        for name, (_, cumulative) in sorted(modules.items(), key=lambda item: -item[1][1])[:args.top]:
+            print(f"  {cumulative / 1000:>8.1f}ms  {name}")
+        if heavy:
+            print(f"  heavy dependencies imported: {', '.join(heavy)}")
+        if total_ms > args.budget:
+            print(f"  over budget ({args.budget:.0f}ms)")
+        failed = failed or bool(heavy) or total_ms > args.budget
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
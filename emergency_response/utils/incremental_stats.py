@@ -0,0 +1,133 @@
+from collections import Counter
+
+from ..data_structures.queue_events import INSERTED, REMOVED, REPRIORITISED
+
+
+class IncrementalStats:
+    """
+    随队列变更增量维护的紧急情况统计
+
+    维护按类型、严重程度和地点的计数以及严重程度总和，每次入队、出队和
+    更改优先级都是O(1)，界面读取缓存的结果而不需要遍历队列。
+    严重程度只有1-10级，最大值通过扫描直方图的非零项得到。
+
+    每个紧急情况被计入时的严重程度按对象记录下来：三个队列共享同一个Emergency
+    对象，另一个队列可能已经修改了它的severity_level，因此不能依赖事件中的旧值。
+    记录以id(emergency)为键而不是emergency_id，因为队列允许重复的ID；记录中保存
+    对象本身，保证计入期间id不会被其他对象复用。
+    """
+
+    def __init__(self, emergencies=()):
+        """
+        初始化统计
+
+        参数:
+            emergencies: 可选，初始的紧急情况对象
+        """
+        self.type_counts = Counter()       # EmergencyType -> 数量
+        self.severity_counts = Counter()   # 严重程度 -> 数量
+        self.location_counts = Counter()   # 地点 -> 数量
+        self.severity_sum = 0
+        self.entries = {}                  # id(emergency) -> [emergency, 计入时的严重程度, 计入次数]
+        self.entry_count = 0
+        self.queue = None
+        for emergency in emergencies:
+            self.add(emergency)
+
+    @classmethod
+    def attach(cls, queue):
+        """
+        为队列创建统计并订阅它的变更事件（只在创建时遍历一次队列）
+
+        参数:
+            queue: 支持subscribe的优先队列
+
+        返回:
+            IncrementalStats
+        """
+        stats = cls(queue)
+        stats.queue = queue
+        queue.subscribe(stats.on_queue_event)
+        return stats
+
+    def detach(self):
+        """取消对队列变更事件的订阅"""
+        if self.queue is not None:
+            self.queue.unsubscribe(self.on_queue_event)
+            self.queue = None
+
+    @property
+    def total(self):
+        """紧急情况总数"""
+        return self.entry_count
+
+    @property
+    def mean_severity(self):
+        """平均严重程度，没有紧急情况时为0"""
+        return self.severity_sum / self.total if self.total else 0
+
+    @property
+    def max_severity(self):
+        """最大严重程度，没有紧急情况时为0"""
+        return max((severity for severity, count in self.severity_counts.items() if count > 0), default=0)
+
+    def add(self, emergency):
+        """计入一个紧急情况"""
+        entry = self.entries.get(id(emergency))
+        if entry is None:
+            self.entries[id(emergency)] = [emergency, emergency.severity_level, 1]
+        else:
+            # 同一个对象再次入队：先同步它在别处被修改的严重程度
+            self.update_severity(emergency)
+            entry[2] += 1
+        severity = emergency.severity_level
+        self.entry_count += 1
+        self.type_counts[emergency.type] += 1
+        self.severity_counts[severity] += 1
+        self.location_counts[emergency.location] += 1
+        self.severity_sum += severity
+
+    def remove(self, emergency):
+        """移除一个紧急情况（未计入时忽略）"""
+        entry = self.entries.get(id(emergency))
+        if entry is None:
+            return
+        severity = entry[1]
+        entry[2] -= 1
+        if entry[2] == 0:
+            del self.entries[id(emergency)]
+        self.entry_count -= 1
+        self._decrement(self.type_counts, emergency.type)
+        self._decrement(self.severity_counts, severity)
+        self._decrement(self.location_counts, emergency.location)
+        self.severity_sum -= severity
+
+    def update_severity(self, emergency):
+        """按紧急情况当前的severity_level更新严重程度统计"""
+        entry = self.entries.get(id(emergency))
+        new_severity = emergency.severity_level
+        if entry is None or entry[1] == new_severity:
+            return
+        _, old_severity, count = entry
+        entry[1] = new_severity
+        self.severity_counts[old_severity] -= count
+        if self.severity_counts[old_severity] <= 0:
+            del self.severity_counts[old_severity]
+        self.severity_counts[new_severity] += count
+        self.severity_sum += (new_severity - old_severity) * count
+
+    def on_queue_event(self, queue, event):
+        """队列变更事件的回调"""
+        if event.kind == INSERTED:
+            self.add(event.item)
+        elif event.kind == REMOVED:
+            self.remove(event.item)
+        elif event.kind == REPRIORITISED:
+            self.update_severity(event.item)
+
+    @staticmethod
+    def _decrement(counter, key):
+        """计数减一，减到0时删除该项"""
+        counter[key] -= 1
+        if counter[key] <= 0:
+            del counter[key]
@@ -0,0 +1,326 @@
+import time
+
+from ..data_structures.linked_list import LinkedListPriorityQueue
+from ..data_structures.binary_tree import BinarySearchTree
+from ..data_structures.heap import HeapPriorityQueue
+from .streaming_stats import LogHistogram
+
+# 统计的操作和计数器
+OPERATIONS = ('enqueue', 'dequeue', 'search', 'change_priority')
+COUNTERS = ('comparisons', 'swaps', 'nodes_visited', 'allocations')
+
+# 导出的延迟分位数
+LATENCY_QUANTILES = (0.5, 0.95, 0.99)
+
+
+class OperationMetrics:
+    """一种操作的累计计数和延迟直方图"""
+
+    def __init__(self):
+        """初始化计数"""
+        self.calls = 0
+        self.totals = dict.fromkeys(COUNTERS, 0)
+        self.latency = LogHistogram(min_value=1e-7, max_value=60.0)
+        self.latency_sum = 0.0
+
+    def record(self, counts, elapsed):
+        """
+        记录一次操作
+
+        参数:
+            counts: 本次操作的计数 {计数器名: 次数}
+            elapsed: 本次操作的耗时（秒）
+        """
+        self.calls += 1
+        for name, value in counts.items():
+            self.totals[name] += value
+        self.latency.record(elapsed)
+        self.latency_sum += elapsed
+
+    def snapshot(self):
+        """返回计数和延迟分位数的字典"""
+        snapshot = {'calls': self.calls, 'latency_sum': self.latency_sum}
+        snapshot.update(self.totals)
+        for q in LATENCY_QUANTILES:
+            snapshot[f'latency_p{int(q * 100)}'] = self.latency.quantile(q) or 0.0
+        return snapshot
+
+
+class QueueInstrumentation:
+    """
+    优先队列的按操作计数与延迟统计
+
+    attach时把队列实例的类替换为一个插桩子类，detach时换回原来的类，
+    因此未插桩的队列执行的仍是原始代码，没有任何额外开销。插桩子类不修改算法本身：
+
+    - 堆：重写_is_higher_priority、_swap、_shift_up和_shift_down，分别计数比较、交换和访问的位置
+    - 链表和二叉搜索树：插入时把新项目临时换成一个计数的子类，Python对子类优先调用
+      反射比较方法，因此与它有关的每次比较都会被计数（每个不同的比较对象计一次节点访问）；
+      按ID查找时传入计数的整数子类，每检查一个节点的ID计一次节点访问
+    - 分配：链表和树每插入一个节点计一次，堆在数组扩容时计一次
+
+    延迟包含计数本身的开销，适合比较不同结构，而不是精确的绝对耗时。
+
+    注意：插入期间新项目的__class__会被临时替换。界面中的三个队列共享同一批
+    Emergency对象，因此被插桩的队列应当使用自己的项目副本（例如clone_emergencies），
+    插桩也不是线程安全的，插入期间其他线程看到的项目类型是计数子类。
+    Prometheus导出和/metrics服务在metrics_server模块中，测量引擎不需要导入HTTP服务。
+    """
+
+    def __init__(self):
+        """初始化统计（通常使用attach创建）"""
+        self.metrics = {operation: OperationMetrics() for operation in OPERATIONS}
+        self.queue = None
+        self.original_class = None
+        self._counts = None        # 正在执行的操作的计数
+        self._last_visited = None  # 最近一次比较的对象，用于统计不同的节点
+        self._probes = {}          # 项目类 -> 计数子类
+
+    @classmethod
+    def attach(cls, queue):
+        """
+        为队列启用插桩
+
+        参数:
+            queue: LinkedListPriorityQueue、BinarySearchTree（及其子类）或HeapPriorityQueue
+
+        返回:
+            QueueInstrumentation
+        """
+        if getattr(queue, 'instrumentation', None) is not None:
+            raise ValueError("队列已经启用了插桩")
+        instrumentation = cls()
+        instrumentation.queue = queue
+        instrumentation.original_class = type(queue)
+        queue.instrumentation = instrumentation
+        queue.__class__ = _instrumented_class(type(queue))
+        return instrumentation
+
+    def detach(self):
+        """恢复队列原来的类，之后的操作不再计数"""
+        if self.queue is not None:
+            self.queue.__class__ = self.original_class
+            del self.queue.instrumentation
+            self.queue = None
+
+    def reset(self):
+        """清空已记录的计数和延迟"""
+        self.metrics = {operation: OperationMetrics() for operation in OPERATIONS}
+
+    def snapshot(self):
+        """
+        返回所有操作的统计
+
+        返回:
+            {操作名: {'calls', 'comparisons', 'swaps', 'nodes_visited', 'allocations',
+                     'latency_sum', 'latency_p50', 'latency_p95', 'latency_p99'}}
+        """
+        return {operation: metrics.snapshot() for operation, metrics in self.metrics.items()}
+
+    def _run(self, operation, method, args):
+        """执行一次被统计的操作（嵌套调用只算在最外层的操作中）"""
+        if self._counts is not None:
+            return method(*args)
+        self._counts = dict.fromkeys(COUNTERS, 0)
+        self._last_visited = None
+        start = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.metrics[operation].record(self._counts, elapsed)
+            self._counts = None
+            self._last_visited = None
+
+    def _count(self, counter, amount=1):
+        """在当前操作中增加计数（不在统计的操作中时忽略）"""
+        if self._counts is not None:
+            self._counts[counter] += amount
+
+    def _compared(self, other):
+        """记录一次与other的比较"""
+        self._count('comparisons')
+        if other is not self._last_visited:
+            self._last_visited = other
+            self._count('nodes_visited')
+
+    def _probe_class(self, item_class):
+        """返回item_class的计数子类"""
+        probe = self._probes.get(item_class)
+        if probe is None:
+            instrumentation = self
+
+            def __lt__(item, other):
+                instrumentation._compared(other)
+                return item_class.__lt__(item, other)
+
+            def __gt__(item, other):
+                instrumentation._compared(other)
+                return item_class.__gt__(item, other)
+
+            probe = type(item_class.__name__, (item_class,), {
+                '__slots__': (), '__lt__': __lt__, '__gt__': __gt__
+            })
+            self._probes[item_class] = probe
+        return probe
+
+    def _probe_item(self, insert, item):
+        """
+        在item被换成计数子类期间调用insert(item)
+
+        item属于调用方：替换期间（包括insert抛出异常之前）其他持有它的代码会看到
+        计数子类，因此只应对队列私有的项目使用，并且不能与其他线程并发。
+        """
+        original = item.__class__
+        item.__class__ = self._probe_class(original)
+        try:
+            return insert(item)
+        finally:
+            item.__class__ = original
+
+    def _probe_id(self, emergency_id):
+        """返回计数的ID（非整数ID原样返回）"""
+        if type(emergency_id) is not int:
+            return emergency_id
+        probe = _IdProbe(emergency_id)
+        probe.instrumentation = self
+        return probe
+
+
+class _IdProbe(int):
+    """与节点ID比较时计一次节点访问的整数"""
+
+    __hash__ = int.__hash__
+
+    def __eq__(self, other):
+        self.instrumentation._count('nodes_visited')
+        return int.__eq__(self, other)
+
+    def __ne__(self, other):
+        self.instrumentation._count('nodes_visited')
+        return int.__ne__(self, other)
+
+
+class _HeapProbes:
+    """堆的计数重写"""
+
+    def enqueue(self, item):
+        length = len(self.heap)
+        result = super().enqueue(item)
+        if len(self.heap) > length:
+            self.instrumentation._count('allocations')
+        return result
+
+    def search(self, emergency_id):
+        # 通过ID到下标的字典直接定位
+        self.instrumentation._count('nodes_visited')
+        return super().search(emergency_id)
+
+    def _is_higher_priority(self, index1, index2):
+        self.instrumentation._count('comparisons')
+        return super()._is_higher_priority(index1, index2)
+
+    def _swap(self, i, j):
+        self.instrumentation._count('swaps')
+        super()._swap(i, j)
+
+    def _shift_up(self, index):
+        self.instrumentation._count('nodes_visited')
+        super()._shift_up(index)
+
+    def _shift_down(self, index):
+        if index <= self.count:
+            self.instrumentation._count('nodes_visited')
+        super()._shift_down(index)
+
+
+class _LinkedListProbes:
+    """链表的计数重写"""
+
+    def _insert(self, item):
+        self.instrumentation._count('allocations')
+        self.instrumentation._probe_item(super()._insert, item)
+
+    def dequeue(self):
+        if self.head is not None:
+            self.instrumentation._count('nodes_visited')
+        return super().dequeue()
+
+    def search(self, emergency_id):
+        return super().search(self.instrumentation._probe_id(emergency_id))
+
+    def change_priority(self, emergency_id, new_severity):
+        return super().change_priority(self.instrumentation._probe_id(emergency_id), new_severity)
+
+
+class _TreeProbes:
+    """二叉搜索树的计数重写"""
+
+    def _insert(self, item):
+        self.instrumentation._count('allocations')
+        self.instrumentation._probe_item(super()._insert, item)
+
+    def get_min(self):
+        # 沿左侧路径访问到最小节点
+        current = self.root
+        while current is not None:
+            self.instrumentation._count('nodes_visited')
+            current = current.left
+        return super().get_min()
+
+    def remove_min(self):
+        # 沿左侧路径访问到最小节点后直接摘除
+        current = self.root
+        while current is not None:
+            self.instrumentation._count('nodes_visited')
+            current = current.left
+        return super().remove_min()
+
+    def search_by_id(self, emergency_id):
+        return super().search_by_id(self.instrumentation._probe_id(emergency_id))
+
+    def remove(self, emergency_id):
+        return super().remove(self.instrumentation._probe_id(emergency_id))
+
+    def update_severity(self, emergency_id, new_severity):
+        return super().update_severity(self.instrumentation._probe_id(emergency_id), new_severity)
+
+
+# 队列基类 -> (计数重写, {被统计的方法名: 操作名})
+_PROBES = (
+    (HeapPriorityQueue, _HeapProbes, {
+        'enqueue': 'enqueue', 'dequeue': 'dequeue', 'search': 'search', 'change_priority': 'change_priority'
+    }),
+    (LinkedListPriorityQueue, _LinkedListProbes, {
+        'enqueue': 'enqueue', 'dequeue': 'dequeue', 'search': 'search', 'change_priority': 'change_priority'
+    }),
+    (BinarySearchTree, _TreeProbes, {
+        'insert': 'enqueue', 'remove_min': 'dequeue', 'search_by_id': 'search', 'update_severity': 'change_priority'
+    }),
+)
+
+_INSTRUMENTED_CLASSES = {}
+
+
+def _timed(name, operation):
+    """创建统计一次operation的方法，实际工作交给插桩子类的父类"""
+    def method(self, *args):
+        return self.instrumentation._run(operation, getattr(super(type(self), self), name), args)
+    method.__name__ = name
+    return method
+
+
+def _instrumented_class(queue_class):
+    """返回queue_class的插桩子类（按类缓存）"""
+    instrumented = _INSTRUMENTED_CLASSES.get(queue_class)
+    if instrumented is None:
+        for base, probes, methods in _PROBES:
+            if issubclass(queue_class, base):
+                break
+        else:
+            raise TypeError(f"不支持插桩的队列类型: {queue_class.__name__}")
+        counted = type(f"Counted{queue_class.__name__}", (probes, queue_class), {})
+        namespace = {name: _timed(name, operation) for name, operation in methods.items()}
+        instrumented = type(f"Instrumented{queue_class.__name__}", (counted,), namespace)
+        _INSTRUMENTED_CLASSES[queue_class] = instrumented
+    return instrumented
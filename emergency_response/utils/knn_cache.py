@@ -0,0 +1,71 @@
+from collections import OrderedDict
+
+
+class KNNCache:
+    """
+    SpatialIndex.nearest查询结果的LRU缓存
+
+    缓存键包含查询标识（例如紧急事件ID）、坐标、类型过滤、可用状态过滤和索引的
+    version。单位被插入、删除、移动或改变可用状态时version会增加，旧结果自然不再
+    命中，并随LRU淘汰。
+    已缓存较大k的结果时，较小k的查询直接返回其前缀；结果少于缓存的k说明已经包含
+    所有符合条件的单位，任何k都可以直接使用。
+    """
+
+    def __init__(self, index, max_entries=256):
+        """
+        初始化缓存
+
+        参数:
+            index: 被缓存的SpatialIndex
+            max_entries: 最多保留的查询结果数量
+        """
+        if max_entries <= 0:
+            raise ValueError("缓存容量必须为正数")
+        self.index = index
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # key -> (k, [(unit, distance), ...])
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        """返回缓存的结果数量"""
+        return len(self.entries)
+
+    def clear(self):
+        """清空缓存和命中统计"""
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def nearest(self, x, y, k, types=None, available_only=False, key=None):
+        """
+        查找离给定坐标最近的k个单位，参数与SpatialIndex.nearest相同
+
+        参数:
+            key: 可选，查询标识，例如紧急事件ID
+
+        返回:
+            [(unit, distance), ...]，按距离从近到远排序
+        """
+        cache_key = (
+            key, x, y,
+            None if types is None else frozenset(types),
+            available_only,
+            self.index.version
+        )
+        entry = self.entries.get(cache_key)
+        if entry is not None:
+            cached_k, results = entry
+            if k <= cached_k or len(results) < cached_k:
+                self.entries.move_to_end(cache_key)
+                self.hits += 1
+                return results[:k]
+
+        self.misses += 1
+        results = self.index.nearest(x, y, k, types=types, available_only=available_only)
+        self.entries[cache_key] = (k, results)
+        self.entries.move_to_end(cache_key)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return list(results)
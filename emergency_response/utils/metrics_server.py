@@ -0,0 +1,101 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .instrumentation import COUNTERS, LATENCY_QUANTILES
+
+
+def export_prometheus(instrumentations):
+    """
+    以Prometheus文本格式导出统计
+
+    参数:
+        instrumentations: {队列名: QueueInstrumentation}
+
+    返回:
+        文本格式的指标
+    """
+    lines = [
+        '# HELP queue_operations_total Instrumented queue operations.',
+        '# TYPE queue_operations_total counter',
+    ]
+    snapshots = {name: instrumentation.snapshot() for name, instrumentation in instrumentations.items()}
+
+    def labels(name, operation):
+        return f'queue="{name}",operation="{operation}"'
+
+    for name, snapshot in snapshots.items():
+        for operation, values in snapshot.items():
+            lines.append(f'queue_operations_total{{{labels(name, operation)}}} {values["calls"]}')
+    for counter in COUNTERS:
+        lines.append(f'# HELP queue_{counter}_total {counter.replace("_", " ").capitalize()} performed by queue operations.')
+        lines.append(f'# TYPE queue_{counter}_total counter')
+        for name, snapshot in snapshots.items():
+            for operation, values in snapshot.items():
+                lines.append(f'queue_{counter}_total{{{labels(name, operation)}}} {values[counter]}')
+    lines.append('# HELP queue_operation_latency_seconds Queue operation latency.')
+    lines.append('# TYPE queue_operation_latency_seconds summary')
+    for name, snapshot in snapshots.items():
+        for operation, values in snapshot.items():
+            for q in LATENCY_QUANTILES:
+                value = values[f'latency_p{int(q * 100)}']
+                lines.append(f'queue_operation_latency_seconds{{{labels(name, operation)},quantile="{q}"}} {value:.9g}')
+            lines.append(f'queue_operation_latency_seconds_sum{{{labels(name, operation)}}} {values["latency_sum"]:.9g}')
+            lines.append(f'queue_operation_latency_seconds_count{{{labels(name, operation)}}} {values["calls"]}')
+    return '\n'.join(lines) + '\n'
+
+
+class MetricsServer:
+    """
+    在后台线程中通过HTTP提供 /metrics（Prometheus文本格式）
+
+    读取统计时不加锁：计数只会增加，抓取到的是某一时刻附近的近似值。
+    """
+
+    def __init__(self, instrumentations, host='127.0.0.1', port=0):
+        """
+        初始化服务器
+
+        参数:
+            instrumentations: {队列名: QueueInstrumentation}，之后加入的队列也会被导出
+            host: 监听地址
+            port: 监听端口，0表示自动选择
+        """
+        self.instrumentations = instrumentations
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != '/metrics':
+                    self.send_error(404)
+                    return
+                body = export_prometheus(server.instrumentations).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # 不在控制台输出访问日志
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.thread = None
+
+    @property
+    def port(self):
+        """实际监听的端口"""
+        return self.httpd.server_address[1]
+
+    def start(self):
+        """在守护线程中开始服务"""
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """停止服务并关闭端口"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
@@ -1,27 +1,81 @@
 import time
 import random
 import gc
-import matplotlib.pyplot as plt
+import heapq
+import math
+import struct
 import sys
-import psutil
-import os
-from pympler import asizeof  # 导入pympler的asizeof模块
+import tracemalloc
 
 from ..data_structures.emergency import Emergency, EmergencyType
-from ..data_structures.linked_list import LinkedListPriorityQueue
-from ..data_structures.binary_tree import BinaryTreePriorityQueue
+from ..data_structures.linked_list import LinkedListPriorityQueue, Node
+from ..data_structures.binary_tree import BinaryTreePriorityQueue, TreeNode
 from ..data_structures.heap import HeapPriorityQueue
+from ..data_structures.emergency_unit import EmergencyUnit, UNIT_TYPES
+from ..data_structures.spatial_index import SpatialIndex
+from ..data_structures.spatial_hash import GridSpatialHash
+from .workload import WorkloadGenerator, DEFAULT_OPERATION_RATIOS, clone_emergencies, clone_operations
+from .instrumentation import QueueInstrumentation
+
+
+# measure_space_complexity支持的内存测量方式
+SPACE_METHODS = ('asizeof', 'tracemalloc', 'layout')
+POINTER_SIZE = struct.calcsize('P')
+
+
+class BenchmarkCancelled(Exception):
+    """基准测试在运行过程中被取消"""
+
+
+class _LinearScanIndex:
+    """暴力扫描所有单位的最近邻查询，作为空间索引基准测试的参照"""
+
+    def __init__(self, units):
+        self.units = list(units)
+
+    def move(self, unit, x, y):
+        unit.location_x = x
+        unit.location_y = y
+
+    def k_nearest(self, x, y, k):
+        nearest = heapq.nsmallest(
+            k, self.units,
+            key=lambda unit: (unit.location_x - x) ** 2 + (unit.location_y - y) ** 2
+        )
+        return [(unit, math.hypot(unit.location_x - x, unit.location_y - y)) for unit in nearest]
 
 
 class PerformanceAnalyzer:
-    """一个用于比较不同优先级队列实现的性能分析器。"""
+    """
+    一个用于比较不同优先级队列实现的性能分析器。
+
+    只负责测量，导入时不加载matplotlib或pympler，可以在无界面的工作进程中使用；
+    绘图由performance_plotting完成，pympler只在测量空间复杂度时导入。
+    """
+
+    def __init__(self, workload=None, progress_callback=None, cancel_event=None):
+        """
+        初始化性能分析器。
 
-    def __init__(self):
-        """初始化性能分析器。"""
+        参数:
+            workload: 可选，WorkloadGenerator实例。设置后测试数据由它生成，
+                      从而可以使用偏斜的严重程度分布、特定的入队顺序和固定的随机种子。
+            progress_callback: 可选，进度回调 fn(fraction, message)，在每个测试单元完成后调用
+            cancel_event: 可选，threading.Event。被设置后测试在下一个检查点抛出BenchmarkCancelled
+        """
+        self.workload = workload
+        self.progress_callback = progress_callback
+        self.cancel_event = cancel_event
         self.results = {}
+        # 每次重复运行的原始耗时，格式: {operation: {queue_type: [[每次运行耗时], ...]}}
+        # 与data_sizes一一对应，供基准结果存储和显著性检验使用
+        self.samples = {}
 
     def generate_random_emergencies(self, count):
         """生成一个随机紧急事件对象的列表。"""
+        if self.workload is not None:
+            return self.workload.generate_emergencies(count)
+
         emergencies = []
         emergency_types = [EmergencyType.FIRE, EmergencyType.MEDICAL, EmergencyType.POLICE]
         locations = ["Downtown", "Suburbs", "City Center", "Industrial Area", "Residential Area"]
@@ -37,6 +91,16 @@ class PerformanceAnalyzer:
         
         return emergencies
 
+    def _check_cancelled(self):
+        """如果已请求取消则抛出BenchmarkCancelled（检查点位于计时区间之外）"""
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise BenchmarkCancelled("基准测试已取消")
+
+    def _report_progress(self, done, total, message):
+        """向进度回调报告已完成的比例"""
+        if self.progress_callback is not None:
+            self.progress_callback(done / total if total else 1.0, message)
+
     def _run_test_for_operation(self, data_sizes, operation_name):
         """
         对不同数据大小的特定操作运行性能测试。
@@ -46,22 +110,28 @@ class PerformanceAnalyzer:
             operation_name: 操作名称 ('enqueue', 'dequeue', 'search').
         """
         results = {'Linked List': [], 'Binary Tree': [], 'Heap': []}
+        samples = {'Linked List': [], 'Binary Tree': [], 'Heap': []}
         queue_classes = {
             'Linked List': LinkedListPriorityQueue,
             'Binary Tree': BinaryTreePriorityQueue,
             'Heap': HeapPriorityQueue
         }
 
-        for size in data_sizes:
+        total_steps = len(data_sizes) * len(queue_classes)
+        for size_index, size in enumerate(data_sizes):
             if size <= 0:
-                for name in queue_classes: results[name].append(0)
+                for name in queue_classes:
+                    results[name].append(0)
+                    samples[name].append([])
                 continue
 
             emergencies = self.generate_random_emergencies(size)
             
-            for name, queue_class in queue_classes.items():
+            for queue_index, (name, queue_class) in enumerate(queue_classes.items()):
+                self._check_cancelled()
                 repeat_count = 10
                 total_time = 0
+                run_times = []
 
                 for _ in range(repeat_count):
                     queue = queue_class()
@@ -88,9 +158,13 @@ class PerformanceAnalyzer:
                     end_time = time.perf_counter()
                     gc.enable()
                     total_time += (end_time - start_time)
+                    run_times.append(end_time - start_time)
 
                 avg_time = total_time / repeat_count
                 results[name].append(avg_time)
+                samples[name].append(run_times)
+                self._report_progress(size_index * len(queue_classes) + queue_index + 1, total_steps,
+                                      f"{operation_name}: {name}, size {size}")
             
             print(f"Data Size: {size}, "
                   f"Linked List: {results['Linked List'][-1]:.6f}s, "
@@ -98,9 +172,27 @@ class PerformanceAnalyzer:
                   f"Heap: {results['Heap'][-1]:.6f}s")
         
         self.results[operation_name] = results
+        self.samples[operation_name] = samples
+
+    def measure_space_complexity(self, data_sizes, method='asizeof'):
+        """
+        测量不同数据结构的空间复杂度：填充后的队列（包括其中的紧急情况对象）比空队列多占用的内存（KB）
+
+        参数:
+            data_sizes: 要测试的数据大小列表
+            method: 测量方式，SPACE_METHODS之一
+                'asizeof'     - 用pympler遍历整个对象图，最准确但大数据量时很慢
+                'tracemalloc' - 统计复制紧急情况并构建队列期间新分配且仍然存活的内存
+                'layout'      - 根据已知的节点/数组结构用sys.getsizeof估算，不构建队列，
+                                可以很快地测到10^6规模（不计分配器开销，是近似值）
+        """
+        if method not in SPACE_METHODS:
+            raise ValueError(f"未知的内存测量方式: {method}")
+        measure = {
+            'asizeof': self._asizeof_bytes,
+            'tracemalloc': self._tracemalloc_bytes,
+        }.get(method)
 
-    def measure_space_complexity(self, data_sizes):
-        """使用pympler库测量不同数据结构的空间复杂度"""
         results = {'Linked List': [], 'Binary Tree': [], 'Heap': []}
         queue_classes = {
             'Linked List': LinkedListPriorityQueue,
@@ -108,10 +200,10 @@ class PerformanceAnalyzer:
             'Heap': HeapPriorityQueue
         }
         
-        # 运行三次测试并取平均值以获得更稳定的结果
-        num_runs = 3
+        # 运行三次测试并取平均值以获得更稳定的结果（layout的结果是确定的，只需一次）
+        num_runs = 1 if method == 'layout' else 3
         
-        for size in data_sizes:
+        for size_index, size in enumerate(data_sizes):
             if size <= 0:
                 for name in queue_classes: 
                     results[name].append(0)
@@ -122,6 +214,16 @@ class PerformanceAnalyzer:
             
             # 多次运行以获得更准确的结果
             for run in range(num_runs):
+                self._check_cancelled()
+                self._report_progress(size_index * num_runs + run, len(data_sizes) * num_runs,
+                                      f"space ({method}): size {size}, run {run + 1}/{num_runs}")
+                if method == 'layout':
+                    # 只需要一个样本对象，不生成全部数据
+                    sample = self.generate_random_emergencies(1)[0]
+                    for name, queue_class in queue_classes.items():
+                        memory_usage[name].append(self._layout_bytes(queue_class, sample, size) / 1024)
+                    continue
+                
                 # 为所有测试创建相同的紧急情况数据
                 emergencies = self.generate_random_emergencies(size)
                 
@@ -129,32 +231,9 @@ class PerformanceAnalyzer:
                 gc.collect()
                 
                 for name, queue_class in queue_classes.items():
-                    # 创建空队列
-                    empty_queue = queue_class()
-                    
-                    # 测量空队列的内存占用
-                    empty_size = asizeof.asizeof(empty_queue)
-                    
-                    # 创建并填充队列
-                    queue = queue_class()
-                    for e in emergencies:
-                        queue.enqueue(e)
-                    
-                    # 测量填充后的队列内存占用
-                    full_size = asizeof.asizeof(queue)
-                    
-                    # 计算差异（转换为KB）
-                    memory_used = (full_size - empty_size) / 1024
-                    
-                    # 确保测量值合理（不为负值）
-                    memory_used = max(0, memory_used)
-                    
-                    # 添加到当前运行的结果中
+                    # 计算差异（转换为KB），确保测量值合理（不为负值）
+                    memory_used = max(0, measure(queue_class, emergencies)) / 1024
                     memory_usage[name].append(memory_used)
-                    
-                    # 清理队列以释放内存
-                    del queue
-                    del empty_queue
             
             # 计算平均值并添加到最终结果
             for name in queue_classes:
@@ -164,6 +243,278 @@ class PerformanceAnalyzer:
         
         self.results['space'] = results
 
+    def measure_operation_counts(self, data_sizes, search_count=100):
+        """
+        用QueueInstrumentation统计每种操作的比较、交换、节点访问和分配次数
+
+        每个数据大小下，每种队列依次执行：入队全部紧急情况、查找search_count个ID、
+        修改search_count个紧急情况的优先级、全部出队。
+
+        参数:
+            data_sizes: 要测试的数据大小列表
+            search_count: 每个数据大小下查找和修改优先级的次数
+
+        返回:
+            {队列类型: [每个数据大小的QueueInstrumentation.snapshot()]}，同时保存在
+            self.results['operation_counts']中
+        """
+        results = {'Linked List': [], 'Binary Tree': [], 'Heap': []}
+        queue_classes = {
+            'Linked List': LinkedListPriorityQueue,
+            'Binary Tree': BinaryTreePriorityQueue,
+            'Heap': HeapPriorityQueue
+        }
+        rng = random.Random(0)
+
+        for size_index, size in enumerate(data_sizes):
+            self._check_cancelled()
+            self._report_progress(size_index, len(data_sizes), f"operation counts: size {size}")
+            emergencies = self.generate_random_emergencies(size)
+            targets = [rng.choice(emergencies) for _ in range(search_count)] if emergencies else []
+            new_severities = [rng.randint(1, 10) for _ in targets]
+
+            for name, queue_class in queue_classes.items():
+                queue = self._create_queue(queue_class, size)
+                instrumentation = QueueInstrumentation.attach(queue)
+                try:
+                    for e in clone_emergencies(emergencies):
+                        queue.enqueue(e)
+                    for target in targets:
+                        queue.search(target.emergency_id)
+                    for target, severity in zip(targets, new_severities):
+                        queue.change_priority(target.emergency_id, severity)
+                    while not queue.is_empty():
+                        queue.dequeue()
+                finally:
+                    instrumentation.detach()
+                results[name].append(instrumentation.snapshot())
+
+        self.results['operation_counts'] = results
+        return results
+
+    def _asizeof_bytes(self, queue_class, emergencies):
+        """用pympler测量填充后的队列比空队列多占用的字节数"""
+        from pympler import asizeof  # 只有这种测量方式需要pympler
+        
+        # 测量空队列的内存占用
+        empty_size = asizeof.asizeof(self._create_queue(queue_class, len(emergencies)))
+        
+        # 创建并填充队列，测量填充后的内存占用
+        queue = self._create_queue(queue_class, len(emergencies))
+        for e in emergencies:
+            queue.enqueue(e)
+        return asizeof.asizeof(queue) - empty_size
+
+    def _tracemalloc_bytes(self, queue_class, emergencies):
+        """用tracemalloc测量复制紧急情况并填充队列后仍然存活的新分配字节数"""
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            # 复制一份紧急情况，使它们的内存也计入（与asizeof的口径一致）
+            clones = clone_emergencies(emergencies)
+            queue = self._create_queue(queue_class, len(clones))
+            for e in clones:
+                queue.enqueue(e)
+            # 不计入临时保存副本的列表
+            used = tracemalloc.get_traced_memory()[0] - before - sys.getsizeof(clones)
+            del queue, clones
+        finally:
+            if started:
+                tracemalloc.stop()
+        return used
+
+    @staticmethod
+    def _layout_bytes(queue_class, sample, size):
+        """
+        根据队列的已知结构估算size个元素占用的字节数
+
+        每个紧急情况对象计一次；链表和二叉树每个元素一个节点对象；
+        堆是一个指针数组加上ID到下标的字典。
+        """
+        def object_bytes(obj):
+            # 同一个类的实例共享属性键（PEP 412），每个属性值只占一个指针
+            return sys.getsizeof(obj) + len(vars(obj)) * POINTER_SIZE
+        
+        # 每个紧急情况还各自持有一个ID整数对象
+        payload = size * (object_bytes(sample) + sys.getsizeof(sample.emergency_id))
+        if queue_class is HeapPriorityQueue:
+            array = sys.getsizeof([None] * (size + 1)) - sys.getsizeof([None])
+            index = sys.getsizeof(dict.fromkeys(range(size))) - sys.getsizeof({})
+            return payload + array + index
+        node_class = {LinkedListPriorityQueue: Node, BinaryTreePriorityQueue: TreeNode}[queue_class]
+        return payload + size * object_bytes(node_class(sample))
+
+    def measure_mixed_workload(self, target_depth, operation_count, ratios=None, seed=None):
+        """
+        测量稳态下交错操作的吞吐量和单次操作延迟
+
+        每个队列先被预填充到target_depth（不计时），然后执行相同的
+        入队/出队/更改优先级交错序列，队列深度保持在目标附近。
+
+        参数:
+            target_depth: 稳态队列深度
+            operation_count: 计时的操作数量
+            ratios: 操作比例字典，默认DEFAULT_OPERATION_RATIOS
+            seed: 可选，随机种子；未设置时使用分析器的工作负载配置
+
+        结果保存在self.results['mixed']中:
+            {queue_type: {'ops_per_sec': float,
+                          'latencies': {operation: [秒, ...]}}}
+        ops_per_sec是持续吞吐量（操作数除以整个操作循环的墙钟时间），
+        latencies只包含每次调用本身的耗时，用于计算分位数。
+        """
+        ratios = ratios or DEFAULT_OPERATION_RATIOS
+        workload = self.workload if seed is None and self.workload is not None else WorkloadGenerator(seed=seed)
+        initial = workload.generate_emergencies(target_depth)
+        operations = workload.operation_mix(operation_count, ratios, initial=initial, target_depth=target_depth)
+        capacity = target_depth + operation_count
+
+        queue_classes = {
+            'Linked List': LinkedListPriorityQueue,
+            'Binary Tree': BinaryTreePriorityQueue,
+            'Heap': HeapPriorityQueue
+        }
+        results = {}
+        for queue_index, (name, queue_class) in enumerate(queue_classes.items()):
+            self._check_cancelled()
+            self._report_progress(queue_index, len(queue_classes), f"mixed workload: {name}")
+            queue = self._create_queue(queue_class, capacity)
+            for e in clone_emergencies(initial):
+                queue.enqueue(e)
+            ops = clone_operations(operations)
+
+            latencies = {'enqueue': [], 'dequeue': [], 'change_priority': []}
+            timer = time.perf_counter
+            gc.disable()
+            try:
+                loop_start = timer()
+                for index, (op_name, payload) in enumerate(ops):
+                    # 每4096个操作检查一次取消请求，检查本身不计入单次延迟
+                    if not index & 4095:
+                        self._check_cancelled()
+                    if op_name == 'enqueue':
+                        start_time = timer()
+                        queue.enqueue(payload)
+                        end_time = timer()
+                    elif op_name == 'dequeue':
+                        start_time = timer()
+                        queue.dequeue()
+                        end_time = timer()
+                    else:
+                        start_time = timer()
+                        queue.change_priority(*payload)
+                        end_time = timer()
+                    latencies[op_name].append(end_time - start_time)
+                # 吞吐量按整个操作循环的墙钟时间计算，包括分派和计时本身的开销
+                total_time = timer() - loop_start
+            finally:
+                gc.enable()
+
+            results[name] = {
+                'ops_per_sec': len(ops) / total_time if total_time > 0 else 0,
+                'latencies': latencies
+            }
+            print(f"Mixed workload (depth {target_depth}), {name}: {results[name]['ops_per_sec']:.0f} ops/s")
+
+        self.results['mixed'] = results
+        return results
+
+    def measure_spatial_index_performance(self, unit_count, operation_count,
+                                          update_ratios=(0.0, 0.5, 0.9, 0.99), k=3,
+                                          cell_size=None, seed=None):
+        """
+        比较暴力扫描、KD树和网格空间哈希在不同更新/查询比例下的吞吐量
+
+        每种比例生成一个相同的操作序列：位置更新（单位在0-100坐标范围内
+        移动最多1个单位距离，模拟GPS上报）和k近邻查询交错执行。
+
+        参数:
+            unit_count: 单位数量
+            operation_count: 每种比例下计时的操作数量
+            update_ratios: 位置更新在操作中所占比例的列表
+            k: 每次查询返回的单位数量
+            cell_size: 网格边长，默认使平均每个网格约有2个单位
+            seed: 随机种子
+
+        结果保存在self.results['spatial']中:
+            {update_ratio: {index_type: 每秒操作数}}
+        """
+        rng = random.Random(seed)
+        if cell_size is None:
+            cell_size = 100 * math.sqrt(2 / max(unit_count, 1))
+        positions = [(rng.uniform(0, 100), rng.uniform(0, 100)) for _ in range(unit_count)]
+        index_factories = {
+            'Brute Force': _LinearScanIndex,
+            'KD-Tree': SpatialIndex,
+            'Grid Hash': lambda units: GridSpatialHash(cell_size, units)
+        }
+
+        results = {}
+        total_steps = len(update_ratios) * len(index_factories)
+        for ratio_index, ratio in enumerate(update_ratios):
+            # 预先生成操作序列，所有索引执行相同的序列
+            current = list(positions)
+            operations = []
+            for _ in range(operation_count):
+                if rng.random() < ratio:
+                    unit_index = rng.randrange(unit_count)
+                    x, y = current[unit_index]
+                    x = min(100.0, max(0.0, x + rng.uniform(-1, 1)))
+                    y = min(100.0, max(0.0, y + rng.uniform(-1, 1)))
+                    current[unit_index] = (x, y)
+                    operations.append((unit_index, x, y))
+                else:
+                    operations.append((None, rng.uniform(0, 100), rng.uniform(0, 100)))
+
+            results[ratio] = {}
+            for index_position, (name, factory) in enumerate(index_factories.items()):
+                self._check_cancelled()
+                units = [
+                    EmergencyUnit(i + 1, UNIT_TYPES[i % len(UNIT_TYPES)], x, y)
+                    for i, (x, y) in enumerate(positions)
+                ]
+                index = factory(units)
+
+                gc.disable()
+                try:
+                    start_time = time.perf_counter()
+                    for unit_index, x, y in operations:
+                        if unit_index is None:
+                            index.k_nearest(x, y, k)
+                        else:
+                            index.move(units[unit_index], x, y)
+                    elapsed = time.perf_counter() - start_time
+                finally:
+                    gc.enable()
+
+                results[ratio][name] = operation_count / elapsed if elapsed > 0 else 0
+                self._report_progress(ratio_index * len(index_factories) + index_position + 1, total_steps,
+                                      f"spatial: {name}, update ratio {ratio}")
+            print(f"Update ratio {ratio}: " + ", ".join(
+                f"{name}: {ops:.0f} ops/s" for name, ops in results[ratio].items()
+            ))
+
+        self.results['spatial'] = results
+        return results
+
+    @staticmethod
+    def latency_percentiles(latencies, percentiles=(50, 95, 99)):
+        """返回延迟样本的百分位数字典，例如 {50: 秒, 95: 秒, 99: 秒}"""
+        if not latencies:
+            return {p: 0.0 for p in percentiles}
+        ordered = sorted(latencies)
+        last = len(ordered) - 1
+        return {p: ordered[min(last, int(round(p / 100 * last)))] for p in percentiles}
+
+    @staticmethod
+    def _create_queue(queue_class, capacity):
+        """创建队列实例，堆的容量至少为capacity"""
+        if queue_class is HeapPriorityQueue:
+            return HeapPriorityQueue(max_size=max(capacity, 1000))
+        return queue_class()
+
     def measure_enqueue_performance(self, data_sizes):
         """测量入队操作的性能。"""
         self._run_test_for_operation(data_sizes, "enqueue")
@@ -176,40 +527,18 @@ class PerformanceAnalyzer:
         """测量搜索操作的性能。"""
         self._run_test_for_operation(data_sizes, "search")
 
-    def plot_results(self, operation, data_sizes, figure=None, ax=None):
-        """在Matplotlib图表上绘制性能比较结果。"""
-        if operation not in self.results:
-            print(f"Error: Results for operation '{operation}' are not available.")
-            return
-
-        if ax is None or figure is None:
-            figure, ax = plt.subplots(figsize=(10, 6))
-        else:
-            ax.clear()
-
-        results_for_op = self.results[operation]
-        
-        for queue_type, times in results_for_op.items():
-            ax.plot(data_sizes, times, marker='o', linestyle='-', label=queue_type)
-
-        # 设置图表标题和标签
-        title = f'Performance Comparison for {operation.capitalize()} Operation'
-        y_label = 'Execution Time (seconds)'
-        
-        if operation == 'space':
-            title = 'Space Complexity Comparison'
-            y_label = 'Memory Usage (KB)'
-            
-        ax.set_title(title)
-        ax.set_xlabel('Number of Emergencies (Data Size)')
-        ax.set_ylabel(y_label)
-        ax.legend()
-        ax.grid(True)
-        
-        figure.tight_layout()
+    def plot_results(self, operation, data_sizes, figure=None, ax=None, title=None, x_label=None):
+        """
+        在Matplotlib图表上绘制性能比较结果（委托给performance_plotting，首次调用时才导入matplotlib）。
 
-        if hasattr(figure.canvas, 'draw'):
-            figure.canvas.draw()
+        参数:
+            operation: self.results中的结果键
+            data_sizes: 横轴取值
+            figure, ax: 可选，要绘制到的图形和坐标轴
+            title, x_label: 可选，覆盖默认的标题和横轴标签
+        """
+        from .performance_plotting import plot_results
+        plot_results(self.results, operation, data_sizes, figure, ax, title, x_label)
 
     def get_complexity_analysis(self):
         """返回一个包含理论复杂性分析的字典。"""
@@ -0,0 +1,49 @@
+import matplotlib.pyplot as plt
+
+
+def plot_results(results, operation, data_sizes, figure=None, ax=None, title=None, x_label=None):
+    """
+    在Matplotlib图表上绘制性能比较结果
+
+    参数:
+        results: 测量结果，格式与PerformanceAnalyzer.results相同
+                 {operation: {queue_type: [每个数据大小的结果]}}
+        operation: results中的结果键
+        data_sizes: 横轴取值
+        figure, ax: 可选，要绘制到的图形和坐标轴
+        title, x_label: 可选，覆盖默认的标题和横轴标签
+
+    返回:
+        绘制所用的图形，结果不存在时返回None
+    """
+    if operation not in results:
+        print(f"Error: Results for operation '{operation}' are not available.")
+        return None
+
+    if ax is None or figure is None:
+        figure, ax = plt.subplots(figsize=(10, 6))
+    else:
+        ax.clear()
+
+    for queue_type, times in results[operation].items():
+        ax.plot(data_sizes, times, marker='o', linestyle='-', label=queue_type)
+
+    # 设置图表标题和标签
+    default_title = f'Performance Comparison for {operation.capitalize()} Operation'
+    y_label = 'Execution Time (seconds)'
+
+    if operation == 'space':
+        default_title = 'Space Complexity Comparison'
+        y_label = 'Memory Usage (KB)'
+
+    ax.set_title(title or default_title)
+    ax.set_xlabel(x_label or 'Number of Emergencies (Data Size)')
+    ax.set_ylabel(y_label)
+    ax.legend()
+    ax.grid(True)
+
+    figure.tight_layout()
+
+    if hasattr(figure.canvas, 'draw'):
+        figure.canvas.draw()
+    return figure
@@ -0,0 +1,293 @@
+import bisect
+import math
+import time
+from collections import Counter, deque, namedtuple
+from itertools import accumulate
+
+from ..data_structures.emergency import EmergencyType
+from ..data_structures.queue_events import INSERTED, REMOVED
+
+# 严重程度的取值范围（与Emergency的校验一致）
+SEVERITY_LEVELS = 10
+
+# 一个窗口的统计摘要：arrivals为{EmergencyType: 到达数}，severity_counts为{严重程度: 到达数}，
+# wait_p50/wait_p95为等待时间（秒）的分位数，窗口内没有出队时为None
+WindowSummary = namedtuple(
+    "WindowSummary", ["start", "arrivals", "severity_counts", "wait_p50", "wait_p95"]
+)
+
+
+class LogHistogram:
+    """
+    对数分桶的定长直方图（HDR/DDSketch风格）
+
+    第i个桶(i>=1)覆盖(min_value*gamma^(i-1), min_value*gamma^i]，其中
+    gamma=(1+relative_error)/(1-relative_error)，因此分位数的相对误差不超过
+    relative_error。不大于min_value的值落入第0个桶（按0处理），超过max_value的值
+    落入最后一个桶。桶数量只由取值范围和精度决定，与记录的数据量无关。
+    """
+
+    def __init__(self, min_value=0.01, max_value=86400.0, relative_error=0.02):
+        """
+        初始化直方图
+
+        参数:
+            min_value: 最小可区分的值（更小的值按0处理）
+            max_value: 最大可区分的值（更大的值计入最后一个桶）
+            relative_error: 分位数允许的相对误差
+        """
+        self.min_value = min_value
+        self.gamma = (1 + relative_error) / (1 - relative_error)
+        self.log_gamma = math.log(self.gamma)
+        self.bins = int(math.ceil(math.log(max_value / min_value) / self.log_gamma)) + 2
+        self.counts = [0] * self.bins
+
+    def index(self, value):
+        """返回值所在的桶编号"""
+        if value <= self.min_value:
+            return 0
+        index = int(math.ceil(math.log(value / self.min_value) / self.log_gamma))
+        return min(max(index, 1), self.bins - 1)
+
+    def value(self, index):
+        """返回桶的代表值（使桶内所有值的相对误差最小）"""
+        if index == 0:
+            return 0.0
+        return self.min_value * self.gamma ** (index - 1) * 2 * self.gamma / (1 + self.gamma)
+
+    def record(self, value):
+        """记录一个值"""
+        self.counts[self.index(value)] += 1
+
+    def quantile(self, q, counts=None):
+        """
+        计算分位数
+
+        参数:
+            q: 分位数，0到1之间
+            counts: 可选，与本直方图分桶方式相同的计数列表（默认使用self.counts）
+
+        返回:
+            分位数的近似值，没有数据时返回None
+        """
+        counts = self.counts if counts is None else counts
+        cumulative = list(accumulate(counts))
+        total = cumulative[-1]
+        if total == 0:
+            return None
+        rank = min(total - 1, int(q * total))
+        return self.value(bisect.bisect_right(cumulative, rank))
+
+
+class StreamingStats:
+    """
+    基于队列变更事件的时间窗口统计
+
+    滑动窗口由环形排列的时间片组成：每个时间片保存按类型的到达数、严重程度分布和
+    等待时间直方图，时间推移时只清空过期的时间片，查询时把所有时间片相加。
+    另外每满一个窗口长度（滚动窗口）生成一个WindowSummary放入history。
+
+    内存只取决于时间片数量和直方图的桶数，与事件总数无关；唯一随队列变化的是
+    尚未出队的紧急情况的入队时间，用于计算等待时间。
+    只使用标准库，主窗口启动时创建它不需要导入NumPy。
+    到达统计按入队时的严重程度计算，之后的优先级调整不改变它。
+    """
+
+    def __init__(self, window=60.0, resolution=1.0, history=60, clock=time.monotonic):
+        """
+        初始化统计
+
+        参数:
+            window: 窗口长度（秒），同时也是滚动窗口的长度
+            resolution: 滑动窗口的时间片长度（秒）
+            history: 保留的已完成滚动窗口数量
+            clock: 返回当前时间（秒）的函数
+        """
+        self.window = window
+        self.resolution = resolution
+        self.clock = clock
+        self.slots = max(1, int(round(window / resolution)))
+        self.types = list(EmergencyType)
+        self.type_index = {emergency_type: i for i, emergency_type in enumerate(self.types)}
+        self.wait_histogram = LogHistogram()
+
+        # 滑动窗口：每行是一个时间片，slot_numbers记录每行对应的时间片编号
+        self.arrivals = [[0] * len(self.types) for _ in range(self.slots)]
+        self.severities = [[0] * SEVERITY_LEVELS for _ in range(self.slots)]
+        self.waits = [[0] * self.wait_histogram.bins for _ in range(self.slots)]
+        self.slot_numbers = [-1] * self.slots
+        self.current_slot = None
+
+        # 当前的滚动窗口
+        self.tumbling_number = None
+        self._reset_tumbling()
+        self.history = deque(maxlen=history)
+
+        self.arrival_times = {}   # emergency_id -> 入队时间
+        self.queue = None
+
+    @classmethod
+    def attach(cls, queue, **kwargs):
+        """
+        为队列创建统计并订阅它的变更事件
+
+        队列中已有的紧急情况以订阅时刻作为入队时间（它们的等待时间是下限），
+        但不计入到达数。
+
+        参数:
+            queue: 支持subscribe的优先队列
+            **kwargs: 传给构造函数的参数
+
+        返回:
+            StreamingStats
+        """
+        stats = cls(**kwargs)
+        now = stats.clock()
+        for emergency in queue:
+            stats.arrival_times[emergency.emergency_id] = now
+        stats.queue = queue
+        queue.subscribe(stats.on_queue_event)
+        return stats
+
+    def detach(self):
+        """取消对队列变更事件的订阅"""
+        if self.queue is not None:
+            self.queue.unsubscribe(self.on_queue_event)
+            self.queue = None
+
+    def on_queue_event(self, queue, event):
+        """队列变更事件的回调"""
+        if event.kind == INSERTED:
+            self.record_arrival(event.item)
+        elif event.kind == REMOVED:
+            self.record_departure(event.item)
+
+    def record_arrival(self, emergency):
+        """记录一个紧急情况入队"""
+        now = self.clock()
+        row = self._advance(now)
+        type_index = self.type_index[emergency.type]
+        severity_index = emergency.severity_level - 1
+        self.arrivals[row][type_index] += 1
+        self.severities[row][severity_index] += 1
+        self.tumbling_arrivals[type_index] += 1
+        self.tumbling_severities[severity_index] += 1
+        self.arrival_times[emergency.emergency_id] = now
+
+    def record_departure(self, emergency):
+        """记录一个紧急情况出队（入队时间未知时忽略）"""
+        arrived = self.arrival_times.pop(emergency.emergency_id, None)
+        if arrived is None:
+            return
+        now = self.clock()
+        row = self._advance(now)
+        index = self.wait_histogram.index(now - arrived)
+        self.waits[row][index] += 1
+        self.tumbling_waits[index] += 1
+
+    def arrivals_per_minute(self):
+        """返回滑动窗口内每种类型的到达速率 {EmergencyType: 每分钟到达数}"""
+        self._advance(self.clock())
+        counts = self._column_sums(self.arrivals)
+        return {t: counts[i] * 60.0 / self.window for t, i in self.type_index.items()}
+
+    def severity_distribution(self):
+        """返回滑动窗口内到达的严重程度分布 {严重程度: 数量}"""
+        self._advance(self.clock())
+        return self._severity_counter(self._column_sums(self.severities))
+
+    def wait_quantile(self, q):
+        """
+        返回滑动窗口内出队的紧急情况等待时间的分位数
+
+        参数:
+            q: 分位数，0到1之间
+
+        返回:
+            等待时间（秒），窗口内没有出队时返回None
+        """
+        self._advance(self.clock())
+        return self.wait_histogram.quantile(q, self._column_sums(self.waits))
+
+    def current(self):
+        """返回滑动窗口的WindowSummary"""
+        now = self.clock()
+        self._advance(now)
+        return self._summary(
+            now - self.window,
+            self._column_sums(self.arrivals),
+            self._column_sums(self.severities),
+            self._column_sums(self.waits)
+        )
+
+    def _advance(self, now):
+        """
+        把时间推进到now：清空过期的时间片，必要时结束当前的滚动窗口
+
+        返回:
+            now所在时间片在环形数组中的行号
+        """
+        slot = int(now // self.resolution)
+        if self.current_slot is None or slot > self.current_slot:
+            first = slot - self.slots + 1
+            if self.current_slot is not None:
+                first = max(first, self.current_slot + 1)
+            for number in range(first, slot + 1):
+                row = number % self.slots
+                self.arrivals[row] = [0] * len(self.types)
+                self.severities[row] = [0] * SEVERITY_LEVELS
+                self.waits[row] = [0] * self.wait_histogram.bins
+                self.slot_numbers[row] = number
+            self.current_slot = slot
+        self._advance_tumbling(int(now // self.window))
+        return self.current_slot % self.slots
+
+    def _advance_tumbling(self, number):
+        """结束编号小于number的滚动窗口并把摘要加入history"""
+        if self.tumbling_number is None:
+            self.tumbling_number = number
+            return
+        if number <= self.tumbling_number:
+            return
+        self.history.append(self._summary(
+            self.tumbling_number * self.window,
+            self.tumbling_arrivals,
+            self.tumbling_severities,
+            self.tumbling_waits
+        ))
+        # 中间没有任何事件的窗口记为空窗口（最多保留history的长度）
+        self._reset_tumbling()
+        for skipped in range(max(self.tumbling_number + 1, number - self.history.maxlen), number):
+            self.history.append(self._summary(
+                skipped * self.window,
+                self.tumbling_arrivals,
+                self.tumbling_severities,
+                self.tumbling_waits
+            ))
+        self.tumbling_number = number
+
+    def _reset_tumbling(self):
+        """清空当前滚动窗口的计数"""
+        self.tumbling_arrivals = [0] * len(self.types)
+        self.tumbling_severities = [0] * SEVERITY_LEVELS
+        self.tumbling_waits = [0] * self.wait_histogram.bins
+
+    def _summary(self, start, arrivals, severities, waits):
+        """根据计数列表生成WindowSummary"""
+        return WindowSummary(
+            start,
+            {t: arrivals[i] for t, i in self.type_index.items()},
+            self._severity_counter(severities),
+            self.wait_histogram.quantile(0.5, waits),
+            self.wait_histogram.quantile(0.95, waits)
+        )
+
+    @staticmethod
+    def _column_sums(rows):
+        """把所有时间片的计数按列相加"""
+        return [sum(column) for column in zip(*rows)]
+
+    @staticmethod
+    def _severity_counter(counts):
+        """把严重程度计数列表转换为只包含非零项的Counter"""
+        return Counter({level + 1: count for level, count in enumerate(counts) if count})
@@ -0,0 +1,300 @@
+import heapq
+import random
+
+from ..data_structures.emergency import Emergency, EmergencyType
+
+# 支持的入队顺序
+ORDERINGS = ['random', 'sorted', 'reverse', 'adversarial']
+
+# 支持的严重程度分布
+SEVERITY_DISTRIBUTIONS = ['uniform', 'zipf']
+
+# 默认的操作比例：到达、调度、严重程度升级
+DEFAULT_OPERATION_RATIOS = {'enqueue': 0.45, 'dequeue': 0.45, 'change_priority': 0.10}
+
+DEFAULT_LOCATIONS = ["Downtown", "Suburbs", "City Center", "Industrial Area", "Residential Area"]
+
+
+class WorkloadGenerator:
+    """
+    可复现的基准测试工作负载生成器
+
+    所有随机性都来自一个独立的random.Random实例，相同的种子总是生成相同的工作负载。
+    """
+
+    def __init__(self, seed=None, ordering='random', severity_distribution='uniform',
+                 zipf_exponent=1.2, emergency_types=None, locations=None):
+        """
+        初始化工作负载生成器
+
+        参数:
+            seed: 随机种子，None表示不可复现
+            ordering: 入队顺序，取值见ORDERINGS
+            severity_distribution: 严重程度分布，'uniform'或'zipf'
+            zipf_exponent: Zipf分布的指数，越大越偏斜
+            emergency_types: 可选，紧急情况类型列表，默认使用全部类型
+            locations: 可选，位置描述列表
+        """
+        if ordering not in ORDERINGS:
+            raise ValueError(f"未知的入队顺序: {ordering}")
+        if severity_distribution not in SEVERITY_DISTRIBUTIONS:
+            raise ValueError(f"未知的严重程度分布: {severity_distribution}")
+
+        self.seed = seed
+        self.ordering = ordering
+        self.severity_distribution = severity_distribution
+        self.zipf_exponent = zipf_exponent
+        self.emergency_types = emergency_types or list(EmergencyType)
+        self.locations = locations or DEFAULT_LOCATIONS
+        self.rng = random.Random(seed)
+
+        # Zipf分布的累积权重：排名1（最常见）对应严重程度10（最轻微）
+        weights = [1 / rank ** zipf_exponent for rank in range(1, 11)]
+        self._zipf_cum_weights = []
+        total = 0
+        for weight in reversed(weights):
+            total += weight
+            self._zipf_cum_weights.append(total)
+
+    def describe(self):
+        """返回工作负载配置，便于记录在基准结果中"""
+        return {
+            'seed': self.seed,
+            'ordering': self.ordering,
+            'severity_distribution': self.severity_distribution,
+            'zipf_exponent': self.zipf_exponent,
+        }
+
+    def severity(self):
+        """按配置的分布抽取一个严重程度（1-10）"""
+        if self.severity_distribution == 'zipf':
+            return self.rng.choices(range(1, 11), cum_weights=self._zipf_cum_weights)[0]
+        return self.rng.randint(1, 10)
+
+    def generate_emergencies(self, count, start_id=1):
+        """
+        生成紧急情况列表，并按配置的顺序排列
+
+        ID是start_id起的连续整数的随机排列，因此ID顺序与入队顺序无关。
+
+        参数:
+            count: 要生成的数量
+            start_id: 最小的紧急情况ID
+
+        返回:
+            紧急情况对象列表
+        """
+        if count <= 0:
+            return []
+
+        ids = list(range(start_id, start_id + count))
+        self.rng.shuffle(ids)
+
+        emergencies = [
+            Emergency(
+                emergency_id=emergency_id,
+                emergency_type=self.rng.choice(self.emergency_types),
+                severity_level=self.severity(),
+                location=self.rng.choice(self.locations),
+                coordinates=(self.rng.uniform(0, 100), self.rng.uniform(0, 100))
+            )
+            for emergency_id in ids
+        ]
+        return self.order(emergencies)
+
+    def order(self, emergencies):
+        """
+        按配置的顺序重新排列紧急情况
+
+        - random: 保持生成顺序
+        - sorted: 按优先级从高到低（链表尾插的最好情况，二叉搜索树退化为链）
+        - reverse: 按优先级从低到高
+        - adversarial: 先插入优先级最低的一项，其余按优先级从高到低插入。
+          链表每次插入都要遍历到接近尾部，二叉搜索树同样退化为链。
+        """
+        if self.ordering == 'random':
+            return list(emergencies)
+
+        ordered = sorted(emergencies)
+        if self.ordering == 'reverse':
+            ordered.reverse()
+        elif self.ordering == 'adversarial' and ordered:
+            ordered = [ordered[-1]] + ordered[:-1]
+        return ordered
+
+    def poisson_arrivals(self, count, rate, start_time=0.0):
+        """
+        生成泊松到达过程的到达时间
+
+        参数:
+            count: 到达次数
+            rate: 平均到达率（每单位时间的到达次数）
+            start_time: 起始时间
+
+        返回:
+            单调递增的到达时间列表
+        """
+        times = []
+        current = start_time
+        for _ in range(count):
+            current += self.rng.expovariate(rate)
+            times.append(current)
+        return times
+
+    def bursty_arrivals(self, count, base_rate, burst_rate, mean_burst_length=20, mean_quiet_length=100, start_time=0.0):
+        """
+        生成突发到达过程的到达时间（两状态马尔可夫调制泊松过程）
+
+        在平静状态下按base_rate到达，在突发状态下按burst_rate到达，
+        每个状态持续的到达次数服从几何分布。
+
+        参数:
+            count: 到达次数
+            base_rate: 平静状态的到达率
+            burst_rate: 突发状态的到达率
+            mean_burst_length: 突发状态的平均到达次数
+            mean_quiet_length: 平静状态的平均到达次数
+            start_time: 起始时间
+
+        返回:
+            单调递增的到达时间列表
+        """
+        times = []
+        current = start_time
+        in_burst = False
+        for _ in range(count):
+            rate = burst_rate if in_burst else base_rate
+            current += self.rng.expovariate(rate)
+            times.append(current)
+            mean_length = mean_burst_length if in_burst else mean_quiet_length
+            if self.rng.random() < 1 / mean_length:
+                in_burst = not in_burst
+        return times
+
+    def operation_mix(self, count, ratios=None, initial=None, start_id=None,
+                      target_depth=None, depth_tolerance=0.1):
+        """
+        生成交错的入队/出队/更改优先级操作序列
+
+        生成器内部维护一个影子优先队列，因此出队操作移除的ID是已知的，
+        change_priority总是作用于当前仍在队列中的紧急情况。
+
+        参数:
+            count: 操作数量
+            ratios: 操作比例字典，默认DEFAULT_OPERATION_RATIOS
+            initial: 可选，执行操作前已经在队列中的紧急情况列表
+            start_id: 新紧急情况的起始ID，默认接在initial之后
+            target_depth: 可选，稳态队列深度。设置后，当深度低于目标的(1 - depth_tolerance)
+                          时出队改为入队，高于(1 + depth_tolerance)时入队改为出队
+            depth_tolerance: 允许的深度相对偏差
+
+        返回:
+            操作元组列表:
+                ('enqueue', emergency)
+                ('dequeue', None)
+                ('change_priority', (emergency_id, new_severity))
+        """
+        ratios = ratios or DEFAULT_OPERATION_RATIOS
+        names = [name for name in ('enqueue', 'dequeue', 'change_priority') if ratios.get(name, 0) > 0]
+        weights = [ratios[name] for name in names]
+        initial = initial or []
+
+        if start_id is None:
+            start_id = max((e.emergency_id for e in initial), default=0) + 1
+
+        # 影子状态: 当前严重程度、可随机抽取的ID列表及其位置、带惰性删除的最小堆
+        severity_of = {}
+        live_ids = []
+        position = {}
+        shadow_heap = []
+
+        def add(emergency_id, severity):
+            severity_of[emergency_id] = severity
+            position[emergency_id] = len(live_ids)
+            live_ids.append(emergency_id)
+            heapq.heappush(shadow_heap, (severity, emergency_id))
+
+        def discard(emergency_id):
+            index = position.pop(emergency_id)
+            last = live_ids.pop()
+            if last != emergency_id:
+                live_ids[index] = last
+                position[last] = index
+            del severity_of[emergency_id]
+
+        for emergency in initial:
+            add(emergency.emergency_id, emergency.severity_level)
+
+        operations = []
+        next_id = start_id
+        for _ in range(count):
+            name = self.rng.choices(names, weights)[0]
+            if target_depth is not None:
+                if name == 'dequeue' and len(live_ids) < target_depth * (1 - depth_tolerance):
+                    name = 'enqueue'
+                elif name == 'enqueue' and len(live_ids) > target_depth * (1 + depth_tolerance):
+                    name = 'dequeue'
+            if not live_ids and name != 'enqueue':
+                name = 'enqueue'
+
+            if name == 'enqueue':
+                emergency = Emergency(
+                    emergency_id=next_id,
+                    emergency_type=self.rng.choice(self.emergency_types),
+                    severity_level=self.severity(),
+                    location=self.rng.choice(self.locations),
+                    coordinates=(self.rng.uniform(0, 100), self.rng.uniform(0, 100))
+                )
+                next_id += 1
+                add(emergency.emergency_id, emergency.severity_level)
+                operations.append(('enqueue', emergency))
+            elif name == 'dequeue':
+                while True:
+                    severity, emergency_id = heapq.heappop(shadow_heap)
+                    if severity_of.get(emergency_id) == severity:
+                        break
+                discard(emergency_id)
+                operations.append(('dequeue', None))
+            else:
+                emergency_id = self.rng.choice(live_ids)
+                # 严重程度升级：数值减小1-3级
+                new_severity = max(1, severity_of[emergency_id] - self.rng.randint(1, 3))
+                severity_of[emergency_id] = new_severity
+                heapq.heappush(shadow_heap, (new_severity, emergency_id))
+                operations.append(('change_priority', (emergency_id, new_severity)))
+
+        return operations
+
+
+def clone_emergencies(emergencies):
+    """
+    复制紧急情况对象
+
+    change_priority会原地修改严重程度，因此在多个队列上重放同一工作负载前需要复制。
+    """
+    return [
+        Emergency(e.emergency_id, e.type, e.severity_level, e.location, e.coordinates)
+        for e in emergencies
+    ]
+
+
+def clone_operations(operations):
+    """复制操作序列中的紧急情况对象，使每次重放互不影响"""
+    cloned = []
+    for name, payload in operations:
+        if name == 'enqueue':
+            payload = Emergency(payload.emergency_id, payload.type, payload.severity_level,
+                                payload.location, payload.coordinates)
+        cloned.append((name, payload))
+    return cloned
+
+
+def apply_operations(queue, operations):
+    """在队列上依次执行操作序列"""
+    for name, payload in operations:
+        if name == 'enqueue':
+            queue.enqueue(payload)
+        elif name == 'dequeue':
+            queue.dequeue()
+        else:
+            queue.change_priority(*payload)
@@ -0,0 +1,101 @@
+import unittest
+import sys
+import os
+import threading
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from emergency_response.gui.background_worker import BackgroundTask
+
+class FakeRoot:
+    """模拟Tk窗口的after调度，由测试手动驱动轮询"""
+
+    def __init__(self):
+        self.scheduled = []
+        self.exists = True
+
+    def after(self, delay, callback):
+        self.scheduled.append(callback)
+
+    def winfo_exists(self):
+        return self.exists
+
+    def run_until_idle(self):
+        """轮询直到任务不再重新调度"""
+        while self.scheduled:
+            callback = self.scheduled.pop(0)
+            callback()
+            threading.Event().wait(0.001)
+
+class TestBackgroundTask(unittest.TestCase):
+
+    def setUp(self):
+        """测试前的准备工作"""
+        self.root = FakeRoot()
+        self.events = []
+
+    def _task(self, work):
+        return BackgroundTask(
+            self.root, work,
+            on_done=lambda result: self.events.append(('done', result)),
+            on_progress=lambda fraction, message: self.events.append(('progress', fraction)),
+            on_error=lambda error: self.events.append(('error', str(error))),
+            on_cancelled=lambda: self.events.append(('cancelled', None))
+        )
+
+    def test_result_and_progress_delivered_on_poll(self):
+        """测试结果和进度只在主线程轮询时传递"""
+        def work(task):
+            task.report_progress(0.5, "half")
+            task.report_progress(1.0, "all")
+            return 42
+
+        task = self._task(work).start()
+        task._thread.join()
+        # 工作线程不直接调用回调
+        self.assertEqual(self.events, [])
+        self.assertTrue(task.running)
+
+        self.root.run_until_idle()
+        # 同一次轮询中的多个进度报告只传递最新的一个
+        self.assertEqual(self.events, [('progress', 1.0), ('done', 42)])
+        self.assertFalse(task.running)
+
+    def test_error(self):
+        """测试工作函数的异常被传递给on_error"""
+        def work(task):
+            raise ValueError("boom")
+
+        self._task(work).start()
+        self.root.run_until_idle()
+        self.assertEqual(self.events, [('error', 'boom')])
+
+    def test_cancel(self):
+        """测试取消请求在下一个检查点停止工作"""
+        started = threading.Event()
+
+        def work(task):
+            started.set()
+            while True:
+                task.check_cancelled()
+                threading.Event().wait(0.001)
+
+        task = self._task(work).start()
+        started.wait(5)
+        task.cancel()
+        self.root.run_until_idle()
+        self.assertEqual(self.events, [('cancelled', None)])
+
+    def test_closed_window_stops_polling(self):
+        """测试窗口关闭后停止轮询并请求取消"""
+        release = threading.Event()
+        task = self._task(lambda task: release.wait(5)).start()
+        self.root.exists = False
+        self.root.run_until_idle()
+        release.set()
+        self.assertTrue(task.cancel_event.is_set())
+        self.assertEqual(self.events, [])
+
+if __name__ == '__main__':
+    unittest.main()
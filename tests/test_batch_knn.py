@@ -0,0 +1,58 @@
+import unittest
+import sys
+import os
+import numpy as np
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from emergency_response.utils.batch_knn import batch_k_nearest, recommend_units
+from emergency_response.data_structures.emergency import Emergency, EmergencyType
+from emergency_response.data_structures.emergency_unit import EmergencyUnit
+
+class TestBatchKNN(unittest.TestCase):
+
+    def setUp(self):
+        """测试前的准备工作"""
+        rng = np.random.default_rng(7)
+        self.queries = rng.uniform(0, 100, size=(200, 2))
+        self.points = rng.uniform(0, 100, size=(500, 2))
+
+    def test_matches_full_sort(self):
+        """测试分块argpartition结果与完整排序一致"""
+        # 很小的内存上限迫使每块只有一行
+        indices, distances = batch_k_nearest(self.queries, self.points, 4, max_block_bytes=1)
+        full = np.sqrt(((self.queries[:, None, :] - self.points[None, :, :]) ** 2).sum(axis=2))
+        expected = np.argsort(full, axis=1)[:, :4]
+        np.testing.assert_array_equal(indices, expected)
+        np.testing.assert_allclose(distances, np.take_along_axis(full, expected, axis=1))
+
+        block_indices, _ = batch_k_nearest(self.queries, self.points, 4)
+        np.testing.assert_array_equal(block_indices, indices)
+
+    def test_edge_cases(self):
+        """测试k大于点数、k为0和空输入"""
+        indices, distances = batch_k_nearest(self.queries[:3], self.points[:2], 5)
+        self.assertEqual(indices.shape, (3, 2))
+        self.assertTrue(np.all(distances[:, 0] <= distances[:, 1]))
+        self.assertEqual(batch_k_nearest(self.queries, self.points, 0)[0].shape, (200, 0))
+        self.assertEqual(batch_k_nearest(np.empty((0, 2)), self.points, 3)[0].shape, (0, 3))
+
+    def test_recommend_units(self):
+        """测试为一批紧急情况推荐单位"""
+        units = [EmergencyUnit(1, "Ambulance", 0, 0), EmergencyUnit(2, "Fire Truck", 10, 10)]
+        emergencies = [
+            Emergency(1, EmergencyType.FIRE, 1, "A", (9, 9)),
+            Emergency(2, EmergencyType.MEDICAL, 2, "B", (1, 0))
+        ]
+        recommendations = recommend_units(emergencies, units, 1)
+        self.assertEqual([(e.emergency_id, nearest[0][0].unit_id) for e, nearest in recommendations], [(1, 2), (2, 1)])
+        self.assertAlmostEqual(recommendations[1][1][0][1], 1.0)
+        self.assertEqual(recommend_units([], units, 1), [])
+        
+        # 按类型过滤：医疗事件只推荐救护车
+        filtered = recommend_units(emergencies, units, 1, types_for=lambda e: {"Ambulance"})
+        self.assertEqual([nearest[0][0].unit_id for _, nearest in filtered], [1, 1])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import unittest
+import sys
+import os
+import tempfile
+import matplotlib
+matplotlib.use('Agg')  # 使用非交互式后端，避免在没有GUI的环境中出错
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from emergency_response.utils.benchmark_store import (
+    BenchmarkStore, build_run_record, compare_runs, mann_whitney_u,
+    plot_trend, summarize_samples, main
+)
+from emergency_response.utils.performance_analyzer import PerformanceAnalyzer
+
+
+def _make_run(run_id, samples):
+    """构造一个只包含enqueue/Heap/100的运行记录"""
+    return {
+        'run_id': run_id,
+        'environment': {'machine_fingerprint': 'test'},
+        'data_sizes': [100],
+        'operations': {
+            'enqueue': {
+                'Heap': {'100': {'stats': summarize_samples(samples), 'samples': samples}}
+            }
+        },
+    }
+
+
+class TestBenchmarkStore(unittest.TestCase):
+
+    def setUp(self):
+        """每个测试前设置测试环境"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.store = BenchmarkStore(os.path.join(self.temp_dir.name, 'results.jsonl'))
+
+    def tearDown(self):
+        """每个测试后清理临时文件"""
+        self.temp_dir.cleanup()
+
+    def test_build_and_save_run(self):
+        """测试从分析器构建运行记录并保存"""
+        analyzer = PerformanceAnalyzer()
+        analyzer.measure_enqueue_performance([5, 10])
+        record = build_run_record(analyzer, [5, 10], label='test')
+
+        self.assertIn('git_sha', record['environment'])
+        self.assertIn('python_version', record['environment'])
+        self.assertIn('machine_fingerprint', record['environment'])
+        stats = record['operations']['enqueue']['Heap']['10']['stats']
+        self.assertEqual(stats['n'], 10)
+
+        self.store.save_run(record)
+        self.assertEqual(self.store.get_run('latest')['run_id'], record['run_id'])
+        self.assertEqual(self.store.get_run(record['run_id'][:10])['label'], 'test')
+        self.assertIsNone(self.store.get_run('previous'))
+
+    def test_mann_whitney_u(self):
+        """测试显著性检验区分明显不同和相同的样本"""
+        fast = [1.0, 1.1, 0.9, 1.05, 0.95, 1.02, 0.98, 1.01, 0.99, 1.03]
+        slow = [x * 2 for x in fast]
+        self.assertLess(mann_whitney_u(fast, slow), 0.01)
+        self.assertEqual(mann_whitney_u(fast, fast), 1.0)
+        self.assertEqual(mann_whitney_u([], slow), 1.0)
+
+    def test_compare_runs_detects_regression(self):
+        """测试超过阈值且显著的变慢被判定为回归"""
+        base_samples = [1.0, 1.1, 0.9, 1.05, 0.95, 1.02, 0.98, 1.01, 0.99, 1.03]
+        baseline = _make_run('base', base_samples)
+        slower = _make_run('slow', [x * 1.5 for x in base_samples])
+        same = _make_run('same', list(base_samples))
+
+        self.assertTrue(compare_runs(baseline, slower)[0]['regression'])
+        self.assertFalse(compare_runs(baseline, same)[0]['regression'])
+        # 阈值较大时不判定为回归
+        self.assertFalse(compare_runs(baseline, slower, threshold=0.6)[0]['regression'])
+
+    def test_compare_command_exit_code(self):
+        """测试compare命令在检测到回归时返回非零退出码"""
+        base_samples = [1.0, 1.1, 0.9, 1.05, 0.95, 1.02, 0.98, 1.01, 0.99, 1.03]
+        self.store.save_run(_make_run('base', base_samples))
+        self.store.save_run(_make_run('slow', [x * 2 for x in base_samples]))
+
+        args = ['--store', self.store.path, 'compare', '--baseline', 'base']
+        self.assertEqual(main(args + ['--current', 'slow']), 1)
+        self.assertEqual(main(args + ['--current', 'base']), 0)
+
+    def test_plot_trend(self):
+        """测试使用plot_results绘制趋势图"""
+        import matplotlib.pyplot as plt
+        runs = [_make_run('a', [1.0, 1.1]), _make_run('b', [1.2, 1.3])]
+        fig, ax = plt.subplots()
+        analyzer = plot_trend(runs, 'enqueue', 100, fig, ax)
+        self.assertEqual(len(analyzer.results['trend']['Heap']), 2)
+        self.assertEqual(ax.get_xlabel(), 'Benchmark Run')
+        plt.close(fig)
+
+    def test_plot_trend_heterogeneous_runs(self):
+        """测试各次运行的队列类型和数据大小不一致时，曲线与横轴等长且缺失点为NaN"""
+        import math
+        import matplotlib.pyplot as plt
+        mixed = _make_run('b', [2.0])
+        mixed['operations']['enqueue']['Linked List'] = {
+            '100': {'stats': summarize_samples([3.0]), 'samples': [3.0]}
+        }
+        other_size = _make_run('c', [9.0])
+        other_size['operations']['enqueue']['Heap'] = {
+            '500': {'stats': summarize_samples([9.0]), 'samples': [9.0]}
+        }
+        runs = [_make_run('a', [1.0]), mixed, other_size, _make_run('d', [4.0])]
+        fig, ax = plt.subplots()
+        trend = plot_trend(runs, 'enqueue', 100, fig, ax).results['trend']
+        self.assertEqual(trend['Heap'], [1.0, 2.0, 4.0])
+        self.assertTrue(math.isnan(trend['Linked List'][0]))
+        self.assertEqual(trend['Linked List'][1], 3.0)
+        self.assertEqual([line.get_xdata().tolist() for line in ax.get_lines()], [[1, 2, 4], [1, 2, 4]])
+        plt.close(fig)
+
+if __name__ == '__main__':
+    unittest.main()
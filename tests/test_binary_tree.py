@@ -40,6 +40,14 @@ class TestBinaryTreePriorityQueue(unittest.TestCase):
         self.assertEqual(self.queue.dequeue(), self.emergency3)
         self.assertEqual(self.queue.dequeue(), self.emergency2)
     
+    def test_peek(self):
+        """测试查看队首元素不会移除它"""
+        self.assertIsNone(self.queue.peek())
+        self.queue.enqueue(self.emergency2)
+        self.queue.enqueue(self.emergency1)
+        self.assertEqual(self.queue.peek(), self.emergency1)
+        self.assertEqual(self.queue.dequeue(), self.emergency1)
+    
     def test_dequeue_empty(self):
         """测试从空队列出队"""
         self.assertIsNone(self.queue.dequeue())
@@ -164,5 +172,107 @@ class TestBinaryTreePriorityQueue(unittest.TestCase):
         """测试更新不存在的紧急情况的严重程度"""
         self.assertFalse(self.queue.update_severity(99, 5))  # 应该返回False
 
+    def test_iter_by_priority(self):
+        """测试按优先级顺序惰性遍历，且不修改队列"""
+        for emergency in (self.emergency2, self.emergency4, self.emergency3, self.emergency1):
+            self.queue.enqueue(emergency)
+        ordered = list(self.queue.iter_by_priority())
+        self.assertEqual(ordered, [self.emergency1, self.emergency4, self.emergency3, self.emergency2])
+        self.assertEqual(len(self.queue), 4)
+        self.assertEqual(next(self.queue.iter_by_priority()), self.emergency1)
+        self.assertEqual(list(BinaryTreePriorityQueue().iter_by_priority()), [])
+
+    def _sorted_emergencies(self, count):
+        """按优先级从高到低生成紧急情况（有序插入会使不平衡的树退化）"""
+        return [Emergency(i, EmergencyType.FIRE, 1 + i * 10 // count, "测试", (0, 0)) for i in range(count)]
+
+    def test_shape_statistics_degenerate(self):
+        """测试关闭自动重建时有序插入退化成链表的形状统计"""
+        queue = BinaryTreePriorityQueue(auto_rebalance=False)
+        for emergency in self._sorted_emergencies(15):
+            queue.enqueue(emergency)
+        stats = queue.shape_statistics()
+        self.assertEqual(stats['size'], 15)
+        self.assertEqual(stats['max_depth'], 14)
+        self.assertEqual(stats['average_depth'], 7.0)
+        self.assertEqual(stats['optimal_depth'], 3)
+        self.assertEqual(stats['depth_ratio'], 15 / 4)
+        self.assertEqual(stats['height_estimate'], 14)
+        # 叶子的平衡因子为0，其余节点只有右子树
+        self.assertEqual(stats['balance_factors'], {0: 1, **{h: 1 for h in range(1, 15)}})
+
+        queue.rebuild()
+        stats = queue.shape_statistics()
+        self.assertEqual(stats['max_depth'], 3)
+        self.assertEqual(stats['depth_ratio'], 1.0)
+        self.assertEqual(stats['balance_factors'], {0: 15})
+        self.assertEqual(stats['height_estimate'], 3)
+        self.assertEqual(stats['rebuild_count'], 1)
+        self.assertEqual([e.emergency_id for e in queue], list(range(15)))
+
+    def test_shape_statistics_empty(self):
+        """测试空树的形状统计"""
+        stats = BinaryTreePriorityQueue().shape_statistics()
+        self.assertEqual(stats['max_depth'], 0)
+        self.assertEqual(stats['average_depth'], 0.0)
+        self.assertEqual(stats['depth_ratio'], 1.0)
+        self.assertEqual(stats['balance_factors'], {})
+
+    def test_rebuild_keeps_order(self):
+        """测试重建不同大小的树后中序顺序不变且高度最优"""
+        for count in (1, 2, 3, 6, 7, 8, 100):
+            queue = BinaryTreePriorityQueue(auto_rebalance=False)
+            emergencies = self._sorted_emergencies(count)
+            for emergency in reversed(emergencies):
+                queue.enqueue(emergency)
+            queue.rebuild()
+            self.assertEqual(list(queue), emergencies)
+            self.assertEqual(queue.shape_statistics()['max_depth'], count.bit_length() - 1)
+            self.assertEqual(queue.dequeue(), emergencies[0])
+
+    def test_auto_rebalance(self):
+        """测试有序插入触发替罪羊子树重建，深度保持在对数级别"""
+        emergencies = self._sorted_emergencies(1000)
+        events = []
+        self.queue.subscribe(lambda queue, event: events.append(event))
+        for emergency in emergencies:
+            self.queue.enqueue(emergency)
+        stats = self.queue.shape_statistics()
+        self.assertGreater(stats['rebuild_count'], 0)
+        self.assertLessEqual(stats['max_depth'], stats['height_estimate'])
+        self.assertLess(stats['depth_ratio'], 3)
+        # 重建不改变顺序，也不发送变更事件
+        self.assertEqual(list(self.queue), emergencies)
+        self.assertEqual(len(events), 1000)
+
+        # 删除大部分节点后整棵树被重建，高度上界随之降低
+        for emergency in emergencies[:900]:
+            self.assertEqual(self.queue.dequeue(), emergency)
+        stats = self.queue.shape_statistics()
+        self.assertLessEqual(stats['max_depth'], stats['height_estimate'])
+        self.assertLessEqual(stats['height_estimate'], 10)
+        self.assertEqual(list(self.queue), emergencies[900:])
+
+    def test_dequeue_rebuilt_tree_is_not_quadratic(self):
+        """测试重建后的平衡树出队总耗时随节点数近似线性增长（最小值在最底层）"""
+        import time
+
+        def drain_time(count):
+            best = float('inf')
+            for _ in range(3):
+                queue = BinaryTreePriorityQueue()
+                for emergency in self._sorted_emergencies(count):
+                    queue.enqueue(emergency)
+                queue.rebuild()
+                start = time.perf_counter()
+                while not queue.is_empty():
+                    queue.dequeue()
+                best = min(best, time.perf_counter() - start)
+            return best
+
+        # 节点数增加8倍：线性（每次O(log n)）约为8-10倍，按ID广度优先查找则约为64倍
+        ratio = drain_time(16000) / drain_time(2000)
+        self.assertLess(ratio, 25)
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
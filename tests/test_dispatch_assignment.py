@@ -0,0 +1,123 @@
+import unittest
+import sys
+import os
+import itertools
+import math
+import numpy as np
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from emergency_response.utils.dispatch_assignment import (
+    solve_assignment, assign_units, top_emergencies, severity_weight
+)
+from emergency_response.data_structures.emergency import Emergency, EmergencyType
+from emergency_response.data_structures.emergency_unit import EmergencyUnit, responding_unit_types
+from emergency_response.data_structures.heap import HeapPriorityQueue
+
+def brute_force_cost(queries, weights, points, unassigned_distance, allowed=None):
+    """枚举所有分配方案，返回最小成本（作为参照）"""
+    m, n = len(queries), len(points)
+    best = math.inf
+    # 列n..n+m-1表示不分配
+    for choice in itertools.permutations(range(n + m), m):
+        cost = 0.0
+        for row, column in enumerate(choice):
+            if column >= n:
+                cost += weights[row] * unassigned_distance
+            elif allowed is not None and column not in allowed[row]:
+                cost = math.inf
+                break
+            else:
+                cost += weights[row] * math.dist(queries[row], points[column])
+        best = min(best, cost)
+    return best
+
+class TestDispatchAssignment(unittest.TestCase):
+
+    def setUp(self):
+        """测试前的准备工作"""
+        self.rng = np.random.default_rng(11)
+
+    def test_matches_brute_force(self):
+        """测试小规模问题的结果与枚举一致"""
+        for _ in range(150):
+            m, n = self.rng.integers(0, 6), self.rng.integers(0, 5)
+            queries = self.rng.uniform(0, 100, size=(m, 2))
+            points = self.rng.uniform(0, 100, size=(n, 2))
+            weights = self.rng.integers(1, 11, size=m)
+            unassigned_distance = float(self.rng.choice([30.0, 60.0, 200.0]))
+
+            assignment, cost = solve_assignment(queries, weights, points, unassigned_distance=unassigned_distance)
+            expected = brute_force_cost(queries, weights, points, unassigned_distance)
+            self.assertAlmostEqual(cost, expected, places=6)
+
+            used = [column for column in assignment if column >= 0]
+            self.assertEqual(len(used), len(set(used)))
+
+    def test_groups_restrict_candidates(self):
+        """测试按组限制候选时的结果与枚举一致"""
+        for _ in range(100):
+            m, n = self.rng.integers(1, 6), self.rng.integers(0, 5)
+            queries = self.rng.uniform(0, 100, size=(m, 2))
+            points = self.rng.uniform(0, 100, size=(n, 2))
+            weights = self.rng.integers(1, 11, size=m)
+            split = self.rng.integers(0, m + 1)
+            first, second = self.rng.permutation(n)[:n // 2 + 1], self.rng.permutation(n)[:n // 2]
+            groups = [(list(range(split)), first.tolist()), (list(range(split, m)), second.tolist())]
+            allowed = [set(first.tolist()) if row < split else set(second.tolist()) for row in range(m)]
+
+            assignment, cost = solve_assignment(queries, weights, points, unassigned_distance=80.0, groups=groups)
+            self.assertAlmostEqual(cost, brute_force_cost(queries, weights, points, 80.0, allowed), places=6)
+            for row, column in enumerate(assignment):
+                if column >= 0:
+                    self.assertIn(column, allowed[row])
+
+    def test_scarce_units_prefer_severe(self):
+        """测试单位不足时优先分配给更严重的紧急情况"""
+        queries = [(10.0, 10.0), (12.0, 10.0)]
+        points = [(11.0, 10.0)]
+        assignment, _ = solve_assignment(queries, [1, 10], points)
+        self.assertEqual(assignment, [-1, 0])
+
+    def test_pruned_candidates_keep_optimum(self):
+        """测试单位远多于紧急情况时，k近邻剪枝不改变最优成本"""
+        queries = self.rng.uniform(0, 100, size=(30, 2))
+        points = self.rng.uniform(0, 100, size=(2000, 2))
+        weights = self.rng.integers(1, 11, size=30)
+
+        _, pruned_cost = solve_assignment(queries, weights, points)
+        _, full_cost = solve_assignment(queries, weights, points, k=len(points))
+        self.assertAlmostEqual(pruned_cost, full_cost, places=6)
+
+    def test_assign_units_with_queue(self):
+        """测试从优先级队列取前N个紧急情况并按单位类型分配"""
+        queue = HeapPriorityQueue()
+        queue.enqueue(Emergency(1, EmergencyType.FIRE, 1, "A", (10, 10)))
+        queue.enqueue(Emergency(2, EmergencyType.MEDICAL, 2, "B", (11, 10)))
+        queue.enqueue(Emergency(3, EmergencyType.FIRE, 9, "C", (50, 50)))
+        units = [
+            EmergencyUnit(1, "Ambulance", 10, 10),
+            EmergencyUnit(2, "Fire Truck", 40, 40),
+        ]
+
+        emergencies = top_emergencies(queue, 2)
+        self.assertEqual([e.emergency_id for e in emergencies], [1, 2])
+        self.assertEqual(len(queue), 3)
+
+        assignments, total_cost = assign_units(
+            emergencies, units, types_for=lambda e: responding_unit_types(e.type)
+        )
+        self.assertEqual(
+            [(e.emergency_id, unit.unit_id) for e, unit, _ in assignments],
+            [(1, 2), (2, 1)]
+        )
+        expected = severity_weight(emergencies[0]) * math.dist((10, 10), (40, 40)) + severity_weight(emergencies[1]) * 1.0
+        self.assertAlmostEqual(total_cost, expected)
+
+        # 不按类型匹配时，最严重的火灾使用最近的救护车
+        assignments, _ = assign_units(emergencies, units)
+        self.assertEqual(assignments[0][1].unit_id, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import unittest
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from emergency_response.utils.dispatch_simulation import (
+    DispatchSimulation, incidents_from_history, place_units, capacity_plan
+)
+from emergency_response.utils.workload import WorkloadGenerator
+from emergency_response.data_structures.emergency import Emergency, EmergencyType
+from emergency_response.data_structures.emergency_unit import EmergencyUnit
+from emergency_response.data_structures.linked_list import LinkedListPriorityQueue
+
+class TestDispatchSimulation(unittest.TestCase):
+
+    def setUp(self):
+        """测试前的准备工作"""
+        self.history = WorkloadGenerator(seed=3).generate_emergencies(100)
+
+    def test_single_unit_timeline(self):
+        """测试单个单位的行驶时间、处置时间和响应时间"""
+        unit = EmergencyUnit(1, "Ambulance", 0, 0)
+        simulation = DispatchSimulation([unit], unit_speed=2.0, service_time_fn=lambda e, rng: 5.0)
+        incidents = [
+            (0.0, Emergency(1, EmergencyType.MEDICAL, 3, "A", (6, 8))),
+            (1.0, Emergency(2, EmergencyType.FIRE, 1, "B", (6, 8))),
+        ]
+        report = simulation.run(incidents)
+
+        # 第一项: 距离10，速度2，5时刻到达，10时刻完成；第二项原地出发，10时刻到达，15时刻完成
+        self.assertEqual(report['served'], 2)
+        self.assertEqual(report['events'], 6)
+        self.assertAlmostEqual(report['sim_time'], 15.0)
+        self.assertAlmostEqual(report['mean_wait'], 4.5)
+        self.assertAlmostEqual(report['mean_response'], 7.0)
+        self.assertAlmostEqual(report['utilization'], 1.0)
+        # 调用者的单位对象不被修改
+        self.assertEqual((unit.location_x, unit.location_y), (0, 0))
+
+    def test_queue_decides_dispatch_order(self):
+        """测试等待队列按优先级而不是到达顺序调度"""
+        dispatched = []
+
+        def service_time(emergency, rng):
+            dispatched.append(emergency.emergency_id)
+            return 1.0
+
+        unit = EmergencyUnit(1, "Police Car", 0, 0)
+        incidents = [
+            (0.0, Emergency(1, EmergencyType.POLICE, 5, "A", (0, 0))),
+            (0.5, Emergency(2, EmergencyType.POLICE, 9, "B", (0, 0))),
+            (0.6, Emergency(3, EmergencyType.POLICE, 1, "C", (0, 0))),
+        ]
+        DispatchSimulation([unit], service_time_fn=service_time).run(incidents)
+        self.assertEqual(dispatched, [1, 3, 2])
+
+    def test_nearest_free_unit_is_dispatched(self):
+        """测试派出离紧急情况最近的空闲单位"""
+        units = [EmergencyUnit(1, "Fire Truck", 90, 90), EmergencyUnit(2, "Fire Truck", 10, 10)]
+        simulation = DispatchSimulation(units, service_time_fn=lambda e, rng: 1.0)
+        report = simulation.run([(0.0, Emergency(1, EmergencyType.FIRE, 1, "A", (13, 14)))])
+        self.assertAlmostEqual(report['mean_response'], 5.0)
+
+    def test_match_unit_types(self):
+        """测试按类型匹配时只派出对应类型的单位，并且不阻塞其他类型的紧急情况"""
+        dispatched = []
+        units = [EmergencyUnit(1, "Fire Truck", 0, 0), EmergencyUnit(2, "Ambulance", 50, 50)]
+
+        def service_time(emergency, rng):
+            dispatched.append(emergency.emergency_id)
+            return 10.0
+
+        incidents = [
+            (0.0, Emergency(1, EmergencyType.FIRE, 5, "A", (1, 1))),
+            (0.1, Emergency(2, EmergencyType.FIRE, 1, "B", (1, 1))),
+            (0.2, Emergency(3, EmergencyType.MEDICAL, 9, "C", (1, 1))),
+        ]
+        simulation = DispatchSimulation(units, service_time_fn=service_time, match_unit_types=True)
+        report = simulation.run(incidents)
+        # 消防车很近，救护车很远：医疗事件由远处的救护车处理，不等待消防车
+        self.assertEqual(dispatched, [1, 2, 3])
+        self.assertEqual(report['served'], 3)
+        self.assertAlmostEqual(report['mean_wait'], (0.0 + (1.4142135623730951 + 10.0 - 0.1) + 0.0) / 3)
+
+    def test_until_stops_early(self):
+        """测试模拟在指定的虚拟时间停止"""
+        incidents = incidents_from_history(self.history, 500, rate=0.5, seed=1)
+        report = DispatchSimulation(place_units(5, seed=1), seed=1).run(incidents, until=100.0)
+        self.assertLess(report['arrived'], 500)
+        self.assertLessEqual(report['sim_time'], 100.0)
+
+    def test_seeded_runs_are_reproducible_across_queues(self):
+        """测试相同种子的结果可复现，且不同队列实现给出相同的调度结果"""
+        incidents = incidents_from_history(self.history, 1000, rate=0.3, seed=5)
+        first = DispatchSimulation(place_units(8, seed=5), seed=5).run(incidents)
+        second = DispatchSimulation(place_units(8, seed=5), seed=5,
+                                    queue_factory=lambda capacity: LinkedListPriorityQueue()).run(incidents)
+        for key in ('served', 'events', 'sim_time', 'mean_wait', 'p95_response', 'max_queue_depth'):
+            self.assertEqual(first[key], second[key])
+        self.assertEqual(first['served'], 1000)
+        self.assertEqual(first['events'], 3000)
+
+    def test_capacity_plan(self):
+        """测试增加单位数量不会增加平均等待时间"""
+        incidents = incidents_from_history(self.history, 2000, rate=0.3, seed=9)
+        plan = capacity_plan(incidents, [5, 20], seed=9)
+        self.assertEqual([count for count, _ in plan], [5, 20])
+        self.assertGreaterEqual(plan[0][1]['mean_wait'], plan[1][1]['mean_wait'])
+        self.assertGreater(plan[0][1]['utilization'], plan[1][1]['utilization'])
+
+    def test_requires_units(self):
+        """测试没有单位时抛出异常"""
+        with self.assertRaises(ValueError):
+            DispatchSimulation([])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+import sys
+import os
+import gc
+import tkinter as tk
+from unittest import mock
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import matplotlib
+matplotlib.use('Agg')
+
+from emergency_response.data_structures.emergency import EmergencyType
+from emergency_response.gui import emergency_simulation
+from emergency_response.gui.emergency_simulation import EmergencySimulationGUI
+
+class TestSimulationInput(unittest.TestCase):
+
+    def setUp(self):
+        """创建不需要显示器的界面对象（Tcl解释器提供真实的Tk变量，不创建窗口）"""
+        self.tcl = tk.Tcl()
+        self.gui = EmergencySimulationGUI.__new__(EmergencySimulationGUI)
+        for name, value in (('emergency_count', 100), ('simulation_runs', 2), ('target_depth', 100),
+                            ('mixed_operation_count', 100), ('enqueue_ratio', 45),
+                            ('dequeue_ratio', 45), ('change_priority_ratio', 10)):
+            setattr(self.gui, name, tk.IntVar(master=self.tcl, value=value))
+        for name, value in (('ordering', 'random'), ('severity_distribution', 'uniform'),
+                            ('seed', ''), ('space_method', 'layout')):
+            setattr(self.gui, name, tk.StringVar(master=self.tcl, value=value))
+        self.gui.emergency_types = [EmergencyType.FIRE, EmergencyType.MEDICAL]
+        self.gui.locations = ["Downtown"]
+        self.gui._start_task = mock.Mock()
+
+        patcher = mock.patch.object(emergency_simulation.messagebox, 'showerror')
+        self.showerror = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self._release_variables)
+
+    def _release_variables(self):
+        """在主线程中释放Tk变量（否则可能在其他测试的线程中被回收，Tcl会报错）"""
+        self.gui = None
+        self.tcl = None
+        gc.collect()
+
+    def test_bad_seed(self):
+        """测试非整数的随机种子显示错误对话框，不启动后台任务"""
+        self.gui.seed.set("abc")
+        for handler in (self.gui._run_simulation, self.gui._run_mixed_workload):
+            self.showerror.reset_mock()
+            handler()
+            self.showerror.assert_called_once()
+        self.gui._start_task.assert_not_called()
+
+    def test_non_numeric_spinbox(self):
+        """测试Spinbox中的非数字内容显示错误对话框，不启动后台任务"""
+        self.gui.emergency_count.set("many")
+        self.gui.target_depth.set("")
+        for handler in (self.gui._run_simulation, self.gui._run_space_test, self.gui._run_mixed_workload):
+            self.showerror.reset_mock()
+            handler()
+            self.showerror.assert_called_once()
+        self.gui._start_task.assert_not_called()
+
+    def test_valid_input_starts_task(self):
+        """测试合法的参数会启动后台任务"""
+        self.gui.seed.set("42")
+        self.gui._run_mixed_workload()
+        self.showerror.assert_not_called()
+        self.gui._start_task.assert_called_once()
+
+if __name__ == '__main__':
+    unittest.main()
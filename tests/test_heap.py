@@ -40,6 +40,14 @@ class TestHeapPriorityQueue(unittest.TestCase):
         self.assertEqual(self.queue.dequeue(), self.emergency3)
         self.assertEqual(self.queue.dequeue(), self.emergency2)
     
+    def test_peek(self):
+        """测试查看队首元素不会移除它"""
+        self.assertIsNone(self.queue.peek())
+        self.queue.enqueue(self.emergency2)
+        self.queue.enqueue(self.emergency1)
+        self.assertEqual(self.queue.peek(), self.emergency1)
+        self.assertEqual(self.queue.dequeue(), self.emergency1)
+    
     def test_dequeue_empty(self):
         """测试从空队列出队"""
         self.assertIsNone(self.queue.dequeue())
@@ -149,5 +157,15 @@ class TestHeapPriorityQueue(unittest.TestCase):
         self.assertEqual(self.queue.dequeue(), self.emergency1)  # 确保第一个出队的是emergency1
         self.assertEqual(self.queue.dequeue(), emergency5)  # 确保第二个出队的是emergency5
 
+    def test_iter_by_priority(self):
+        """测试按优先级顺序惰性遍历，且不修改队列"""
+        for emergency in (self.emergency2, self.emergency4, self.emergency3, self.emergency1):
+            self.queue.enqueue(emergency)
+        ordered = list(self.queue.iter_by_priority())
+        self.assertEqual(ordered, [self.emergency1, self.emergency4, self.emergency3, self.emergency2])
+        self.assertEqual(len(self.queue), 4)
+        self.assertEqual(next(self.queue.iter_by_priority()), self.emergency1)
+        self.assertEqual(list(HeapPriorityQueue().iter_by_priority()), [])
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
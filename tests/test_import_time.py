@@ -0,0 +1,61 @@
+import unittest
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from emergency_response.utils.import_time import (
+    measure_import_time, heavy_imports, non_stdlib_imports, parse_importtime, COLD_START_BUDGET_MS
+)
+
+DATA_STRUCTURE_MODULES = [
+    'emergency', 'emergency_unit', 'queue_events', 'linked_list',
+    'binary_tree', 'heap', 'spatial_index', 'spatial_hash'
+]
+
+class TestImportTime(unittest.TestCase):
+
+    def test_parse_importtime(self):
+        """测试解析-X importtime的输出"""
+        output = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       300 |        300 | sitecustomize\n"
+            "import time:       120 |        120 |     _io\n"
+            "import time:       680 |        800 |   tkinter\n"
+            "import time:      1500 |       2300 | emergency_response.gui.main_app\n"
+        )
+        self.assertEqual(len(parse_importtime(output)), 4)
+        self.assertEqual(parse_importtime(output, 'emergency_response.gui.main_app'), {
+            '_io': (120, 120),
+            'tkinter': (680, 800),
+            'emergency_response.gui.main_app': (1500, 2300),
+        })
+
+    def test_main_app_cold_start(self):
+        """测试主窗口模块不加载重量级依赖，并且导入时间在预算内"""
+        module = 'emergency_response.gui.main_app'
+        modules = measure_import_time(module)
+        self.assertEqual(heavy_imports(modules), [])
+        self.assertLess(modules[module][1] / 1000, COLD_START_BUDGET_MS)
+
+    def test_headless_utils(self):
+        """测试测量引擎和数据加载不加载绘图或内存分析依赖"""
+        for module in ('emergency_response.utils.performance_analyzer',
+                       'emergency_response.utils.benchmark_store',
+                       'emergency_response.utils.data_loader'):
+            with self.subTest(module=module):
+                modules = measure_import_time(module, repeats=1)
+                self.assertEqual(heavy_imports(modules), [])
+                # /metrics服务在单独的模块中，测量引擎不加载HTTP服务
+                self.assertNotIn('http.server', modules)
+
+    def test_data_structures_use_stdlib_only(self):
+        """测试核心数据结构只依赖标准库"""
+        for name in DATA_STRUCTURE_MODULES:
+            with self.subTest(module=name):
+                modules = measure_import_time(f'emergency_response.data_structures.{name}', repeats=1)
+                self.assertEqual(non_stdlib_imports(modules), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+import sys
+import os
+import random
+from collections import Counter
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from emergency_response.utils.incremental_stats import IncrementalStats
+from emergency_response.data_structures.emergency import Emergency, EmergencyType
+from emergency_response.data_structures.linked_list import LinkedListPriorityQueue
+from emergency_response.data_structures.binary_tree import BinaryTreePriorityQueue
+from emergency_response.data_structures.heap import HeapPriorityQueue
+
+LOCATIONS = ["Downtown", "Harbour", "Airport", "Campus"]
+
+class TestIncrementalStats(unittest.TestCase):
+
+    def setUp(self):
+        """测试前的准备工作"""
+        self.rng = random.Random(12)
+        self.next_id = 0
+
+    def _new_emergency(self):
+        self.next_id += 1
+        return Emergency(
+            self.next_id,
+            self.rng.choice(list(EmergencyType)),
+            self.rng.randint(1, 10),
+            self.rng.choice(LOCATIONS)
+        )
+
+    def assertMatchesRecount(self, stats, emergencies):
+        """与遍历全部紧急情况重新统计的结果比较"""
+        emergencies = list(emergencies)
+        severities = [e.severity_level for e in emergencies]
+        self.assertEqual(stats.total, len(emergencies))
+        self.assertEqual(stats.type_counts, Counter(e.type for e in emergencies))
+        self.assertEqual(stats.severity_counts, Counter(severities))
+        self.assertEqual(stats.location_counts, Counter(e.location for e in emergencies))
+        self.assertEqual(stats.max_severity, max(severities, default=0))
+        self.assertAlmostEqual(stats.mean_severity, sum(severities) / len(severities) if severities else 0)
+
+    def test_from_list(self):
+        """测试从列表创建统计"""
+        emergencies = [self._new_emergency() for _ in range(50)]
+        self.assertMatchesRecount(IncrementalStats(emergencies), emergencies)
+        self.assertMatchesRecount(IncrementalStats(), [])
+
+    def test_follows_queue_events(self):
+        """测试订阅队列后，统计随入队、出队和更改优先级保持正确"""
+        for queue_class in (LinkedListPriorityQueue, BinaryTreePriorityQueue, HeapPriorityQueue):
+            with self.subTest(queue=queue_class.__name__):
+                queue = queue_class()
+                for _ in range(20):
+                    queue.enqueue(self._new_emergency())
+                # 队列允许重复的ID，不同对象必须分别计数
+                for _ in range(3):
+                    duplicate = self._new_emergency()
+                    duplicate.emergency_id = 1
+                    queue.enqueue(duplicate)
+                stats = IncrementalStats.attach(queue)
+                self.assertMatchesRecount(stats, queue)
+
+                for _ in range(300):
+                    operation = self.rng.random()
+                    if operation < 0.4:
+                        queue.enqueue(self._new_emergency())
+                    elif operation < 0.7:
+                        queue.dequeue()
+                    elif len(queue):
+                        target = self.rng.choice(list(queue))
+                        queue.change_priority(target.emergency_id, self.rng.randint(1, 10))
+                    if operation < 0.1:
+                        duplicate = self._new_emergency()
+                        duplicate.emergency_id = 1
+                        queue.enqueue(duplicate)
+                self.assertMatchesRecount(stats, queue)
+
+                stats.detach()
+                queue.enqueue(self._new_emergency())
+                self.assertEqual(stats.total, len(queue) - 1)
+
+    def test_same_object_counted_twice(self):
+        """测试同一个对象计入两次时，更改严重程度和移除都按次数处理"""
+        emergency = self._new_emergency()
+        stats = IncrementalStats([emergency, emergency])
+        emergency.severity_level = emergency.severity_level % 10 + 1
+        stats.update_severity(emergency)
+        self.assertMatchesRecount(stats, [emergency, emergency])
+        stats.remove(emergency)
+        self.assertMatchesRecount(stats, [emergency])
+        stats.remove(emergency)
+        self.assertMatchesRecount(stats, [])
+        self.assertEqual(stats.entries, {})
+
+    def test_shared_emergency_changed_elsewhere(self):
+        """测试共享的紧急情况对象已被另一个队列修改时，统计仍然正确"""
+        linked_list, heap = LinkedListPriorityQueue(), HeapPriorityQueue()
+        emergencies = [self._new_emergency() for _ in range(30)]
+        for emergency in emergencies:
+            linked_list.enqueue(emergency)
+            heap.enqueue(emergency)
+        stats = IncrementalStats.attach(heap)
+
+        for emergency in emergencies[:10]:
+            new_severity = emergency.severity_level % 10 + 1
+            linked_list.change_priority(emergency.emergency_id, new_severity)
+            heap.change_priority(emergency.emergency_id, new_severity)
+        self.assertMatchesRecount(stats, heap)
+
+if __name__ == '__main__':
+    unittest.main()
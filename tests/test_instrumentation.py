@@ -0,0 +1,129 @@
+import unittest
+import sys
+import os
+import urllib.request
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from emergency_response.utils.instrumentation import QueueInstrumentation
+from emergency_response.utils.metrics_server import MetricsServer, export_prometheus
+from emergency_response.utils.performance_analyzer import PerformanceAnalyzer
+from emergency_response.data_structures.emergency import Emergency, EmergencyType
+from emergency_response.data_structures.linked_list import LinkedListPriorityQueue
+from emergency_response.data_structures.binary_tree import BinarySearchTree, BinaryTreePriorityQueue
+from emergency_response.data_structures.heap import HeapPriorityQueue
+
+class TestQueueInstrumentation(unittest.TestCase):
+
+    def setUp(self):
+        """测试前的准备工作"""
+        self.emergencies = [
+            Emergency(i, EmergencyType.FIRE, (i * 7) % 10 + 1, "A") for i in range(1, 41)
+        ]
+
+    def _exercise(self, queue):
+        """执行入队、查找、修改优先级和出队，返回出队顺序"""
+        for e in self.emergencies:
+            queue.enqueue(e)
+        for e in self.emergencies[:5]:
+            self.assertIs(queue.search(e.emergency_id), e)
+        self.assertIsNone(queue.search(999))
+        self.assertTrue(queue.change_priority(self.emergencies[10].emergency_id, 1))
+        order = []
+        while not queue.is_empty():
+            order.append(queue.dequeue())
+        return order
+
+    def test_counts_and_behaviour(self):
+        """测试插桩不改变队列行为，并记录每种操作的计数"""
+        for queue_class in (LinkedListPriorityQueue, BinaryTreePriorityQueue, HeapPriorityQueue):
+            with self.subTest(queue=queue_class.__name__):
+                queue = queue_class()
+                instrumentation = QueueInstrumentation.attach(queue)
+                order = self._exercise(queue)
+                instrumentation.detach()
+
+                self.assertEqual(order, sorted(order))
+                self.assertIs(type(queue), queue_class)
+                self.assertFalse(hasattr(queue, 'instrumentation'))
+                self.assertTrue(all(type(e) is Emergency for e in self.emergencies))
+
+                snapshot = instrumentation.snapshot()
+                self.assertEqual(snapshot['enqueue']['calls'], 40)
+                self.assertEqual(snapshot['search']['calls'], 6)
+                self.assertEqual(snapshot['change_priority']['calls'], 1)
+                self.assertEqual(snapshot['dequeue']['calls'], 40)
+                self.assertGreater(snapshot['enqueue']['comparisons'], 0)
+                self.assertGreater(snapshot['search']['nodes_visited'], 0)
+                self.assertGreater(snapshot['enqueue']['latency_p50'], 0)
+                if queue_class is HeapPriorityQueue:
+                    self.assertGreater(snapshot['dequeue']['swaps'], 0)
+                    self.assertEqual(snapshot['search']['nodes_visited'], 6)
+                else:
+                    self.assertEqual(snapshot['enqueue']['allocations'], 40)
+                    self.assertEqual(snapshot['change_priority']['allocations'], 1)
+
+                # 取消插桩后不再计数
+                queue.enqueue(self.emergencies[0])
+                self.assertEqual(instrumentation.snapshot()['enqueue']['calls'], 40)
+                for e in self.emergencies:
+                    e.severity_level = (e.emergency_id * 7) % 10 + 1
+
+    def test_linked_list_exact_counts(self):
+        """测试链表插入和查找的精确计数"""
+        queue = LinkedListPriorityQueue()
+        instrumentation = QueueInstrumentation.attach(queue)
+        for i, severity in enumerate([1, 5, 9, 3], 1):
+            queue.enqueue(Emergency(i, EmergencyType.MEDICAL, severity, "B"))
+        # 第2、3个项目与头部和尾部各比较一次；第4个项目还要从头部向后比较1个节点
+        counts = instrumentation.snapshot()['enqueue']
+        self.assertEqual(counts['comparisons'], 0 + 2 + 2 + 3)
+        queue.search(3)  # 顺序: 1, 4, 2, 3
+        self.assertEqual(instrumentation.snapshot()['search']['nodes_visited'], 4)
+
+    def test_binary_search_tree_and_double_attach(self):
+        """测试直接使用BinarySearchTree，以及重复启用插桩"""
+        tree = BinarySearchTree()
+        instrumentation = QueueInstrumentation.attach(tree)
+        for e in self.emergencies[:10]:
+            tree.insert(e)
+        self.assertEqual(instrumentation.snapshot()['enqueue']['calls'], 10)
+        with self.assertRaises(ValueError):
+            QueueInstrumentation.attach(tree)
+        instrumentation.detach()
+        self.assertIs(type(tree), BinarySearchTree)
+
+    def test_export_and_metrics_server(self):
+        """测试Prometheus格式导出和/metrics端点"""
+        queue = HeapPriorityQueue()
+        instrumentation = QueueInstrumentation.attach(queue)
+        for e in self.emergencies:
+            queue.enqueue(e)
+        text = export_prometheus({'heap': instrumentation})
+        self.assertIn('queue_operations_total{queue="heap",operation="enqueue"} 40', text)
+        self.assertIn('queue_operation_latency_seconds_count{queue="heap",operation="enqueue"} 40', text)
+
+        server = MetricsServer({'heap': instrumentation}).start()
+        try:
+            with urllib.request.urlopen(f'http://127.0.0.1:{server.port}/metrics', timeout=5) as response:
+                self.assertEqual(response.status, 200)
+                self.assertIn('queue_swaps_total', response.read().decode('utf-8'))
+        finally:
+            server.stop()
+
+    def test_performance_analyzer_operation_counts(self):
+        """测试PerformanceAnalyzer使用插桩统计操作计数"""
+        analyzer = PerformanceAnalyzer()
+        results = analyzer.measure_operation_counts([50, 200], search_count=10)
+        self.assertIs(analyzer.results['operation_counts'], results)
+        for name in ('Linked List', 'Binary Tree', 'Heap'):
+            small, large = results[name]
+            self.assertEqual(large['enqueue']['calls'], 200)
+            self.assertGreater(large['enqueue']['comparisons'], small['enqueue']['comparisons'])
+        # 链表插入的比较次数随规模近似平方增长，堆近似n log n
+        self.assertGreater(results['Linked List'][1]['enqueue']['comparisons'],
+                           results['Heap'][1]['enqueue']['comparisons'])
+
+if __name__ == '__main__':
+    unittest.main()
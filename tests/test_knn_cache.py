@@ -0,0 +1,84 @@
+import unittest
+import sys
+import os
+import random
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from emergency_response.utils.knn_cache import KNNCache
+from emergency_response.data_structures.spatial_index import SpatialIndex
+from emergency_response.data_structures.emergency_unit import EmergencyUnit, UNIT_TYPES
+
+class TestKNNCache(unittest.TestCase):
+
+    def setUp(self):
+        """测试前的准备工作"""
+        rng = random.Random(5)
+        self.units = [
+            EmergencyUnit(i, rng.choice(UNIT_TYPES), rng.uniform(0, 100), rng.uniform(0, 100))
+            for i in range(1, 101)
+        ]
+        self.index = SpatialIndex(self.units)
+        self.cache = KNNCache(self.index, max_entries=3)
+
+    def test_repeat_and_prefix_queries_hit(self):
+        """测试重复查询和较小k的查询直接命中缓存"""
+        first = self.cache.nearest(50, 50, 5, key=1)
+        self.assertEqual(first, self.index.nearest(50, 50, 5))
+        self.assertEqual(self.cache.nearest(50, 50, 5, key=1), first)
+        self.assertEqual(self.cache.nearest(50, 50, 2, key=1), first[:2])
+        self.assertEqual((self.cache.hits, self.cache.misses), (2, 1))
+
+        # 更大的k需要重新查询，之后较小的k仍然命中
+        self.assertEqual(len(self.cache.nearest(50, 50, 8, key=1)), 8)
+        self.cache.nearest(50, 50, 6, key=1)
+        self.assertEqual((self.cache.hits, self.cache.misses), (3, 2))
+
+        # 返回的列表是副本，修改它不影响缓存
+        first.clear()
+        self.assertEqual(len(self.cache.nearest(50, 50, 5, key=1)), 5)
+
+    def test_filters_are_part_of_key(self):
+        """测试类型过滤和可用状态过滤使用不同的缓存项"""
+        all_types = self.cache.nearest(20, 20, 3, key=1)
+        ambulances = self.cache.nearest(20, 20, 3, types={"Ambulance"}, key=1)
+        self.assertEqual(self.cache.misses, 2)
+        self.assertTrue(all(unit.unit_type == "Ambulance" for unit, _ in ambulances))
+        self.assertNotEqual(all_types, ambulances)
+
+    def test_invalidated_by_unit_changes(self):
+        """测试单位移动、插入和可用状态变化后不再返回旧结果"""
+        self.cache.nearest(10, 10, 1, key=7)
+        unit = self.units[0]
+        self.index.move(unit, 10, 10)
+        self.assertEqual(self.cache.nearest(10, 10, 1, key=7)[0][0], unit)
+
+        self.index.set_available(unit, False)
+        self.assertNotEqual(self.cache.nearest(10, 10, 1, available_only=True, key=7)[0][0], unit)
+
+        newcomer = EmergencyUnit(500, "Fire Truck", 10.0, 10.0)
+        self.index.insert(newcomer)
+        self.assertIn(newcomer, [found for found, _ in self.cache.nearest(10, 10, 2, key=7)])
+
+    def test_short_result_serves_any_k(self):
+        """测试结果少于k时（单位已全部返回），更大的k也直接命中"""
+        self.cache.nearest(50, 50, 200, key=1)
+        self.assertEqual(len(self.cache.nearest(50, 50, 500, key=1)), 100)
+        self.assertEqual(self.cache.hits, 1)
+
+    def test_lru_eviction(self):
+        """测试超过容量时淘汰最久未使用的结果"""
+        for key in range(3):
+            self.cache.nearest(key, key, 1, key=key)
+        self.cache.nearest(0, 0, 1, key=0)
+        self.cache.nearest(3, 3, 1, key=3)
+        self.assertEqual(len(self.cache), 3)
+
+        self.cache.nearest(0, 0, 1, key=0)
+        self.assertEqual(self.cache.hits, 2)
+        self.cache.nearest(1, 1, 1, key=1)
+        self.assertEqual(self.cache.misses, 5)
+
+if __name__ == '__main__':
+    unittest.main()
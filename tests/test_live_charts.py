@@ -0,0 +1,94 @@
+import unittest
+from unittest import mock
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from emergency_response.gui.live_charts import LivePieChart, LiveBarChart, ThrottledDraw
+
+class TestLiveCharts(unittest.TestCase):
+
+    def setUp(self):
+        """测试前的准备工作（使用不需要显示器的Agg画布）"""
+        self.figure = Figure(figsize=(4, 3), dpi=50)
+        self.canvas = FigureCanvasAgg(self.figure)
+        self.ax = self.figure.add_subplot(111)
+
+    def _artist_count(self):
+        """返回坐标轴上的图元数量"""
+        return len(self.ax.patches) + len(self.ax.texts)
+
+    def test_pie_updates_in_place(self):
+        """测试饼图更新不创建新的图元，并正确计算百分比"""
+        chart = LivePieChart(self.ax, ['A', 'B', 'C'], ['red', 'green', 'blue'], 'Pie')
+        count = self._artist_count()
+        chart.update([1, 1, 2])
+        chart.update([3, 0, 1])
+        self.canvas.draw()
+        self.assertEqual(self._artist_count(), count)
+
+        # 数量为0的类别被隐藏
+        self.assertFalse(chart.wedges[1].get_visible())
+        self.assertFalse(chart.labels[1].get_visible())
+        self.assertEqual(chart.percentages[0].get_text(), "75.0%")
+        self.assertEqual(chart.percentages[2].get_text(), "25.0%")
+        self.assertAlmostEqual(chart.wedges[0].theta2 - chart.wedges[0].theta1, 270.0)
+
+    def test_bar_updates_in_place(self):
+        """测试柱状图更新不创建新的图元，并只显示非零的数值标签"""
+        chart = LiveBarChart(self.ax, range(1, 11), 'Bar', 'x', 'y')
+        count = self._artist_count()
+        chart.update([0, 2, 0, 0, 5, 0, 0, 0, 0, 1])
+        self.canvas.draw()
+        self.assertEqual(self._artist_count(), count)
+        self.assertEqual([bar.get_height() for bar in chart.bars][:5], [0, 2, 0, 0, 5])
+        self.assertEqual(chart.values[4].get_text(), "5")
+        self.assertFalse(chart.values[0].get_visible())
+        self.assertGreater(self.ax.get_ylim()[1], 5)
+
+    def test_throttled_draw_coalesces_requests(self):
+        """测试间隔内的多次重绘请求只触发一次延迟重绘"""
+        scheduled = []
+        draws = []
+        self.canvas.draw_idle = lambda: draws.append(1)
+        throttle = ThrottledDraw(self.canvas, lambda ms, callback: scheduled.append(callback) or len(scheduled),
+                                 mock.Mock(), interval=10)
+
+        # 第一次请求立即重绘，之后的请求合并为一次延迟重绘
+        throttle.request()
+        for _ in range(5):
+            throttle.request()
+        self.assertEqual(len(draws), 1)
+        self.assertEqual(len(scheduled), 1)
+
+        scheduled[0]()
+        self.assertEqual(len(draws), 2)
+        self.assertIsNone(throttle.pending_job)
+
+    def test_throttled_draw_cancel(self):
+        """测试窗口销毁时取消已安排的重绘"""
+        draws = []
+        self.canvas.draw_idle = lambda: draws.append(1)
+        after = mock.Mock(return_value="after#7")
+        after_cancel = mock.Mock()
+        throttle = ThrottledDraw(self.canvas, after, after_cancel, interval=10)
+
+        throttle.request()
+        throttle.request()
+        after.assert_called_once()
+        throttle.cancel()
+        after_cancel.assert_called_once_with("after#7")
+        self.assertIsNone(throttle.pending_job)
+
+        # 没有等待中的重绘时cancel什么也不做
+        throttle.cancel()
+        after_cancel.assert_called_once()
+        self.assertEqual(len(draws), 1)
+
+if __name__ == '__main__':
+    unittest.main()
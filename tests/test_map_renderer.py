@@ -0,0 +1,123 @@
+import unittest
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from emergency_response.gui.map_renderer import MapRenderer, BUSY_ALPHA, benchmark_rendering
+from emergency_response.data_structures.emergency import Emergency, EmergencyType
+from emergency_response.data_structures.emergency_unit import EmergencyUnit
+
+class TestMapRenderer(unittest.TestCase):
+
+    def setUp(self):
+        """测试前的准备工作（使用不需要显示器的Agg画布）"""
+        self.figure = Figure(figsize=(4, 3), dpi=50)
+        self.canvas = FigureCanvasAgg(self.figure)
+        self.renderer = MapRenderer(self.figure, self.canvas)
+        self.draws = 0
+        self.canvas.mpl_connect('draw_event', self._count_draw)
+        self.units = [
+            EmergencyUnit(1, "Fire Truck", 10, 10),
+            EmergencyUnit(2, "Ambulance", 20, 20),
+            EmergencyUnit(3, "Ambulance", 30, 30),
+        ]
+        self.emergencies = [
+            Emergency(1, EmergencyType.FIRE, 1, "A", (15, 15)),
+            Emergency(2, EmergencyType.MEDICAL, 2, "B", (25, 25)),
+        ]
+
+    def _count_draw(self, event):
+        self.draws += 1
+
+    def test_static_layers_update_in_place(self):
+        """测试单位和紧急事件图层原地更新，不创建新的集合"""
+        artists_before = len(self.renderer.ax.collections)
+        self.renderer.set_units(self.units, lambda unit: unit.unit_id != 3)
+        self.renderer.set_emergencies(self.emergencies)
+        self.assertEqual(len(self.renderer.ax.collections), artists_before)
+
+        ambulances = self.renderer.unit_collections["Ambulance"]
+        self.assertEqual(ambulances.get_offsets().tolist(), [[20, 20], [30, 30]])
+        self.assertEqual(ambulances.get_facecolors()[:, 3].tolist(), [1.0, BUSY_ALPHA])
+        self.assertEqual(len(self.renderer.emergency_collection.get_offsets()), 2)
+
+        # 紧急事件减少时隐藏多余的标签而不是删除
+        self.renderer.set_emergencies(self.emergencies[:1])
+        self.assertEqual(len(self.renderer.emergency_labels), 2)
+        self.assertFalse(self.renderer.emergency_labels[1].get_visible())
+
+    def test_highlight_uses_blitting(self):
+        """测试只改变当前紧急事件时不触发完整重绘"""
+        self.renderer.set_units(self.units)
+        self.renderer.set_emergencies(self.emergencies)
+        draws = self.draws
+
+        recommendation = [(self.units[1], 14.14), (self.units[2], 21.21)]
+        self.renderer.set_highlight(self.emergencies[0], recommendation)
+        self.renderer.set_highlight(self.emergencies[1], recommendation[:1])
+        self.assertEqual(self.draws, draws)
+        self.assertEqual(len(self.renderer.knn_lines.get_segments()), 1)
+        self.assertEqual(self.renderer.highlight_label.get_text(), "Current: 2")
+
+        self.renderer.set_highlight(None, [])
+        self.assertEqual(len(self.renderer.highlight.get_offsets()), 0)
+        self.assertEqual(self.draws, draws)
+
+    def test_level_of_detail_follows_viewport(self):
+        """测试视口内点多时显示密度图，放大后恢复散点并只为视口内的点显示标签"""
+        figure = Figure(figsize=(4, 3), dpi=50)
+        canvas = FigureCanvasAgg(figure)
+        renderer = MapRenderer(figure, canvas, lod_threshold=50, max_labels=10)
+        emergencies = [
+            Emergency(i, EmergencyType.FIRE, 1, "A", (float(i % 20) * 5, float(i // 20) * 5))
+            for i in range(400)
+        ]
+        renderer.set_emergencies(emergencies)
+        self.assertTrue(renderer.lod_active)
+        self.assertIsNotNone(renderer.density)
+        self.assertFalse(renderer.emergency_collection.get_visible())
+        self.assertFalse(any(label.get_visible() for label in renderer.emergency_labels))
+
+        # 放大到只包含4个点的区域：两个坐标轴回调合并为一次更新
+        # （Agg画布没有事件循环，定时器不会触发，需要手动执行）
+        updates = []
+        original_update = renderer._update_view
+        renderer._update_view = lambda: updates.append(1) or original_update()
+        renderer.ax.set_xlim(-1, 6)
+        renderer.ax.set_ylim(-1, 6)
+        self.assertTrue(renderer.lod_active)
+        renderer.flush_view()
+        renderer.flush_view()
+        self.assertEqual(len(updates), 1)
+        self.assertFalse(renderer.lod_active)
+        self.assertIsNone(renderer.density)
+        self.assertEqual(len(renderer.emergency_collection.get_offsets()), 4)
+        shown = sorted(label.get_text() for label in renderer.emergency_labels if label.get_visible())
+        self.assertEqual(shown, ["ID: 0", "ID: 1", "ID: 20", "ID: 21"])
+        self.assertLessEqual(len(renderer.emergency_labels), 10)
+
+        # 中等缩放：点数低于LOD阈值但超过标签上限时只显示散点
+        renderer.ax.set_xlim(-1, 31)
+        renderer.ax.set_ylim(-1, 31)
+        renderer.flush_view()
+        self.assertEqual(len(updates), 2)
+        self.assertFalse(renderer.lod_active)
+        self.assertEqual(len(renderer.emergency_collection.get_offsets()), 49)
+        self.assertFalse(any(label.get_visible() for label in renderer.emergency_labels))
+        canvas.draw()
+
+    def test_benchmark_rendering(self):
+        """测试渲染基准测试返回每个数量的各项时间"""
+        results = benchmark_rendering(counts=(100, 500), repeats=1)
+        self.assertEqual(list(results), [100, 500])
+        for timings in results.values():
+            self.assertEqual(set(timings), {'all_points', 'lod', 'zoomed'})
+            self.assertTrue(all(seconds > 0 for seconds in timings.values()))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,13 +1,14 @@
 import unittest
 import sys
 import os
+import threading
 import matplotlib
 matplotlib.use('Agg')  # 使用非交互式后端，避免在没有GUI的环境中出错
 
 # 添加项目根目录到Python路径
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from emergency_response.utils.performance_analyzer import PerformanceAnalyzer
+from emergency_response.utils.performance_analyzer import PerformanceAnalyzer, BenchmarkCancelled
 from emergency_response.data_structures.linked_list import LinkedListPriorityQueue
 from emergency_response.data_structures.binary_tree import BinaryTreePriorityQueue
 from emergency_response.data_structures.heap import HeapPriorityQueue
@@ -115,6 +116,18 @@ class TestPerformanceAnalyzer(unittest.TestCase):
         except Exception as e:
             self.fail(f"绘制图表失败: {e}")
     
+    def test_plotting_adapter(self):
+        """测试绘图适配器直接绘制结果字典"""
+        from matplotlib.figure import Figure
+        from emergency_response.utils.performance_plotting import plot_results
+        results = {'space': {'Heap': [1.0, 2.0], 'Linked List': [1.5, 3.0]}}
+        fig = Figure()
+        ax = fig.add_subplot(111)
+        self.assertIs(plot_results(results, 'space', [10, 20], fig, ax), fig)
+        self.assertEqual(ax.get_ylabel(), 'Memory Usage (KB)')
+        self.assertEqual(len(ax.lines), 2)
+        self.assertIsNone(plot_results(results, 'enqueue', [10, 20], fig, ax))
+    
     def test_run_small_test(self):
         """测试运行小规模测试"""
         try:
@@ -134,6 +147,80 @@ class TestPerformanceAnalyzer(unittest.TestCase):
         except Exception as e:
             self.fail(f"运行测试失败: {e}")
     
+    def test_space_methods(self):
+        """测试各种内存测量方式的结果一致且随数据量增长"""
+        data_sizes = [500, 1000]
+        results = {}
+        for method in ('tracemalloc', 'layout'):
+            analyzer = PerformanceAnalyzer()
+            analyzer.measure_space_complexity(data_sizes, method=method)
+            results[method] = analyzer.results['space']
+        for name in ('Linked List', 'Binary Tree', 'Heap'):
+            for method in results:
+                small, large = results[method][name]
+                self.assertGreater(large, small * 1.5)
+            # layout是近似值，与tracemalloc的测量值相差不大
+            ratio = results['layout'][name][-1] / results['tracemalloc'][name][-1]
+            self.assertTrue(0.7 < ratio < 1.3, f"{name}: {ratio:.2f}")
+
+        # layout不构建队列，大规模也很快
+        self.analyzer.measure_space_complexity([10 ** 6], method='layout')
+        self.assertGreater(self.analyzer.results['space']['Heap'][0], 10 ** 4)
+        with self.assertRaises(ValueError):
+            self.analyzer.measure_space_complexity([10], method='unknown')
+    
+    def test_measure_mixed_workload(self):
+        """测试稳态交错操作的吞吐量和延迟测量"""
+        results = self.analyzer.measure_mixed_workload(50, 200, seed=1)
+        
+        # 验证结果格式
+        self.assertIn('mixed', self.analyzer.results)
+        for name in ['Linked List', 'Binary Tree', 'Heap']:
+            self.assertGreater(results[name]['ops_per_sec'], 0)
+            latencies = results[name]['latencies']
+            total_ops = sum(len(values) for values in latencies.values())
+            self.assertEqual(total_ops, 200)
+            # 吞吐量按整个循环的墙钟时间计算，不会高于只累加单次调用耗时得到的值
+            timed = sum(sum(values) for values in latencies.values())
+            self.assertLessEqual(results[name]['ops_per_sec'], total_ops / timed)
+        
+        # 三种队列执行的是相同的操作序列
+        self.assertEqual(
+            len(results['Heap']['latencies']['dequeue']),
+            len(results['Linked List']['latencies']['dequeue'])
+        )
+    
+    def test_measure_spatial_index_performance(self):
+        """测试空间索引基准测试覆盖所有比例和索引类型"""
+        results = self.analyzer.measure_spatial_index_performance(200, 100, update_ratios=(0.0, 0.9), seed=1)
+        self.assertEqual(list(results), [0.0, 0.9])
+        for ratio_results in results.values():
+            self.assertEqual(set(ratio_results), {'Brute Force', 'KD-Tree', 'Grid Hash'})
+            self.assertTrue(all(ops > 0 for ops in ratio_results.values()))
+    
+    def test_progress_and_cancel(self):
+        """测试进度回调和取消请求"""
+        reports = []
+        analyzer = PerformanceAnalyzer(progress_callback=lambda fraction, message: reports.append(fraction))
+        analyzer.measure_enqueue_performance([10, 20])
+        self.assertEqual(len(reports), 6)
+        self.assertEqual(reports[-1], 1.0)
+        
+        cancel_event = threading.Event()
+        cancel_event.set()
+        analyzer = PerformanceAnalyzer(cancel_event=cancel_event)
+        with self.assertRaises(BenchmarkCancelled):
+            analyzer.measure_mixed_workload(10, 100, seed=1)
+        with self.assertRaises(BenchmarkCancelled):
+            analyzer.measure_space_complexity([10])
+    
+    def test_latency_percentiles(self):
+        """测试延迟百分位数计算"""
+        percentiles = PerformanceAnalyzer.latency_percentiles(list(range(1, 101)))
+        self.assertEqual(percentiles[50], 51)
+        self.assertEqual(percentiles[99], 99)
+        self.assertEqual(PerformanceAnalyzer.latency_percentiles([])[95], 0.0)
+    
     def test_get_complexity_analysis(self):
         """测试获取复杂度分析结果"""
         try:
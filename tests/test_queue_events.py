@@ -0,0 +1,89 @@
+import unittest
+import sys
+import os
+import random
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from emergency_response.data_structures.emergency import Emergency, EmergencyType
+from emergency_response.data_structures.linked_list import LinkedListPriorityQueue
+from emergency_response.data_structures.binary_tree import BinaryTreePriorityQueue
+from emergency_response.data_structures.heap import HeapPriorityQueue
+from emergency_response.data_structures.queue_events import INSERTED, REMOVED, REPRIORITISED
+
+QUEUE_CLASSES = (LinkedListPriorityQueue, BinaryTreePriorityQueue, HeapPriorityQueue)
+
+class TestQueueEvents(unittest.TestCase):
+
+    def setUp(self):
+        """测试前的准备工作"""
+        self.emergency1 = Emergency(1, EmergencyType.FIRE, 5, "A")
+        self.emergency2 = Emergency(2, EmergencyType.MEDICAL, 3, "B")
+
+    def test_operations_emit_events(self):
+        """测试入队、出队和更改优先级各发送一个事件"""
+        for queue_class in QUEUE_CLASSES:
+            with self.subTest(queue=queue_class.__name__):
+                queue = queue_class()
+                events = []
+                queue.subscribe(lambda source, event: events.append((source, event)))
+
+                queue.enqueue(Emergency(1, EmergencyType.FIRE, 5, "A"))
+                queue.enqueue(Emergency(2, EmergencyType.MEDICAL, 3, "B"))
+                queue.change_priority(1, 1)
+                queue.change_priority(99, 1)
+                removed = queue.dequeue()
+
+                self.assertTrue(all(source is queue for source, _ in events))
+                self.assertEqual(
+                    [(event.kind, event.item.emergency_id) for _, event in events],
+                    [(INSERTED, 1), (INSERTED, 2), (REPRIORITISED, 1), (REMOVED, 1)]
+                )
+                self.assertEqual(events[2][1].old_severity, 5)
+                self.assertEqual(removed.emergency_id, 1)
+
+    def test_unsubscribe(self):
+        """测试取消订阅后不再收到事件"""
+        queue = HeapPriorityQueue()
+        events = []
+        callback = lambda source, event: events.append(event)
+        queue.subscribe(callback)
+        queue.subscribe(callback)
+        queue.enqueue(self.emergency1)
+        queue.unsubscribe(callback)
+        queue.unsubscribe(callback)
+        queue.enqueue(self.emergency2)
+        self.assertEqual(len(events), 1)
+
+    def test_bst_remove_emits_removed(self):
+        """测试从二叉树中删除指定紧急情况时发送REMOVED事件"""
+        queue = BinaryTreePriorityQueue()
+        queue.enqueue(self.emergency1)
+        events = []
+        queue.subscribe(lambda source, event: events.append(event))
+        queue.remove(self.emergency1.emergency_id)
+        queue.remove(self.emergency1.emergency_id)
+        self.assertEqual([event.kind for event in events], [REMOVED])
+
+    def test_shared_emergency_change_priority(self):
+        """测试多个队列共享紧急情况对象时，依次更改优先级后出队顺序仍然正确"""
+        rng = random.Random(9)
+        emergencies = [Emergency(i, EmergencyType.POLICE, rng.randint(1, 10), "C") for i in range(200)]
+        queues = [queue_class() for queue_class in QUEUE_CLASSES]
+        for queue in queues:
+            for emergency in emergencies:
+                queue.enqueue(emergency)
+
+        for _ in range(100):
+            emergency_id, new_severity = rng.randrange(200), rng.randint(1, 10)
+            # 每个队列都修改同一个对象，后面的队列看到的旧值已经是新值
+            for queue in rng.sample(queues, len(queues)):
+                self.assertTrue(queue.change_priority(emergency_id, new_severity))
+
+        expected = sorted(emergencies)
+        for queue in queues:
+            self.assertEqual([queue.dequeue() for _ in range(len(emergencies))], expected)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+import sys
+import os
+import math
+import random
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from emergency_response.data_structures.spatial_hash import GridSpatialHash
+from emergency_response.data_structures.emergency_unit import EmergencyUnit
+
+class TestGridSpatialHash(unittest.TestCase):
+
+    def setUp(self):
+        """测试前的准备工作"""
+        self.rng = random.Random(42)
+        self.units = [
+            EmergencyUnit(i, "Police Car", self.rng.uniform(0, 100), self.rng.uniform(0, 100))
+            for i in range(1, 301)
+        ]
+        self.grid = GridSpatialHash(cell_size=7.5, units=self.units)
+
+    def _brute_force(self, x, y):
+        """按距离排序的所有单位ID（暴力计算，作为参照）"""
+        return sorted(
+            (math.hypot(unit.location_x - x, unit.location_y - y), unit.unit_id)
+            for unit in self.units
+        )
+
+    def test_k_nearest_matches_brute_force(self):
+        """测试逐圈扩展的k近邻查询与暴力计算一致，包括坐标范围外的查询点"""
+        for _ in range(50):
+            x, y = self.rng.uniform(-20, 120), self.rng.uniform(-20, 120)
+            result = self.grid.k_nearest(x, y, 6)
+            expected = self._brute_force(x, y)[:6]
+            self.assertEqual([unit.unit_id for unit, _ in result], [unit_id for _, unit_id in expected])
+
+    def test_k_larger_than_unit_count(self):
+        """测试k大于单位数量时返回全部单位"""
+        self.assertEqual(len(self.grid.k_nearest(50, 50, 1000)), 300)
+        self.assertEqual(GridSpatialHash().k_nearest(50, 50, 3), [])
+
+    def test_within_radius(self):
+        """测试半径查询"""
+        result = self.grid.within_radius(30, 70, 12)
+        expected = [unit_id for distance, unit_id in self._brute_force(30, 70) if distance <= 12]
+        self.assertEqual([unit.unit_id for unit, _ in result], expected)
+
+    def test_move_updates_cells(self):
+        """测试移动单位只更新网格，查询结果保持正确"""
+        for _ in range(2000):
+            unit = self.rng.choice(self.units)
+            self.grid.move(unit, self.rng.uniform(0, 100), self.rng.uniform(0, 100))
+        self.assertEqual(len(self.grid), 300)
+        self.assertEqual(sum(len(cell) for cell in self.grid.cells.values()), 300)
+        for _ in range(20):
+            x, y = self.rng.uniform(0, 100), self.rng.uniform(0, 100)
+            result = [unit.unit_id for unit, _ in self.grid.k_nearest(x, y, 3)]
+            self.assertEqual(result, [unit_id for _, unit_id in self._brute_force(x, y)[:3]])
+
+    def test_insert_remove(self):
+        """测试插入和删除"""
+        unit = EmergencyUnit(999, "Ambulance", 250.0, 250.0)
+        self.grid.insert(unit)
+        self.assertIn(unit, self.grid)
+        self.assertEqual(self.grid.k_nearest(240, 240, 1)[0][0], unit)
+        with self.assertRaises(ValueError):
+            self.grid.insert(unit)
+        self.assertTrue(self.grid.remove(unit))
+        self.assertFalse(self.grid.remove(unit))
+        with self.assertRaises(KeyError):
+            self.grid.move(unit, 1, 1)
+        with self.assertRaises(ValueError):
+            GridSpatialHash(cell_size=0)
+
+if __name__ == '__main__':
+    unittest.main()
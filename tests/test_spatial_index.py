@@ -0,0 +1,136 @@
+import unittest
+import sys
+import os
+import math
+import random
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from emergency_response.data_structures.spatial_index import SpatialIndex
+from emergency_response.data_structures.emergency_unit import EmergencyUnit
+
+class TestSpatialIndex(unittest.TestCase):
+
+    def setUp(self):
+        """测试前的准备工作"""
+        self.rng = random.Random(42)
+        self.units = [
+            EmergencyUnit(i, "Ambulance", self.rng.uniform(0, 100), self.rng.uniform(0, 100))
+            for i in range(1, 501)
+        ]
+        self.index = SpatialIndex(self.units)
+
+    def _brute_force(self, x, y):
+        """按距离排序的所有单位ID（暴力计算，作为参照）"""
+        return sorted(
+            (math.hypot(unit.location_x - x, unit.location_y - y), unit.unit_id)
+            for unit in self.units
+        )
+
+    def test_k_nearest_matches_brute_force(self):
+        """测试k近邻查询与暴力计算的结果一致"""
+        for _ in range(50):
+            x, y = self.rng.uniform(-10, 110), self.rng.uniform(-10, 110)
+            result = self.index.k_nearest(x, y, 5)
+            expected = self._brute_force(x, y)[:5]
+            self.assertEqual([unit.unit_id for unit, _ in result], [unit_id for _, unit_id in expected])
+            for (_, distance), (expected_distance, _) in zip(result, expected):
+                self.assertAlmostEqual(distance, expected_distance)
+
+    def test_k_nearest_edge_cases(self):
+        """测试k为0、k大于单位数量和空索引"""
+        self.assertEqual(self.index.k_nearest(50, 50, 0), [])
+        self.assertEqual(len(self.index.k_nearest(50, 50, 1000)), 500)
+        self.assertEqual(SpatialIndex().k_nearest(50, 50, 3), [])
+
+    def test_within_radius(self):
+        """测试半径查询"""
+        result = self.index.within_radius(50, 50, 10)
+        expected = [unit_id for distance, unit_id in self._brute_force(50, 50) if distance <= 10]
+        self.assertEqual([unit.unit_id for unit, _ in result], expected)
+        self.assertGreater(len(result), 0)
+
+    def test_insert_remove_move(self):
+        """测试增量插入、删除和移动"""
+        new_unit = EmergencyUnit(1000, "Police Car", 50.0, 50.0)
+        self.index.insert(new_unit)
+        self.assertIn(new_unit, self.index)
+        self.assertEqual(self.index.k_nearest(50.0, 50.0, 1)[0][0], new_unit)
+        with self.assertRaises(ValueError):
+            self.index.insert(new_unit)
+
+        self.index.move(new_unit, 0.0, 0.0)
+        self.assertEqual((new_unit.location_x, new_unit.location_y), (0.0, 0.0))
+        self.assertEqual(self.index.k_nearest(0.0, 0.0, 1)[0][0], new_unit)
+
+        self.assertTrue(self.index.remove(new_unit))
+        self.assertFalse(self.index.remove(new_unit))
+        self.assertNotIn(new_unit, self.index)
+        self.assertEqual(len(self.index), 500)
+
+    def test_many_moves_stay_correct(self):
+        """测试大量移动后查询仍然正确，删除标记被回收"""
+        for _ in range(3000):
+            unit = self.rng.choice(self.units)
+            self.index.move(unit, self.rng.uniform(0, 100), self.rng.uniform(0, 100))
+        self.assertLessEqual(self.index.deleted, len(self.index))
+        for _ in range(20):
+            x, y = self.rng.uniform(0, 100), self.rng.uniform(0, 100)
+            result = [unit.unit_id for unit, _ in self.index.k_nearest(x, y, 3)]
+            self.assertEqual(result, [unit_id for _, unit_id in self._brute_force(x, y)[:3]])
+
+    def test_sorted_inserts_stay_balanced(self):
+        """测试有序插入时树高保持对数级别"""
+        index = SpatialIndex()
+        for i in range(2000):
+            index.insert(EmergencyUnit(i, "Fire Truck", i * 0.05, i * 0.05))
+        self.assertLess(index.depth(), 40)
+        self.assertEqual(index.k_nearest(50.0, 50.0, 1)[0][0].unit_id, 1000)
+
+    def test_type_and_availability_filters(self):
+        """测试按单位类型和可用状态过滤的查询"""
+        unit_types = ["Fire Truck", "Ambulance", "Police Car"]
+        units = [
+            EmergencyUnit(i, unit_types[i % 3], self.rng.uniform(0, 100), self.rng.uniform(0, 100))
+            for i in range(300)
+        ]
+        index = SpatialIndex(units)
+        busy = set(self.rng.sample(range(300), 200))
+        for unit in units:
+            if unit.unit_id in busy:
+                index.set_available(unit, False)
+        self.assertEqual(index.available_count(), 100)
+        self.assertEqual(
+            index.available_count({"Ambulance"}),
+            sum(1 for unit in units if unit.unit_type == "Ambulance" and unit.unit_id not in busy)
+        )
+
+        for _ in range(30):
+            x, y = self.rng.uniform(0, 100), self.rng.uniform(0, 100)
+            allowed = {"Ambulance", "Police Car"}
+            expected = sorted(
+                (math.hypot(unit.location_x - x, unit.location_y - y), unit.unit_id)
+                for unit in units
+                if unit.unit_type in allowed and unit.unit_id not in busy
+            )[:4]
+            result = index.nearest(x, y, 4, types=allowed, available_only=True)
+            self.assertEqual([unit.unit_id for unit, _ in result], [unit_id for _, unit_id in expected])
+
+        # 没有该类型的分区时返回空结果
+        self.assertEqual(index.nearest(50, 50, 3, types={"Helicopter"}), [])
+
+    def test_move_keeps_availability(self):
+        """测试移动单位后保留可用状态"""
+        unit = self.units[0]
+        self.index.set_available(unit, False)
+        self.index.move(unit, 10.0, 10.0)
+        self.assertFalse(self.index.is_available(unit))
+        self.assertEqual(self.index.available_count(), 499)
+        nearest = self.index.nearest(10.0, 10.0, 1, available_only=True)[0][0]
+        self.assertNotEqual(nearest, unit)
+        self.index.set_available(unit, True)
+        self.assertEqual(self.index.nearest(10.0, 10.0, 1, available_only=True)[0][0], unit)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import unittest
+import sys
+import os
+import random
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from emergency_response.utils.streaming_stats import StreamingStats, LogHistogram
+from emergency_response.data_structures.emergency import Emergency, EmergencyType
+from emergency_response.data_structures.heap import HeapPriorityQueue
+
+class FakeClock:
+    """可以手动推进的时钟"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class TestLogHistogram(unittest.TestCase):
+
+    def test_quantile_relative_error(self):
+        """测试分位数的相对误差在设定范围内"""
+        rng = random.Random(3)
+        values = sorted(rng.uniform(0.5, 500.0) for _ in range(5000))
+        histogram = LogHistogram(relative_error=0.02)
+        for value in values:
+            histogram.record(value)
+        for q in (0.5, 0.95, 0.99):
+            exact = values[int(q * len(values))]
+            self.assertAlmostEqual(histogram.quantile(q) / exact, 1.0, delta=0.021)
+
+    def test_empty_and_zero(self):
+        """测试空直方图和零值"""
+        histogram = LogHistogram()
+        self.assertIsNone(histogram.quantile(0.5))
+        histogram.record(0.0)
+        self.assertEqual(histogram.quantile(0.5), 0.0)
+
+class TestStreamingStats(unittest.TestCase):
+
+    def setUp(self):
+        """测试前的准备工作"""
+        self.clock = FakeClock()
+        self.queue = HeapPriorityQueue()
+        self.stats = StreamingStats.attach(self.queue, window=60.0, resolution=1.0, history=5, clock=self.clock)
+
+    def test_sliding_window_arrivals(self):
+        """测试到达数只统计最近一个窗口"""
+        self.queue.enqueue(Emergency(1, EmergencyType.FIRE, 2, "A"))
+        self.clock.now += 30
+        self.queue.enqueue(Emergency(2, EmergencyType.FIRE, 5, "B"))
+        self.queue.enqueue(Emergency(3, EmergencyType.MEDICAL, 5, "C"))
+
+        rates = self.stats.arrivals_per_minute()
+        self.assertEqual(rates[EmergencyType.FIRE], 2.0)
+        self.assertEqual(rates[EmergencyType.MEDICAL], 1.0)
+        self.assertEqual(self.stats.severity_distribution(), {2: 1, 5: 2})
+
+        # 第一个紧急情况移出窗口
+        self.clock.now += 40
+        self.assertEqual(self.stats.arrivals_per_minute()[EmergencyType.FIRE], 1.0)
+        self.assertEqual(self.stats.severity_distribution(), {5: 2})
+
+        # 很长时间之后窗口为空
+        self.clock.now += 1000
+        self.assertEqual(sum(self.stats.arrivals_per_minute().values()), 0)
+
+    def test_wait_quantiles(self):
+        """测试等待时间分位数"""
+        self.assertIsNone(self.stats.wait_quantile(0.5))
+        for i in range(20):
+            self.queue.enqueue(Emergency(i, EmergencyType.POLICE, 1 + i % 10, "A"))
+        for i in range(20):
+            self.clock.now += 1
+            self.queue.dequeue()
+        # 等待时间为1..20秒
+        self.assertAlmostEqual(self.stats.wait_quantile(0.5), 11.0, delta=0.3)
+        self.assertAlmostEqual(self.stats.wait_quantile(0.95), 20.0, delta=0.5)
+        self.assertEqual(self.stats.arrival_times, {})
+
+    def test_tumbling_windows(self):
+        """测试滚动窗口的摘要和有界的历史"""
+        self.clock.now = 600.0
+        self.queue.enqueue(Emergency(1, EmergencyType.TRAFFIC, 3, "A"))
+        self.queue.enqueue(Emergency(2, EmergencyType.NATURAL, 3, "B"))
+        self.clock.now = 665.0
+        self.queue.dequeue()
+        self.assertEqual(len(self.stats.history), 1)
+        summary = self.stats.history[0]
+        self.assertEqual(summary.start, 600.0)
+        self.assertEqual(summary.arrivals[EmergencyType.TRAFFIC], 1)
+        self.assertEqual(summary.severity_counts, {3: 2})
+        self.assertIsNone(summary.wait_p50)
+
+        # 跳过很多窗口后，历史长度不超过上限
+        self.clock.now = 100000.0
+        self.stats.current()
+        self.assertEqual(len(self.stats.history), 5)
+        self.assertEqual(self.stats.history[-1].start, (100000 // 60 - 1) * 60.0)
+        self.assertEqual(sum(self.stats.history[0].arrivals.values()), 0)
+
+    def test_existing_items_and_detach(self):
+        """测试订阅前已有的紧急情况和取消订阅"""
+        queue = HeapPriorityQueue()
+        queue.enqueue(Emergency(1, EmergencyType.FIRE, 1, "A"))
+        stats = StreamingStats.attach(queue, clock=self.clock)
+        self.assertEqual(sum(stats.arrivals_per_minute().values()), 0)
+        self.clock.now += 4
+        queue.dequeue()
+        self.assertAlmostEqual(stats.wait_quantile(0.5), 4.0, delta=0.1)
+
+        stats.detach()
+        queue.enqueue(Emergency(2, EmergencyType.FIRE, 1, "A"))
+        self.assertEqual(sum(stats.arrivals_per_minute().values()), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+import unittest
+import sys
+import os
+import random
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from emergency_response.gui.tree_layout import TreeLayout, TreeViewport, CanvasNode, NodeGrid, NODE_RADIUS, MIN_NODE_SPACING
+from emergency_response.data_structures.emergency import Emergency, EmergencyType
+from emergency_response.data_structures.heap import HeapPriorityQueue
+from emergency_response.data_structures.binary_tree import BinaryTreePriorityQueue
+
+class TestTreeLayout(unittest.TestCase):
+
+    def setUp(self):
+        """测试前的准备工作"""
+        rng = random.Random(4)
+        self.emergencies = [Emergency(i, EmergencyType.FIRE, rng.randint(1, 10), "A") for i in range(1, 101)]
+
+    def test_heap_layout(self):
+        """测试堆布局按中序排列，父节点、深度和子树大小正确"""
+        heap = HeapPriorityQueue()
+        for emergency in self.emergencies[:7]:
+            heap.enqueue(emergency)
+        layout = TreeLayout.from_heap(heap.heap, heap.count)
+
+        # 7个节点的完全二叉树，中序为 4 2 5 1 6 3 7
+        self.assertEqual(layout.items, [heap.heap[i] for i in (4, 2, 5, 1, 6, 3, 7)])
+        self.assertEqual(layout.depth.tolist(), [2, 1, 2, 0, 2, 1, 2])
+        self.assertEqual(layout.parent.tolist(), [1, 3, 1, -1, 5, 3, 5])
+        self.assertEqual(layout.subtree_size.tolist(), [1, 3, 1, 7, 1, 3, 1])
+        self.assertEqual(layout.height, 3)
+        self.assertEqual(len(TreeLayout.from_heap([None], 0)), 0)
+
+    def test_binary_tree_layout_is_in_order(self):
+        """测试二叉搜索树布局的列顺序就是优先级顺序，且父子深度一致"""
+        tree = BinaryTreePriorityQueue()
+        for emergency in self.emergencies:
+            tree.enqueue(emergency)
+        layout = TreeLayout.from_binary_tree(tree.root)
+
+        self.assertEqual(layout.items, sorted(self.emergencies))
+        roots = [i for i, parent in enumerate(layout.parent.tolist()) if parent < 0]
+        self.assertEqual(len(roots), 1)
+        self.assertEqual(layout.subtree_size[roots[0]], len(self.emergencies))
+        for index, parent in enumerate(layout.parent.tolist()):
+            if parent >= 0:
+                self.assertEqual(layout.depth[index], layout.depth[parent] + 1)
+
+    def test_visible_culls_and_collapses(self):
+        """测试只选择视口内的节点，过密的层折叠到上一层"""
+        heap = HeapPriorityQueue(max_size=2000)
+        for i in range(1023):
+            heap.enqueue(Emergency(i, EmergencyType.MEDICAL, 5, "B"))
+        layout = TreeLayout.from_heap(heap.heap, heap.count)
+
+        # 每层最多4个节点：只绘制深度0到2，深度2的节点都是折叠摘要
+        indices, cut_depth = layout.visible(0, 1022, 0, 20, 4)
+        self.assertEqual(cut_depth, 2)
+        self.assertEqual(len(indices), 7)
+        self.assertTrue(all(layout.is_collapsed(i, cut_depth) for i in indices if layout.depth[i] == 2))
+
+        # 列范围和深度范围之外的节点不绘制
+        indices, cut_depth = layout.visible(0, 63, 3, 6, 100)
+        self.assertEqual(cut_depth, 6)
+        self.assertTrue(all(0 <= i <= 63 and 3 <= layout.depth[i] <= 6 for i in indices))
+        # 第63列是深度3的节点，第0到62列是它的左子树
+        self.assertEqual(len(indices), 1 + 1 + 2 + 4)
+
+        # 第一层就过密时不绘制任何节点
+        indices, cut_depth = layout.visible(0, 1022, 9, 9, 10)
+        self.assertEqual((len(indices), cut_depth), (0, 8))
+
+    def test_viewport_transform(self):
+        """测试视口适配、缩放和平移"""
+        heap = HeapPriorityQueue(max_size=2000)
+        for i in range(1000):
+            heap.enqueue(Emergency(i, EmergencyType.POLICE, 1 + i % 10, "C"))
+        layout = TreeLayout.from_heap(heap.heap, heap.count)
+        viewport = TreeViewport()
+
+        viewport.fit(layout, 800)
+        first, last = viewport.column_range(800)
+        self.assertLessEqual(first, 0)
+        self.assertGreaterEqual(last, len(layout) - 1)
+        self.assertTrue(viewport.fitted)
+
+        # 缩放时鼠标下的列保持不动
+        column = viewport.left + 300 / viewport.scale
+        viewport.zoom(8, 300)
+        self.assertAlmostEqual(viewport.left + 300 / viewport.scale, column)
+        self.assertFalse(viewport.fitted)
+
+        # 缩小到一屏画不下时，每层节点不超过画布能容纳的数量
+        indices, cut_depth = layout.visible(*viewport.column_range(800), *viewport.depth_range(600), 800 // MIN_NODE_SPACING)
+        for depth in range(cut_depth + 1):
+            self.assertLessEqual(sum(1 for i in indices if layout.depth[i] == depth), 800 // MIN_NODE_SPACING)
+
+        # 向上拖动内容显示更深的层（部分可见的节点仍然绘制）
+        viewport.pan(0, -210)
+        self.assertEqual(viewport.depth_range(600)[0], 2)
+        viewport.pan(0, 1000)
+        self.assertEqual(viewport.top, 0.0)
+
+    def test_canvas_node_hit_testing(self):
+        """测试用NodeGrid做节点点击检测，结果与逐个检查一致"""
+        rng = random.Random(8)
+        hits = NodeGrid()
+        nodes = []
+        for index, emergency in enumerate(self.emergencies):
+            node = CanvasNode(emergency, rng.uniform(0, 2000), rng.uniform(0, 600), index)
+            hits.insert(node)
+            nodes.append(node)
+
+        for _ in range(500):
+            x, y = rng.uniform(-50, 2050), rng.uniform(-50, 650)
+            inside = [
+                node for node in nodes
+                if (x - node.x) ** 2 + (y - node.y) ** 2 <= NODE_RADIUS ** 2
+            ]
+            found = [node for node, _ in hits.within_radius(x, y, NODE_RADIUS)]
+            self.assertEqual(sorted(n.index for n in found), sorted(n.index for n in inside))
+            if found:
+                self.assertIs(found[0].emergency, self.emergencies[found[0].index])
+
+    def test_draw_tree_with_duplicate_ids(self):
+        """测试队列中有重复ID时树状图仍能完整绘制，且每个节点都能被点击检测到"""
+        from unittest import mock
+        from emergency_response.gui.interface import EmergencyResponseGUI
+
+        tree = BinaryTreePriorityQueue()
+        duplicates = [Emergency(7, EmergencyType.FIRE, severity, "A") for severity in (2, 5, 8)]
+        for emergency in duplicates + self.emergencies[:4]:
+            tree.enqueue(emergency)
+
+        gui = EmergencyResponseGUI.__new__(EmergencyResponseGUI)
+        gui.tree_canvas = mock.Mock()
+        gui.tree_canvas.winfo_width.return_value = 800
+        gui.tree_canvas.winfo_height.return_value = 600
+        gui.current_queue_type = mock.Mock(get=mock.Mock(return_value='binary_tree'))
+        gui.tree_layout = TreeLayout.from_binary_tree(tree.root)
+        gui.tree_viewport = TreeViewport()
+        gui.tree_viewport.fit(gui.tree_layout, 800)
+        gui._draw_tree()
+
+        self.assertEqual(len(gui.tree_hits), len(tree))
+        for node in gui.tree_hits:
+            self.assertIs(gui._node_at_position(node.x, node.y), node)
+            self.assertEqual(gui._find_node_at_position(node.x, node.y),
+                             node.emergency.emergency_id)
+        self.assertEqual(sorted(node.emergency.severity_level for node in gui.tree_hits
+                                if node.emergency.emergency_id == 7), [2, 5, 8])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,159 @@
+import unittest
+import sys
+import os
+import random
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from emergency_response.gui.virtual_list import LazyRowSource
+from emergency_response.data_structures.emergency import Emergency, EmergencyType
+from emergency_response.data_structures.heap import HeapPriorityQueue
+from emergency_response.data_structures.linked_list import LinkedListPriorityQueue
+from emergency_response.data_structures.binary_tree import BinaryTreePriorityQueue
+
+def priority_key(emergency, severity):
+    """与队列相同的排序键"""
+    return (severity, emergency.emergency_id)
+
+class CountingRange:
+    """记录迭代器创建次数和已产生元素数量的range"""
+
+    def __init__(self, length):
+        self.length = length
+        self.created = 0
+        self.produced = 0
+
+    def __call__(self):
+        self.created += 1
+        return self._generate()
+
+    def _generate(self):
+        for value in range(self.length):
+            self.produced += 1
+            yield value
+
+class TestLazyRowSource(unittest.TestCase):
+
+    def test_pages_and_bounds(self):
+        """测试按位置读取页面，并在末尾截断"""
+        source = LazyRowSource(lambda: iter(range(10)), 10)
+        self.assertEqual(source.rows(0, 3), [0, 1, 2])
+        self.assertEqual(source.rows(8, 5), [8, 9])
+        self.assertEqual(source.rows(12, 5), [])
+        self.assertEqual(source.rows(4, 2), [4, 5])
+        self.assertEqual(len(LazyRowSource(lambda: iter(()), 0).rows(0, 20)), 0)
+
+    def test_scrolling_down_reuses_iterator(self):
+        """测试向下翻页只消费新增的行，向上滚动或跳回时不重新遍历"""
+        rows = CountingRange(10 ** 6)
+        source = LazyRowSource(rows, rows.length)
+        for page in range(100):
+            self.assertEqual(source.rows(page * 30, 30)[0], page * 30)
+        self.assertEqual(rows.created, 1)
+        self.assertEqual(rows.produced, 3000)
+
+        self.assertEqual(source.rows(30, 30)[0], 30)
+        self.assertEqual(source.rows(2967, 30), list(range(2967, 2997)))
+        self.assertEqual(rows.created, 1)
+        self.assertEqual(rows.produced, 3000)
+
+    def test_heap_pages_in_priority_order(self):
+        """测试从堆中按优先级顺序分页读取"""
+        queue = HeapPriorityQueue(max_size=20000)
+        rng = random.Random(3)
+        emergencies = [Emergency(i, EmergencyType.FIRE, rng.randint(1, 10), "A") for i in range(20000)]
+        for emergency in emergencies:
+            queue.enqueue(emergency)
+
+        source = LazyRowSource(queue.iter_by_priority, len(queue))
+        expected = sorted(emergencies, key=lambda e: (e.severity_level, e.emergency_id))
+        self.assertEqual(source.rows(0, 25), expected[:25])
+        self.assertEqual(source.rows(25, 25), expected[25:50])
+
+    def test_apply_events_matches_queue(self):
+        """测试应用入队、出队和更改优先级事件后，各个位置的行与队列一致"""
+        rng = random.Random(8)
+        for queue_class in (LinkedListPriorityQueue, BinaryTreePriorityQueue, HeapPriorityQueue):
+            with self.subTest(queue=queue_class.__name__):
+                queue = queue_class()
+                next_id = 0
+                for _ in range(300):
+                    next_id += 1
+                    queue.enqueue(Emergency(next_id, EmergencyType.FIRE, rng.randint(1, 10), "A"))
+                events = []
+                queue.subscribe(lambda queue, event: events.append(event))
+                source = LazyRowSource(queue.iter_by_priority, len(queue), priority_key)
+
+                for _ in range(60):
+                    source.rows(rng.randrange(len(queue)), 20)
+                    for _ in range(rng.randint(1, 5)):
+                        operation = rng.random()
+                        if operation < 0.4:
+                            next_id += 1
+                            # 偶尔使用重复的ID
+                            emergency_id = next_id if operation > 0.05 else 1
+                            queue.enqueue(Emergency(emergency_id, EmergencyType.FIRE, rng.randint(1, 10), "A"))
+                        elif operation < 0.7:
+                            queue.dequeue()
+                        else:
+                            target = rng.choice(list(queue))
+                            queue.change_priority(target.emergency_id, rng.randint(1, 10))
+                    source.apply_events(events, len(queue))
+                    events.clear()
+                    expected = list(queue.iter_by_priority())
+                    start = rng.randrange(len(queue))
+                    self.assertEqual(source.rows(start, 30), expected[start:start + 30])
+                    self.assertEqual(source.rows(0, len(queue)), expected)
+
+    def test_dequeue_keeps_cached_rows(self):
+        """测试出队后已缓存的行直接移动，不从第0行重新遍历队列"""
+        queue = LinkedListPriorityQueue()
+        for emergency_id in range(5000):
+            queue.enqueue(Emergency(emergency_id, EmergencyType.FIRE, 1 + emergency_id % 10, "A"))
+        created = []
+        source = LazyRowSource(lambda: created.append(1) or queue.iter_by_priority(), len(queue), priority_key)
+        source.rows(4000, 30)
+
+        events = []
+        queue.subscribe(lambda queue, event: events.append(event))
+        for _ in range(10):
+            queue.dequeue()
+        source.apply_events(events, len(queue))
+        self.assertEqual(source.rows(3990, 30), list(queue)[3990:4020])
+        self.assertEqual(len(created), 1)
+
+    def test_gui_flush_applies_events_to_list(self):
+        """测试界面合并事件后把事件交给虚拟列表，而不是重新创建数据源"""
+        from unittest import mock
+        from emergency_response.gui.interface import EmergencyResponseGUI
+
+        queue = LinkedListPriorityQueue()
+        gui = EmergencyResponseGUI.__new__(EmergencyResponseGUI)
+        gui.root = mock.Mock()
+        gui.root.after.return_value = "after#1"
+        gui.current_queue = queue
+        gui.current_queue_type = mock.Mock(get=mock.Mock(return_value='linked_list'))
+        gui.display_mode = 'list'
+        gui.pending_events = []
+        gui._refresh_job = None
+        gui.queue_list = mock.Mock()
+        gui.queue_info_var = mock.Mock()
+        gui._update_statistics_chart = mock.Mock()
+        gui._rebuild_tree_layout = mock.Mock()
+        queue.subscribe(gui._on_queue_event)
+
+        for emergency_id in range(3):
+            queue.enqueue(Emergency(emergency_id, EmergencyType.FIRE, 5, "A"))
+        queue.dequeue()
+        gui.root.after.assert_called_once()
+        gui._flush_queue_events()
+
+        events, length = gui.queue_list.apply_events.call_args[0]
+        self.assertEqual([event.kind for event in events], ["inserted"] * 3 + ["removed"])
+        self.assertEqual(length, 2)
+        gui.queue_list.set_source.assert_not_called()
+        gui._rebuild_tree_layout.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+import sys
+import os
+from collections import Counter
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from emergency_response.utils.workload import (
+    WorkloadGenerator, apply_operations, clone_operations
+)
+from emergency_response.utils.performance_analyzer import PerformanceAnalyzer
+from emergency_response.data_structures.linked_list import LinkedListPriorityQueue
+from emergency_response.data_structures.binary_tree import BinaryTreePriorityQueue
+from emergency_response.data_structures.heap import HeapPriorityQueue
+
+class TestWorkloadGenerator(unittest.TestCase):
+
+    def test_seeded_reproducibility(self):
+        """测试相同种子生成相同的工作负载"""
+        first = WorkloadGenerator(seed=7).generate_emergencies(50)
+        second = WorkloadGenerator(seed=7).generate_emergencies(50)
+        self.assertEqual(
+            [(e.emergency_id, e.severity_level, e.type) for e in first],
+            [(e.emergency_id, e.severity_level, e.type) for e in second]
+        )
+
+    def test_ids_are_not_sequential(self):
+        """测试随机顺序下ID是打乱的但仍然唯一"""
+        emergencies = WorkloadGenerator(seed=1).generate_emergencies(100)
+        ids = [e.emergency_id for e in emergencies]
+        self.assertEqual(sorted(ids), list(range(1, 101)))
+        self.assertNotEqual(ids, list(range(1, 101)))
+
+    def test_orderings(self):
+        """测试sorted/reverse/adversarial三种入队顺序"""
+        sorted_items = WorkloadGenerator(seed=3, ordering='sorted').generate_emergencies(30)
+        self.assertEqual(sorted_items, sorted(sorted_items))
+
+        reverse_items = WorkloadGenerator(seed=3, ordering='reverse').generate_emergencies(30)
+        self.assertEqual(reverse_items, sorted(reverse_items, reverse=True))
+
+        adversarial = WorkloadGenerator(seed=3, ordering='adversarial').generate_emergencies(30)
+        # 第一项是优先级最低的，其余按优先级从高到低
+        self.assertEqual(adversarial[0], max(adversarial))
+        self.assertEqual(adversarial[1:], sorted(adversarial[1:]))
+
+        with self.assertRaises(ValueError):
+            WorkloadGenerator(ordering='unknown')
+
+    def test_zipf_severity_skew(self):
+        """测试Zipf分布下轻微事件（严重程度10）最常见"""
+        generator = WorkloadGenerator(seed=5, severity_distribution='zipf')
+        counts = Counter(generator.severity() for _ in range(5000))
+        self.assertEqual(counts.most_common(1)[0][0], 10)
+        self.assertGreater(counts[10], counts[1] * 3)
+
+    def test_arrival_processes(self):
+        """测试泊松和突发到达时间单调递增且平均到达率合理"""
+        generator = WorkloadGenerator(seed=11)
+        poisson = generator.poisson_arrivals(5000, rate=2.0)
+        self.assertEqual(poisson, sorted(poisson))
+        self.assertAlmostEqual(len(poisson) / poisson[-1], 2.0, delta=0.2)
+
+        bursty = generator.bursty_arrivals(5000, base_rate=1.0, burst_rate=20.0)
+        self.assertEqual(bursty, sorted(bursty))
+        # 突发期间的到达使平均到达率高于基础到达率
+        self.assertGreater(len(bursty) / bursty[-1], 1.0)
+
+    def test_operation_mix_replays_on_all_queues(self):
+        """测试交错操作序列在三种队列上产生相同的结果"""
+        generator = WorkloadGenerator(seed=13)
+        initial = generator.generate_emergencies(20)
+        operations = generator.operation_mix(300, initial=initial)
+        names = Counter(name for name, _ in operations)
+        self.assertGreater(names['change_priority'], 0)
+        self.assertGreater(names['dequeue'], 0)
+
+        final_orders = []
+        for queue_class in (LinkedListPriorityQueue, BinaryTreePriorityQueue, HeapPriorityQueue):
+            queue = queue_class()
+            for name, emergency in clone_operations([('enqueue', e) for e in initial]):
+                queue.enqueue(emergency)
+            apply_operations(queue, clone_operations(operations))
+            order = []
+            while not queue.is_empty():
+                emergency = queue.dequeue()
+                order.append((emergency.emergency_id, emergency.severity_level))
+            final_orders.append(order)
+
+        self.assertEqual(final_orders[0], final_orders[1])
+        self.assertEqual(final_orders[0], final_orders[2])
+
+    def test_operation_mix_steady_state_depth(self):
+        """测试设置目标深度后队列深度保持在目标附近"""
+        generator = WorkloadGenerator(seed=17)
+        initial = generator.generate_emergencies(100)
+        ratios = {'enqueue': 0.8, 'dequeue': 0.2}
+        operations = generator.operation_mix(2000, ratios, initial=initial, target_depth=100)
+
+        depth = 100
+        for name, _ in operations:
+            depth += 1 if name == 'enqueue' else -1
+            self.assertLessEqual(depth, 111)
+            self.assertGreaterEqual(depth, 89)
+
+    def test_analyzer_uses_workload(self):
+        """测试性能分析器使用配置的工作负载生成数据"""
+        analyzer = PerformanceAnalyzer(workload=WorkloadGenerator(seed=2, ordering='sorted'))
+        emergencies = analyzer.generate_random_emergencies(20)
+        self.assertEqual(emergencies, sorted(emergencies))
+
+if __name__ == '__main__':
+    unittest.main()